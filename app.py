@@ -25,6 +25,8 @@ def build_router(main_ctrl: ClientController,
     r.add("GET", "/clients/<id>/edit", lambda id: edit_ctrl.edit_form(id))
     r.add("POST", "/clients/<id>/edit", lambda payload, id: edit_ctrl.update(id, payload))
 
+    r.add("GET", "/api/clients", lambda: main_ctrl.api_list())
+
     # delete on main
     r.add("DELETE", "/api/clients/<id>", lambda id: main_ctrl.api_delete(id))
 
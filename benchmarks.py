@@ -0,0 +1,238 @@
+# benchmarks.py
+"""
+Замеры производительности репозиториев клиентов.
+
+Запуск: python benchmarks.py
+"""
+from __future__ import annotations
+
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientRepJson
+
+
+def _make_rows(count: int) -> List[dict]:
+    """Сгенерировать count валидных записей клиентов."""
+    return [
+        {
+            "first_name": "Иван",
+            "last_name": "Иванов",
+            "father_name": "Иванович",
+            "haircut_counter": i,
+            "discount": i % 100,
+            "id": i + 1,
+        }
+        for i in range(count)
+    ]
+
+
+# Частые имена: у реальных клиентов они повторяются тысячами
+_LAST_NAMES = ["Иванов", "Петров", "Смирнов", "Кузнецов", "Попов", "Соколов", "Лебедев", "Козлов"]
+_FIRST_NAMES = ["Иван", "Пётр", "Алексей", "Дмитрий", "Сергей", "Андрей", "Михаил"]
+_FATHER_NAMES = ["Иванович", "Петрович", "Алексеевич", "Дмитриевич", "Сергеевич", "Андреевич"]
+
+
+def _make_named_rows(count: int) -> List[dict]:
+    """Как _make_rows, но с набором повторяющихся ФИО."""
+    return [
+        {
+            "first_name": _FIRST_NAMES[i % len(_FIRST_NAMES)],
+            "last_name": _LAST_NAMES[i % len(_LAST_NAMES)],
+            "father_name": _FATHER_NAMES[i % len(_FATHER_NAMES)],
+            "haircut_counter": i,
+            "discount": i % 100,
+            "id": i + 1,
+        }
+        for i in range(count)
+    ]
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> float:
+    """Среднее время одного вызова fn в микросекундах."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def bench_lookup_by_id(sizes=(1_000, 10_000, 100_000), repeat: int = 10_000) -> None:
+    """get_by_id должен оставаться O(1) при росте числа клиентов."""
+    print("get_by_id (мкс на вызов):")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"clients_{size}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(_make_rows(size), f, ensure_ascii=False)
+
+            repo = ClientRepJson(path)
+            last_id = size
+            t = _timeit(lambda: repo.get_by_id(last_id), repeat)
+            print(f"  {size:>8} клиентов: {t:.3f}")
+
+
+# Замороженная копия Client до перехода на __slots__ (для сравнения):
+# приватные поля в __dict__ экземпляра и проверка каждого поля в конструкторе
+class _OldClientShort:
+    def __init__(
+        self, last_name: str, first_name: str, father_name: str, haircut_counter: int
+    ):
+
+        self._validate_name(last_name, "last_name")
+        self._validate_name(first_name, "first_name")
+        self._validate_name(father_name, "father_name")
+        self._validate_haircut_counter(haircut_counter)
+
+        self.__last_name = last_name
+        self.__first_name = first_name
+        self.__father_name = father_name
+        self.__haircut_counter = haircut_counter
+
+    @staticmethod
+    def _validate_name(name: str, field_name: str):
+        if not isinstance(name, str):
+            raise ValueError(f"{field_name} должен быть строкой")
+        if not name.strip():
+            raise ValueError(f"{field_name} не может быть пустым")
+        if len(name.strip()) < 2:
+            raise ValueError(f"{field_name} должен содержать минимум 2 символа")
+        if not name.replace(" ", "").isalpha():
+            raise ValueError(f"{field_name} должен содержать только буквы и пробелы")
+
+    @staticmethod
+    def _validate_haircut_counter(haircut_counter: int):
+        if not isinstance(haircut_counter, int):
+            raise ValueError("haircut_counter должен быть целым числом")
+        if haircut_counter < 0:
+            raise ValueError("haircut_counter не может быть отрицательным")
+
+
+class _OldClient(_OldClientShort):
+    def __init__(self, data: dict):
+        required_fields = [
+            "first_name",
+            "last_name",
+            "father_name",
+            "haircut_counter",
+            "discount",
+            "id",
+        ]
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            raise ValueError(f"Отсутствуют обязательные поля: {missing_fields}")
+
+        self._validate_discount(data["discount"])
+
+        super().__init__(
+            data["last_name"],
+            data["first_name"],
+            data["father_name"],
+            data["haircut_counter"],
+        )
+
+        self.__discount = data["discount"]
+        self.__id = data["id"]
+
+    @staticmethod
+    def _validate_discount(discount: int):
+        if not isinstance(discount, (int, float)):
+            raise ValueError("discount должен быть числом")
+        if discount < 0 or discount > 100:
+            raise ValueError("discount должен быть в диапазоне от 0 до 100")
+
+
+def _bytes_per_object(factory: Callable[[dict], object], rows: List[dict]) -> float:
+    """Сколько памяти в среднем занимает один объект (строки общие с rows)."""
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(d) for d in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Сам список указателей к объектам не относится
+    size -= len(objects) * 8
+    return size / len(objects)
+
+
+def _seconds(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _build_seconds(factory: Callable[[dict], object], rows: List[dict]) -> float:
+    """Время создания объектов для всех rows."""
+    start = time.perf_counter()
+    objects = [factory(d) for d in rows]
+    elapsed = time.perf_counter() - start
+    del objects
+    return elapsed
+
+
+def bench_client_load(count: int = 1_000_000) -> None:
+    """Память на клиента и время загрузки: прежний Client против __slots__, Client(...) против from_trusted."""
+    rows = _make_rows(count)
+    print(f"Клиенты ({count} записей):")
+    print(f"  память, байт на клиента: прежний Client {_bytes_per_object(_OldClient, rows):.0f}, "
+          f"__slots__ {_bytes_per_object(Client.from_trusted, rows):.0f}")
+    print(f"  создание, с: прежний Client(d) {_build_seconds(_OldClient, rows):.2f}, "
+          f"Client(d) {_build_seconds(Client, rows):.2f}, "
+          f"from_trusted {_build_seconds(Client.from_trusted, rows):.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clients.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False)
+        del rows
+
+        repo = ClientRepJson(path)
+        trusted = _seconds(repo.read_all)
+        repo.trusted_storage = False
+        validated = _seconds(repo.read_all)
+        print(f"  ClientRepJson.read_all, с: с валидацией {validated:.2f}, from_trusted {trusted:.2f}")
+
+
+class _NoInternRepJson(ClientRepJson):
+    """ClientRepJson без словаря имён (для сравнения)."""
+
+    intern_names = False
+
+
+def _loaded_bytes(repo_class: type, path: str) -> int:
+    """Память, которую занимает загруженный репозиторий (клиенты, индексы, словарь имён)."""
+    gc.collect()
+    tracemalloc.start()
+    repo = repo_class(path)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del repo
+    return size
+
+
+def bench_name_interning(sizes=(100_000, 1_000_000)) -> None:
+    """Память репозитория после read_all без словаря имён и со словарём."""
+    mb = 1024 * 1024
+    print("Словарь имён (память после read_all):")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"clients_{size}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(_make_named_rows(size), f, ensure_ascii=False)
+
+            plain = _loaded_bytes(_NoInternRepJson, path)
+            interned = _loaded_bytes(ClientRepJson, path)
+            print(f"  {size:>8} клиентов: без словаря {plain / mb:.1f} МБ "
+                  f"({plain / size:.0f} байт/клиент), со словарём {interned / mb:.1f} МБ "
+                  f"({interned / size:.0f} байт/клиент)")
+
+
+if __name__ == "__main__":
+    bench_lookup_by_id()
+    bench_client_load()
+    bench_name_interning()
@@ -0,0 +1,230 @@
+# client_schema.py
+"""
+Декларативная схема клиента и валидатор, собранный из неё один раз.
+
+Одни и те же правила используются:
+- в Client / ClientShort (строгая проверка типов, первая ошибка — ValueError);
+- в формах создания и редактирования (значения приводятся: строки
+  обрезаются, числа разбираются из строк, ошибки собираются по полям);
+- при пакетном импорте (списки и потоки dict, ошибки по номерам строк).
+
+    ok, cleaned, errors = CLIENT_FORM.validate(payload)
+    batch = CLIENT_FORM.validate_batch(rows)
+    batch.valid, batch.errors  # [RowErrors(index=3, errors={"discount": ...})]
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Типы полей
+STR = "str"
+INT = "int"
+NUMBER = "number"
+ANY = "any"  # без проверок: значение принимается как есть
+
+REQUIRED = "Обязательное поле"
+_TYPE_ERRORS = {
+    STR: "Должно быть строкой",
+    INT: "Должно быть целым числом",
+    NUMBER: "Должно быть числом",
+}
+_TYPES = {STR: (str,), INT: (int,), NUMBER: (int, float), ANY: (object,)}
+
+
+@dataclass(frozen=True)
+class Field:
+    """Правила одного поля."""
+
+    name: str
+    type: str
+    min_len: Optional[int] = None
+    max_len: Optional[int] = None
+    letters: bool = False  # только буквы и пробелы
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    # Приведение значения из формы (строки из HTML-полей)
+    coerce: Optional[Callable[[Any], Any]] = None
+
+
+@dataclass
+class RowErrors:
+    """Ошибки одной строки пакета: номер строки и ошибки по полям."""
+
+    index: int
+    errors: Dict[str, str]
+
+
+@dataclass
+class BatchResult:
+    valid: List[Dict[str, Any]] = field(default_factory=list)
+    # номера строк, из которых получены valid (в том же порядке)
+    positions: List[int] = field(default_factory=list)
+    errors: List[RowErrors] = field(default_factory=list)
+
+
+_Check = Callable[[Any], Tuple[Any, Optional[str]]]
+
+
+def _compile(spec: Field, coerce: bool) -> _Check:
+    """Собрать проверку поля в одну функцию value -> (значение, ошибка)."""
+    types = _TYPES[spec.type]
+    type_error = _TYPE_ERRORS.get(spec.type, "")
+    convert = spec.coerce if coerce else None
+
+    # a. ограничения, не зависящие от режима
+    limits: List[Tuple[Callable[[Any], bool], str]] = []
+    if spec.type == STR:
+        limits.append((lambda v: bool(v.strip()), REQUIRED))
+        if spec.min_len is not None:
+            limits.append((lambda v: len(v.strip()) >= spec.min_len, f"Минимум {spec.min_len} символа"))
+        if spec.max_len is not None:
+            limits.append((lambda v: len(v) <= spec.max_len, f"Слишком длинно (>{spec.max_len})"))
+        if spec.letters:
+            limits.append((lambda v: v.replace(" ", "").isalpha(), "Только буквы и пробелы"))
+    elif spec.type != ANY:
+        low, high = spec.min_value, spec.max_value
+        if low is not None and high is not None:
+            message = f"Допустимо {low}..{high}"
+        elif low is not None:
+            message = f"Не меньше {low}"
+        else:
+            message = f"Не больше {high}"
+        if low is not None:
+            limits.append((lambda v: v >= low, message))
+        if high is not None:
+            limits.append((lambda v: v <= high, message))
+
+    def check(value: Any) -> Tuple[Any, Optional[str]]:
+        # b. приведение (только для форм)
+        if coerce:
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == "":
+                return None, REQUIRED
+        if convert is not None:
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                return None, type_error
+        if not isinstance(value, types):
+            return None, type_error
+        # c. ограничения
+        for ok, message in limits:
+            if not ok(value):
+                return None, message
+        return value, None
+
+    return check
+
+
+class Schema:
+    """Валидатор, собранный из списка полей."""
+
+    def __init__(self, fields: Iterable[Field], coerce: bool = False) -> None:
+        self.fields: Tuple[Field, ...] = tuple(fields)
+        self.coerce = coerce
+        self._checks: Tuple[Tuple[str, _Check], ...] = tuple(
+            (spec.name, _compile(spec, coerce)) for spec in self.fields
+        )
+        self._by_name: Dict[str, _Check] = dict(self._checks)
+
+    def only(self, *names: str) -> "Schema":
+        """Схема из части полей (в порядке исходной схемы)."""
+        return Schema([f for f in self.fields if f.name in names], self.coerce)
+
+    def check_field(self, name: str, value: Any) -> Any:
+        """Проверить одно поле; ValueError с текстом ошибки."""
+        check = self._by_name.get(name)
+        if check is None:
+            raise ValueError(f"Поле {name} не описано в схеме")
+        value, error = check(value)
+        if error is not None:
+            raise ValueError(f"{name}: {error}")
+        return value
+
+    def validate(self, payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any], Dict[str, str]]:
+        """(ok, очищенные значения, ошибки по полям) для одной записи."""
+        cleaned: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        get = payload.get
+        for name, check in self._checks:
+            value, error = check(get(name))
+            if error is None:
+                cleaned[name] = value
+            else:
+                errors[name] = error
+        return not errors, cleaned, errors
+
+    def clean(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Очищенные значения или ValueError с первой ошибкой."""
+        missing = [name for name, _ in self._checks if name not in payload]
+        if missing:
+            raise ValueError(f"Отсутствуют обязательные поля: {missing}")
+        cleaned: Dict[str, Any] = {}
+        for name, check in self._checks:
+            value, error = check(payload[name])
+            if error is not None:
+                raise ValueError(f"{name}: {error}")
+            cleaned[name] = value
+        return cleaned
+
+    def iter_validate(
+        self, rows: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Dict[str, str]]]:
+        """Поток (номер строки, очищенные значения или None, ошибки)."""
+        validate = self.validate
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                yield index, None, {"__all__": "Строка должна быть объектом"}
+                continue
+            ok, cleaned, errors = validate(row)
+            yield index, (cleaned if ok else None), errors
+
+    def validate_batch(self, rows: Iterable[Dict[str, Any]]) -> BatchResult:
+        """Проверить пакет целиком: валидные строки и ошибки по номерам строк."""
+        result = BatchResult()
+        for index, cleaned, errors in self.iter_validate(rows):
+            if cleaned is None:
+                result.errors.append(RowErrors(index, errors))
+            else:
+                result.valid.append(cleaned)
+                result.positions.append(index)
+        return result
+
+
+def format_errors(errors: Dict[str, str]) -> str:
+    """Ошибки по полям одной строкой ("поле: ошибка; ...")."""
+    return "; ".join(f"{name}: {message}" for name, message in errors.items())
+
+
+# ---------- схема клиента ----------
+CLIENT_FIELDS: Tuple[Field, ...] = (
+    Field("last_name", STR, min_len=2, letters=True),
+    Field("first_name", STR, min_len=2, letters=True),
+    Field("father_name", STR, min_len=2, letters=True),
+    Field("haircut_counter", INT, min_value=0, coerce=int),
+    Field("discount", NUMBER, min_value=0, max_value=100, coerce=int),
+)
+# id проверяется только в set_id: конструктор Client, как и раньше,
+# принимает любой id (его назначает и перезаписывает репозиторий)
+ID_FIELD = Field("id", NUMBER, min_value=0, coerce=int)
+
+# Формы дополнительно ограничивают длину имён и число стрижек
+# (в хранилище уже могут быть записи за этими пределами)
+_FORM_LIMITS: Dict[str, Dict[str, Any]] = {
+    "last_name": {"max_len": 60},
+    "first_name": {"max_len": 60},
+    "father_name": {"max_len": 60},
+    "haircut_counter": {"max_value": 10_000},
+}
+FORM_FIELDS: Tuple[Field, ...] = tuple(
+    replace(f, **_FORM_LIMITS.get(f.name, {})) for f in CLIENT_FIELDS
+)
+
+# Строгая проверка модели (Client, ClientShort): без приведения типов
+CLIENT = Schema(CLIENT_FIELDS + (Field("id", ANY),))
+CLIENT_ID = Schema((ID_FIELD,))
+CLIENT_SHORT = CLIENT.only("last_name", "first_name", "father_name", "haircut_counter")
+# Формы и импорт: значения приводятся, id назначает репозиторий
+CLIENT_FORM = Schema(FORM_FIELDS, coerce=True)
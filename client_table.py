@@ -0,0 +1,338 @@
+# client_table.py
+"""
+Колоночное представление клиентов для аналитики.
+
+ClientTable хранит числовые поля (id, haircut_counter, discount) в массивах
+array.array, а ФИО — словарным кодированием (номер строки в словаре).
+Фильтры дают маску строк, по которой считаются количество, среднее,
+гистограммы и группировки. NumPy — необязательная зависимость: если он
+установлен, операции векторные (колонка копируется в np.ndarray на время
+запроса, сами array.array продолжают расти), иначе — циклы Python.
+
+Таблица подписана на изменения репозитория и догоняет их по одной записи;
+полная перестройка нужна только после перечитывания хранилища.
+
+    table = ClientTable(repo)
+    loyal = table.mask("haircut_counter", ">=", 10)
+    table.count(loyal), table.mean("discount", loyal), table.ids(loyal)
+"""
+from __future__ import annotations
+
+import operator
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import FILTER_OPS, ClientFilter, ClientRepBase
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy — array.array и циклы Python
+    np = None
+
+# Числовые колонки и их типы в array.array
+NUMERIC_COLUMNS: Dict[str, str] = {"id": "q", "haircut_counter": "q", "discount": "d"}
+NAME_COLUMNS: Tuple[str, ...] = ("last_name", "first_name", "father_name")
+
+_NUMPY_OPS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# Пока очередь изменений короче этой доли таблицы, догоняем по одному
+_MAX_PENDING_FRACTION = 0.5
+
+
+def _py(value: Any) -> Any:
+    """Значение из массива в обычный тип Python (целые скидки — int)."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class _NameColumn:
+    """Словарное кодирование строк: codes[i] — номер строки в values."""
+
+    __slots__ = ("codes", "values", "_code_of")
+
+    def __init__(self) -> None:
+        self.codes = array("q")
+        self.values: List[str] = []
+        self._code_of: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._code_of.get(value)
+        if code is None:
+            code = len(self.values)
+            self._code_of[value] = code
+            self.values.append(value)
+        return code
+
+
+class ClientTable:
+    """Колоночная копия клиентов репозитория для векторных запросов."""
+
+    def __init__(self, repo: ClientRepBase) -> None:
+        self.repo = repo
+        # Изменения репозитория, ещё не применённые к колонкам
+        self._pending: List[Tuple[str, Client]] = []
+        self._rebuild_needed = False
+        with repo.locked():
+            self._rebuild(repo.items)
+            repo.add_change_listener(self._on_change)
+
+    def close(self) -> None:
+        """Отписаться от изменений репозитория."""
+        self.repo.remove_change_listener(self._on_change)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._numeric["id"])
+
+    # ---------- синхронизация с репозиторием ----------
+    def _on_change(self, op: str, client: Optional[Client], version: int) -> None:
+        if op == "reload" or self._rebuild_needed:
+            self._pending.clear()
+            self._rebuild_needed = True
+            return
+        self._pending.append((op, client))
+        if len(self._pending) > max(len(self._numeric["id"]) * _MAX_PENDING_FRACTION, 64):
+            # Проще перестроить, чем догонять длинную очередь
+            self._pending.clear()
+            self._rebuild_needed = True
+
+    def refresh(self) -> None:
+        """Применить накопленные изменения репозитория (вызывается перед каждым запросом)."""
+        self.repo.reload_if_changed()
+        with self.repo.locked():
+            if self._rebuild_needed:
+                self._rebuild(self.repo.items)
+            else:
+                for op, client in self._pending:
+                    if op == "put":
+                        self._put(client)
+                    else:
+                        self._delete(client.get_id())
+            self._pending.clear()
+            self._rebuild_needed = False
+
+    def _rebuild(self, clients: Sequence[Client]) -> None:
+        self._numeric: Dict[str, array] = {
+            name: array(typecode) for name, typecode in NUMERIC_COLUMNS.items()
+        }
+        self._names: Dict[str, _NameColumn] = {name: _NameColumn() for name in NAME_COLUMNS}
+        # id -> номер строки
+        self._row_of: Dict[int, int] = {}
+        for client in clients:
+            self._put(client)
+
+    def _put(self, client: Client) -> None:
+        values = {
+            "id": client.get_id(),
+            "haircut_counter": client.get_haircut_counter(),
+            "discount": client.get_discount(),
+            "last_name": client.get_last_name(),
+            "first_name": client.get_first_name(),
+            "father_name": client.get_father_name(),
+        }
+        row = self._row_of.get(values["id"])
+        if row is None:
+            self._row_of[values["id"]] = len(self._numeric["id"])
+            for name in NUMERIC_COLUMNS:
+                self._numeric[name].append(values[name])
+            for name, column in self._names.items():
+                column.codes.append(column.encode(values[name]))
+            return
+        for name in NUMERIC_COLUMNS:
+            self._numeric[name][row] = values[name]
+        for name, column in self._names.items():
+            column.codes[row] = column.encode(values[name])
+
+    def _delete(self, client_id: int) -> None:
+        row = self._row_of.pop(client_id, None)
+        if row is None:
+            return
+        # Последняя строка переезжает на место удалённой — O(1)
+        last = len(self._numeric["id"]) - 1
+        columns = list(self._numeric.values()) + [c.codes for c in self._names.values()]
+        if row != last:
+            for column in columns:
+                column[row] = column[last]
+            self._row_of[self._numeric["id"][row]] = row
+        for column in columns:
+            column.pop()
+
+    # ---------- колонки ----------
+    def _vector(self, field_name: str) -> Any:
+        """
+        Колонка как np.ndarray или array.array без NumPy.
+
+        Копия, а не np.frombuffer: представление держит буфер array.array,
+        и следующий append в колонку упал бы с BufferError.
+        """
+        if field_name in self._numeric:
+            column = self._numeric[field_name]
+        elif field_name in self._names:
+            column = self._names[field_name].codes
+        else:
+            raise ValueError(f"Колонки {field_name} нет в таблице")
+        if np is None:
+            return column
+        dtype = np.float64 if column.typecode == "d" else np.int64
+        if not len(column):
+            return np.empty(0, dtype=dtype)
+        return np.array(column, dtype=dtype)
+
+    def _select(self, vector: Any, mask: Any) -> Any:
+        if mask is None:
+            return vector
+        if np is not None:
+            return vector[mask]
+        return [v for v, keep in zip(vector, mask) if keep]
+
+    # ---------- маски ----------
+    def mask(self, field_name: str, op: str, value: Any) -> Any:
+        """Маска строк, у которых field_name op value (как в ClientFilter)."""
+        self.refresh()
+        if op not in FILTER_OPS:
+            raise ValueError(f"Неизвестная операция фильтра: {op}")
+
+        if field_name in self._names:
+            # Условие проверяется один раз на каждое различное значение словаря
+            column = self._names[field_name]
+            check = FILTER_OPS[op]
+            allowed = [code for code, s in enumerate(column.values) if check(s, value)]
+            return self._isin(self._vector(field_name), allowed)
+
+        vector = self._vector(field_name)
+        if op == "in":
+            return self._isin(vector, list(value))
+        if np is not None:
+            return _NUMPY_OPS[op](vector, value)
+        check = FILTER_OPS[op]
+        return [check(v, value) for v in vector]
+
+    def where(self, spec: ClientFilter) -> Any:
+        """Маска для декларативного ClientFilter (условия через AND)."""
+        result = None
+        for field_name, op, value in spec.conditions:
+            result = self.and_masks(result, self.mask(field_name, op, value))
+        if result is None:
+            self.refresh()
+            size = len(self._numeric["id"])
+            result = np.ones(size, dtype=bool) if np is not None else [True] * size
+        return result
+
+    @staticmethod
+    def and_masks(left: Any, right: Any) -> Any:
+        if left is None:
+            return right
+        if np is not None:
+            return left & right
+        return [a and b for a, b in zip(left, right)]
+
+    @staticmethod
+    def _isin(vector: Any, values: List[Any]) -> Any:
+        if np is not None:
+            return np.isin(vector, values)
+        wanted = set(values)
+        return [v in wanted for v in vector]
+
+    # ---------- агрегаты ----------
+    def count(self, mask: Any = None) -> int:
+        self.refresh()
+        if mask is None:
+            return len(self._numeric["id"])
+        if np is not None:
+            return int(np.count_nonzero(mask))
+        return sum(1 for keep in mask if keep)
+
+    def ids(self, mask: Any = None) -> List[int]:
+        """id клиентов, попавших в маску."""
+        self.refresh()
+        selected = self._select(self._vector("id"), mask)
+        return selected.tolist() if np is not None else list(selected)
+
+    def mean(self, field_name: str, mask: Any = None) -> Optional[float]:
+        self._check_numeric(field_name)
+        self.refresh()
+        selected = self._select(self._vector(field_name), mask)
+        if not len(selected):
+            return None
+        if np is not None:
+            return float(selected.mean())
+        return sum(selected) / len(selected)
+
+    def histogram(self, field_name: str, bins: Sequence[float], mask: Any = None) -> List[int]:
+        """
+        Число значений в интервалах [bins[i], bins[i+1]); последний
+        интервал включает правую границу (как numpy.histogram).
+        """
+        self._check_numeric(field_name)
+        self.refresh()
+        selected = self._select(self._vector(field_name), mask)
+        if np is not None:
+            counts, _ = np.histogram(selected, bins=list(bins))
+            return counts.tolist()
+
+        counts = [0] * (len(bins) - 1)
+        for value in selected:
+            for i in range(len(counts)):
+                last = i == len(counts) - 1
+                if bins[i] <= value < bins[i + 1] or (last and value == bins[i + 1]):
+                    counts[i] += 1
+                    break
+        return counts
+
+    def group_count(self, by: str, mask: Any = None) -> Dict[Any, int]:
+        """Количество клиентов по значениям колонки by."""
+        self.refresh()
+        keys = self._select(self._vector(by), mask)
+        if np is not None:
+            if by in self._names:
+                counts = np.bincount(keys, minlength=len(self._names[by].values))
+                values = self._names[by].values
+                return {values[code]: int(n) for code, n in enumerate(counts) if n}
+            unique, counts = np.unique(keys, return_counts=True)
+            return {_py(k): int(n) for k, n in zip(unique, counts)}
+
+        result: Dict[Any, int] = {}
+        for key in keys:
+            key = self._names[by].values[key] if by in self._names else _py(key)
+            result[key] = result.get(key, 0) + 1
+        return result
+
+    def group_mean(self, by: str, field_name: str, mask: Any = None) -> Dict[Any, float]:
+        """Среднее значение field_name по значениям колонки by."""
+        self._check_numeric(field_name)
+        self.refresh()
+        keys = self._select(self._vector(by), mask)
+        values = self._select(self._vector(field_name), mask)
+        if np is not None:
+            if by in self._names:
+                codes, labels = keys, self._names[by].values
+            else:
+                unique, codes = np.unique(keys, return_inverse=True)
+                labels = [_py(k) for k in unique]
+            counts = np.bincount(codes, minlength=len(labels))
+            sums = np.bincount(codes, weights=values, minlength=len(labels))
+            return {labels[i]: float(sums[i] / counts[i]) for i in range(len(labels)) if counts[i]}
+
+        totals: Dict[Any, List[float]] = {}
+        for key, value in zip(keys, values):
+            key = self._names[by].values[key] if by in self._names else _py(key)
+            acc = totals.setdefault(key, [0.0, 0])
+            acc[0] += value
+            acc[1] += 1
+        return {key: s / n for key, (s, n) in totals.items()}
+
+    @staticmethod
+    def _check_numeric(field_name: str) -> None:
+        if field_name not in NUMERIC_COLUMNS:
+            raise ValueError(f"Колонка {field_name} не числовая")
@@ -4,6 +4,7 @@ import json
 from typing import Any, Dict, Optional, Tuple
 
 from observer import Subject, SseObserver
+from hair_salon_lab2 import encode_clients_json
 from repo_adapter import IClientRepository
 import views
 
@@ -12,11 +13,20 @@ class ClientController:
     def __init__(self, repo: IClientRepository) -> None:
         self.repo = repo
         self.subject = Subject()  # Subject по паттерну наблюдатель
+        # Готовая главная страница и версия снимка, по которому она построена
+        self._index_cache: Optional[Tuple[int, str]] = None
+        # Готовый JSON списка клиентов для того же снимка
+        self._list_cache: Optional[Tuple[int, bytes]] = None
 
     # ---------- HTML pages ----------
     def index(self) -> Tuple[int, str, str]:
-        clients = self.repo.list_all()
-        html = views.index_page(clients)
+        snapshot = self.repo.snapshot()
+        cached = self._index_cache
+        if cached is not None and cached[0] == snapshot.version:
+            return 200, "text/html; charset=utf-8", cached[1]
+
+        html = views.index_page(snapshot.clients)
+        self._index_cache = (snapshot.version, html)
         return 200, "text/html; charset=utf-8", html
 
     def details(self, client_id: int) -> Tuple[int, str, str]:
@@ -24,6 +34,15 @@ class ClientController:
         return 200, "text/html; charset=utf-8", html
 
     # ---------- API JSON ----------
+    def api_list(self) -> Tuple[int, str, bytes]:
+        """Все клиенты одним JSON-массивом (байты собираются из кэша клиентов)."""
+        snapshot = self.repo.snapshot()
+        cached = self._list_cache
+        if cached is None or cached[0] != snapshot.version:
+            cached = (snapshot.version, encode_clients_json(snapshot.clients))
+            self._list_cache = cached
+        return 200, "application/json; charset=utf-8", cached[1]
+
     def api_get(self, client_id: int) -> Tuple[int, Dict[str, Any]]:
         c = self.repo.get(client_id)
         if not c:
@@ -1,45 +1,34 @@
 import json
-from typing import Dict, Any
+from dataclasses import dataclass, field
+from typing import Dict, Any, Union
+
+from client_schema import CLIENT, CLIENT_ID, CLIENT_SHORT
 
 
 class ClientShort:
     """Базовый класс с краткой информацией о клиенте"""
 
+    # Поля в слотах вместо __dict__: экземпляр заметно компактнее
+    __slots__ = ("__last_name", "__first_name", "__father_name", "__haircut_counter")
+
     def __init__(
         self, last_name: str, first_name: str, father_name: str, haircut_counter: int
     ):
 
-        self._validate_name(last_name, "last_name")
-        self._validate_name(first_name, "first_name")
-        self._validate_name(father_name, "father_name")
-        self._validate_haircut_counter(haircut_counter)
-
+        # Правила полей описаны в client_schema (общие с формами)
+        CLIENT_SHORT.clean(
+            {
+                "last_name": last_name,
+                "first_name": first_name,
+                "father_name": father_name,
+                "haircut_counter": haircut_counter,
+            }
+        )
         self.__last_name = last_name
         self.__first_name = first_name
         self.__father_name = father_name
         self.__haircut_counter = haircut_counter
 
-    # Статические методы валидации
-    @staticmethod
-    def _validate_name(name: str, field_name: str):
-        """Валидация имени, фамилии и отчества"""
-        if not isinstance(name, str):
-            raise ValueError(f"{field_name} должен быть строкой")
-        if not name.strip():
-            raise ValueError(f"{field_name} не может быть пустым")
-        if len(name.strip()) < 2:
-            raise ValueError(f"{field_name} должен содержать минимум 2 символа")
-        if not name.replace(" ", "").isalpha():
-            raise ValueError(f"{field_name} должен содержать только буквы и пробелы")
-
-    @staticmethod
-    def _validate_haircut_counter(haircut_counter: int):
-        """Валидация количества стрижек"""
-        if not isinstance(haircut_counter, int):
-            raise ValueError("haircut_counter должен быть целым числом")
-        if haircut_counter < 0:
-            raise ValueError("haircut_counter не может быть отрицательным")
-
     # Геттеры
     def get_last_name(self) -> str:
         return self.__last_name
@@ -95,6 +84,10 @@ class ClientShort:
 class Client(ClientShort):
     """Класс клиента с полной информацией, наследует от ClientShort"""
 
+    # __encoded — кэш компактного JSON клиента (см. to_json_bytes),
+    # __record — кэш неизменяемого значения (см. to_record)
+    __slots__ = ("__discount", "__id", "__encoded", "__record")
+
     def __init__(self, *args, **kwargs):
 
         if len(args) == 1:
@@ -133,48 +126,31 @@ class Client(ClientShort):
 
     def _init_from_data(self, data: Dict[str, Any]):
         """Инициализация из данных"""
-        # Проверка обязательных полей
-        required_fields = [
-            "first_name",
-            "last_name",
-            "father_name",
-            "haircut_counter",
-            "discount",
-            "id",
-        ]
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            raise ValueError(f"Отсутствуют обязательные поля: {missing_fields}")
-
-        # Валидация скидки
-        self._validate_discount(data["discount"])
-
-        # Вызов конструктора родительского класса
-        super().__init__(
-            data["last_name"],
-            data["first_name"],
-            data["father_name"],
-            data["haircut_counter"],
-        )
-
+        # Все поля (и наличие обязательных) проверяются схемой за один проход
+        self._fill(CLIENT.clean(data))
+
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "Client":
+        """
+        Быстрое создание из данных, которые записал сам репозиторий.
+
+        Разбор аргументов и валидация пропускаются: данные уже проверены
+        при сохранении. Для пользовательского ввода используйте Client(...).
+        """
+        client = cls.__new__(cls)
+        client._fill(data)
+        return client
+
+    def _fill(self, data: Dict[str, Any]):
+        """Заполнить слоты из уже проверенных данных"""
+        self._ClientShort__last_name = data["last_name"]
+        self._ClientShort__first_name = data["first_name"]
+        self._ClientShort__father_name = data["father_name"]
+        self._ClientShort__haircut_counter = data["haircut_counter"]
         self.__discount = data["discount"]
         self.__id = data["id"]
-
-    @staticmethod
-    def _validate_discount(discount: int):
-        """Валидация скидки"""
-        if not isinstance(discount, (int, float)):
-            raise ValueError("discount должен быть числом")
-        if discount < 0 or discount > 100:
-            raise ValueError("discount должен быть в диапазоне от 0 до 100")
-
-    @staticmethod
-    def _validate_id(id: int):
-        """Валидация id"""
-        if not isinstance(id, (int, float)):
-            raise ValueError("id должен быть числом")
-        if id < 0:
-            raise ValueError("id должен быть неотрицательным")
+        self.__encoded = None
+        self.__record = None
 
     # Геттеры
     def get_discount(self) -> int:
@@ -185,12 +161,16 @@ class Client(ClientShort):
 
     # Сеттеры
     def set_discount(self, discount: int):
-        self._validate_discount(discount)
+        CLIENT.check_field("discount", discount)
         self.__discount = discount
+        self.__encoded = None
+        self.__record = None
 
     def set_id(self, id: int):
-        self._validate_id(id)
+        CLIENT_ID.check_field("id", id)
         self.__id = id
+        self.__encoded = None
+        self.__record = None
 
     # Методы преобразования
     def to_string(self) -> str:
@@ -209,6 +189,25 @@ class Client(ClientShort):
         """Преобразование в JSON строку"""
         return json.dumps(self.to_dict(), ensure_ascii=False)
 
+    def to_json_bytes(self) -> bytes:
+        """
+        Компактный JSON клиента в UTF-8.
+
+        Результат кэшируется до следующего изменения (set_id / set_discount),
+        поэтому повторная сериализация списков почти ничего не стоит.
+        """
+        if self.__encoded is None:
+            self.__encoded = json.dumps(
+                self.to_dict(), ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+        return self.__encoded
+
+    def to_record(self) -> "ClientRecord":
+        """Неизменяемое хешируемое значение клиента (кэшируется до изменения)"""
+        if self.__record is None:
+            self.__record = ClientRecord.from_client(self)
+        return self.__record
+
     def to_short_version(self) -> ClientShort:
         """Создает краткую версию клиента (без скидки и id)"""
         return ClientShort(
@@ -240,6 +239,71 @@ class Client(ClientShort):
         )
 
 
+@dataclass(frozen=True)
+class ClientRecord:
+    """
+    Неизменяемое значение клиента: годится в ключи dict и элементы set.
+
+    Хеш считается один раз при создании, поэтому проверки вхождения
+    и поиск в кэшах стоят O(1) без повторного обхода полей.
+    """
+
+    last_name: str
+    first_name: str
+    father_name: str
+    haircut_counter: int
+    discount: Union[int, float]
+    id: int
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(
+            self,
+            "_hash",
+            hash((self.last_name, self.first_name, self.father_name,
+                  self.haircut_counter, self.discount, self.id)),
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    @classmethod
+    def from_client(cls, client: Client) -> "ClientRecord":
+        return cls(
+            client.get_last_name(),
+            client.get_first_name(),
+            client.get_father_name(),
+            client.get_haircut_counter(),
+            client.get_discount(),
+            client.get_id(),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ClientRecord":
+        return cls(
+            data["last_name"],
+            data["first_name"],
+            data["father_name"],
+            data["haircut_counter"],
+            data["discount"],
+            data["id"],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "last_name": self.last_name,
+            "first_name": self.first_name,
+            "father_name": self.father_name,
+            "haircut_counter": self.haircut_counter,
+            "discount": self.discount,
+            "id": self.id,
+        }
+
+    def to_client(self) -> Client:
+        """Изменяемый Client с теми же значениями (значения уже проверены)"""
+        return Client.from_trusted(self.to_dict())
+
+
 # client_1 = Client('Андрей', 'Сушко', 'Ник', 13, 25, 1)
 # print(client_1)
 # print(str(client_1))
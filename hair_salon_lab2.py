@@ -1,43 +1,448 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Union
+import base64
+import bisect
+import hashlib
+import heapq
 import json
+import marshal
 import os
+import tempfile
+import threading
+import time
 
 import psycopg2
 from psycopg2 import sql
+from psycopg2.extras import execute_values
 import yaml
 
-from hair_salon_lab1_task9 import Client
+from client_schema import CLIENT
+from hair_salon_lab1_task9 import Client, ClientRecord
+
+try:
+    import fcntl
+except ImportError:  # Windows: межпроцессные блокировки недоступны
+    fcntl = None
+
+# libyaml (C) на порядки быстрее чистого Python; берём его, если PyYAML собран с ним
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
+
+def atomic_write(path: str, payload: bytes) -> None:
+    """
+    Записать файл целиком без риска обрезать его при сбое:
+    временный файл рядом с целевым -> fsync -> os.replace.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # fsync каталога, чтобы сам os.replace пережил сбой питания (только POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+_NAME_FIELDS = ("last_name", "first_name", "father_name")
+
+
+def encode_clients_json(clients: Iterable[Client]) -> bytes:
+    """
+    Список клиентов одним компактным JSON-массивом в UTF-8.
+
+    Склеивает кэшированные кодировки клиентов (Client.to_json_bytes),
+    без промежуточных dict и повторного json.dumps.
+    """
+    return b"[" + b",".join(c.to_json_bytes() for c in clients) + b"]"
+
+
+class _QueuedChange:
+    """Изменение, ожидающее записи в рамках group commit."""
+
+    __slots__ = ("apply", "result", "error", "done")
+
+    def __init__(self, apply: Callable[[], Any]) -> None:
+        self.apply = apply
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+@dataclass
+class BulkResult:
+    """Результат одной строки пакетной операции (add_many / replace_many / delete_many)."""
+
+    index: int                  # номер строки во входных данных
+    ok: bool
+    id: Optional[int] = None    # id клиента (для add_many — выданный)
+    error: Optional[str] = None
+
+
+BULK_NOT_UNIQUE = "Клиент не уникален"
+BULK_NOT_FOUND = "Клиент не найден"
+
+
+# Колонки, по которым возможна курсорная пагинация, и соответствующие геттеры
+PAGE_SORT_COLUMNS: Dict[str, Callable[[Client], Any]] = {
+    "id": lambda c: c.get_id(),
+    "last_name": lambda c: c.get_last_name(),
+    "haircut_counter": lambda c: c.get_haircut_counter(),
+    "discount": lambda c: c.get_discount(),
+}
+# Допустимые типы значения sort-колонки в курсоре
+_PAGE_SORT_TYPES: Dict[str, Tuple[type, ...]] = {
+    "id": (int,),
+    "last_name": (str,),
+    "haircut_counter": (int,),
+    "discount": (int, float),
+}
+
+
+def encode_page_cursor(sort: str, value: Any, client_id: int) -> str:
+    """Непрозрачный токен продолжения: позиция последнего клиента страницы."""
+    raw = json.dumps([sort, value, client_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_page_cursor(token: str, sort: str) -> Tuple[Any, int]:
+    """Разобрать токен продолжения; возвращает (значение sort-колонки, id)."""
+    try:
+        cursor_sort, value, client_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Некорректный курсор страницы") from exc
+    if cursor_sort != sort:
+        raise ValueError("Курсор получен для другой сортировки")
+    # bool — подкласс int, но в курсоре его быть не может
+    if (
+        not isinstance(client_id, int) or isinstance(client_id, bool)
+        or not isinstance(value, _PAGE_SORT_TYPES.get(sort, ())) or isinstance(value, bool)
+    ):
+        raise ValueError("Некорректный курсор страницы")
+    return value, client_id
+
+
+def _check_page_sort(sort: str) -> None:
+    if sort not in PAGE_SORT_COLUMNS:
+        raise ValueError(f"Сортировка по {sort} не поддерживается")
 
 
 class ClientRepBase(ABC):
-    def __init__(self, file_path: str) -> None:
+    # Межпроцессная защита файла: блокировки fcntl и версия данных
+    # в <file_path>.meta (см. _file_lock, _write_guard)
+    process_lock = False
+    # Данные хранилища записаны самим репозиторием: при чтении клиенты
+    # создаются через Client.from_trusted без повторной валидации
+    trusted_storage = True
+    # Одинаковые ФИО загруженных клиентов ссылаются на одну строку (см. _names)
+    intern_names = True
+    # Чтения по id и страницами идут прямо в хранилище, а перед изменениями
+    # репозиторий сам сверяется с ним: обёрткам (ClientRepoAdapter) не нужно
+    # вызывать reload_if_changed перед каждым обращением
+    reads_storage_directly = False
+
+    def __init__(self, file_path: str, group_commit_ms: float = 0) -> None:
         self.file_path = file_path
+        self.lock_path = file_path + ".lock"
+        self.meta_path = file_path + ".meta"
+        self._lock_depth = 0
+        # Окно group commit в миллисекундах (0 — писать каждое изменение сразу)
+        self.group_commit_ms = group_commit_ms
+        self._lock = threading.RLock()
+        self._commit_cond = threading.Condition()
+        self._commit_queue: List[_QueuedChange] = []
+        self._committing = False
         self.items: List[Client] = []
+        # Индекс id -> позиция в self.items
+        self._id_index: Dict[int, int] = {}
+        # Индекс уникальности (фамилия, кол-во стрижек) -> id; множество id
+        # заводится только при совпадении ключей (данные из чужого источника)
+        self._unique_index: Dict[Tuple[str, int], Union[int, Set[int]]] = {}
+        # Подпись файла на момент последнего чтения/записи (см. reload_if_changed)
+        self._loaded_signature: Optional[tuple] = None
+        # Изменения, ещё не сохранённые в хранилище: ("put", client) / ("delete", client)
+        self._pending_changes: List[Tuple[str, Client]] = []
+        # Номер версии данных в памяти: растёт при каждом изменении и перечитывании
+        self._version = 0
+        # Наибольший id, встречавшийся в данных, и следующий за последним выданным
+        self._max_id = 0
+        self._next_id = 0
+        # Подписчики на изменения данных (см. add_change_listener)
+        self._change_listeners: List[Callable[[str, Optional[Client], int], None]] = []
+        # Словарь имён хранилища: строка -> её единственный экземпляр
+        self._names: Dict[str, str] = {}
+        # Порядок клиентов для get_page: sort -> (версия, клиенты, ключи (sort, id))
+        self._page_orders: Dict[str, Tuple[int, List[Client], List[Tuple[Any, int]]]] = {}
         self.read_all()
 
     # a. Чтение всех значений из файла / хранилища
     def read_all(self) -> None:
-        if not os.path.exists(self.file_path):
-            self.items = []
-            return
-        raw = self._load_from_storage()
-        self.items = [Client(d) for d in (raw or [])]
+        with self._file_lock(exclusive=False):
+            # Подпись снимается до чтения: если файл поменяют во время загрузки,
+            # следующая проверка это заметит и перечитает его ещё раз.
+            signature = self._storage_signature()
+            # Словарь собирается заново, чтобы не держать имена удалённых клиентов
+            self._names = {}
+            if signature is None:
+                self.items = []
+            else:
+                raw = self._load_from_storage()
+                self.items = [self._client_from_storage(d) for d in (raw or [])]
+            self._reindex()
+            self._loaded_signature = signature
+            self._version += 1
+            self._notify_change("reload", None)
+
+    def _client_from_storage(self, data: dict) -> Client:
+        if not self.trusted_storage:
+            # Записи, правленые вручную, проверяются до интернирования имён:
+            # пропущенное поле или список вместо строки — ValueError, как в Client
+            if not isinstance(data, dict):
+                raise ValueError("Не поддерживаемый тип аргумента")
+            data = CLIENT.clean(data)
+        if self.intern_names:
+            # data — свежий dict из хранилища, его можно менять на месте
+            names = self._names
+            for key in _NAME_FIELDS:
+                value = data[key]
+                data[key] = names.setdefault(value, value)
+        return Client.from_trusted(data)
+
+    @property
+    def version(self) -> int:
+        """Версия данных в памяти (для кэшей поверх репозитория)."""
+        return self._version
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Блокировка репозитория (повторно входимая): пока она взята, данные
+        в памяти не меняются — например, чтобы снять согласованную копию items.
+        """
+        with self._lock:
+            yield
+
+    def add_change_listener(self, listener: Callable[[str, Optional[Client], int], None]) -> None:
+        """
+        Подписаться на изменения данных в памяти.
+
+        listener(op, client, version) вызывается под блокировкой репозитория:
+        op — "put" / "delete" для отдельного клиента или "reload", когда
+        данные перечитаны целиком (client=None); version — новая версия.
+        """
+        with self._lock:
+            self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: Callable[[str, Optional[Client], int], None]) -> None:
+        with self._lock:
+            if listener in self._change_listeners:
+                self._change_listeners.remove(listener)
+
+    def _notify_change(self, op: str, client: Optional[Client]) -> None:
+        for listener in self._change_listeners:
+            listener(op, client, self._version)
+
+    def _storage_signature(self) -> Optional[tuple]:
+        """
+        (st_mtime_ns, st_size, st_ino) файла хранилища или None, если файла нет.
+
+        При process_lock впереди добавляется версия данных из .meta.
+        """
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        if self.process_lock:
+            return self._read_disk_version(), st.st_mtime_ns, st.st_size, st.st_ino
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    # ---------- межпроцессная защита ----------
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """
+        Разделяемая (чтение) или исключительная (запись) блокировка flock
+        на <file_path>.lock. Повторный вход из того же репозитория не
+        блокирует: исключительная блокировка покрывает и чтение.
+        """
+        with self._lock:
+            if not self.process_lock or fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            # Отдельный файл блокировки: сам файл данных заменяется через
+            # os.replace, и блокировка на нём потерялась бы вместе со старым inode
+            with open(self.lock_path, "a+") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def _write_guard(self) -> Iterator[None]:
+        """
+        Исключительная блокировка на время применения и записи изменений.
+
+        Если другой процесс успел записать файл, изменения применяются
+        к свежим данным, а не затирают чужую запись.
+        """
+        with self._file_lock(exclusive=True):
+            if self.process_lock and self._storage_signature() != self._loaded_signature:
+                self.read_all()
+            yield
+
+    def _read_meta(self) -> Dict[str, int]:
+        """Содержимое <file_path>.meta: version и next_id (пусто, если файла нет)."""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return meta if isinstance(meta, dict) else {}
+
+    def _write_meta(self, meta: Dict[str, int]) -> None:
+        atomic_write(self.meta_path, json.dumps(meta).encode("utf-8"))
+
+    def _read_disk_version(self) -> int:
+        """Версия данных из <file_path>.meta (0, если её ещё нет)."""
+        return int(self._read_meta().get("version", 0))
+
+    def _bump_disk_version(self) -> None:
+        meta = self._read_meta()
+        meta["version"] = int(meta.get("version", 0)) + 1
+        self._write_meta(meta)
+
+    def _reserve_ids(self, count: int) -> int:
+        """
+        Выделить count идущих подряд новых id и вернуть первый из них.
+
+        Последовательность хранится в .meta (next_id) и только растёт, поэтому
+        id удалённых клиентов не выдаются повторно. Резервируется ровно count
+        id: пакет add_many получает свои id одной записью .meta, одиночный
+        add — один id, так что после перезапуска и между процессами
+        в id не остаётся пропусков.
+        """
+        with self._file_lock(exclusive=True):
+            meta = self._read_meta()
+            first = max(int(meta.get("next_id", 0)), self._max_id + 1, self._next_id)
+            self._next_id = first + count
+            meta["next_id"] = self._next_id
+            self._write_meta(meta)
+            return first
+
+    def reload_if_changed(self) -> bool:
+        """
+        Перечитать хранилище, только если файл изменился с момента
+        последнего чтения или записи этим репозиторием.
+
+        Возвращает True, если данные были перезагружены.
+        """
+        with self._lock:
+            if self._storage_signature() == self._loaded_signature:
+                return False
+            self.read_all()
+            return True
+
+    def _reindex(self, start: int = 0) -> None:
+        """
+        Перестроить индексы.
+
+        При start == 0 строятся заново оба индекса, иначе пересчитываются
+        только позиции клиентов, начиная со start (после удаления).
+        """
+        if start == 0:
+            self._id_index = {}
+            self._unique_index = {}
+            for c in self.items:
+                self._unique_add(c)
+            self._max_id = max(self._max_id, max((c.get_id() for c in self.items), default=0))
+        for i in range(start, len(self.items)):
+            self._id_index[self.items[i].get_id()] = i
+
+    @staticmethod
+    def _unique_key(client: Client) -> Tuple[str, int]:
+        return client.get_last_name(), client.get_haircut_counter()
+
+    def _index_client(self, client: Client, pos: int) -> None:
+        """Добавить клиента, стоящего на позиции pos, в индексы."""
+        self._id_index[client.get_id()] = pos
+        self._max_id = max(self._max_id, client.get_id())
+        self._unique_add(client)
+
+    def _unique_add(self, client: Client) -> None:
+        key = self._unique_key(client)
+        client_id = client.get_id()
+        ids = self._unique_index.get(key)
+        if ids is None:
+            self._unique_index[key] = client_id
+        elif isinstance(ids, set):
+            ids.add(client_id)
+        elif ids != client_id:
+            self._unique_index[key] = {ids, client_id}
+
+    def _unindex_unique(self, client: Client) -> None:
+        """Убрать клиента из индекса уникальности."""
+        key = self._unique_key(client)
+        client_id = client.get_id()
+        ids = self._unique_index.get(key)
+        if isinstance(ids, set):
+            ids.discard(client_id)
+            if len(ids) == 1:
+                self._unique_index[key] = ids.pop()
+        elif ids == client_id:
+            del self._unique_index[key]
 
     # b. Запись всех значений в файл / хранилище
     def write_all(self, file_name: Optional[str] = None) -> None:
-        data = [c.to_dict() for c in self.items]
+        if file_name is not None and file_name != self.file_path:
+            self._dump_clients(self.items, file_name=file_name)
+            return
+        with self._file_lock(exclusive=True):
+            self._dump_clients(self.items, file_name=file_name)
+            if self.process_lock:
+                self._bump_disk_version()
+            # Файл записан нами — перечитывать его не нужно
+            self._loaded_signature = self._storage_signature()
+
+    def dump_records(self, data: List[dict], file_name: Optional[str] = None) -> None:
+        """
+        Записать готовые записи (dict) в формате этого репозитория, минуя self.items.
+
+        Используется конвертером форматов (repo_binary.convert).
+        """
         self._dump_to_storage(data, file_name=file_name)
 
     # c. Получить объект по ID
     def get_by_id(self, client_id: int) -> Optional[Client]:
-        if client_id >= 0:
-            for client in self.items:
-                if client.get_id() == client_id:
-                    return client
-        return None
+        pos = self._id_index.get(client_id)
+        if pos is None or client_id < 0:
+            return None
+        return self.items[pos]
 
     # d. Пагинация: k-я страница по n элементов
     def get_k_n_short_list(self, k: int, n: int) -> List[Client]:
@@ -47,6 +452,49 @@ class ClientRepBase(ABC):
             return self.items[start:end]
         return []
 
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        n: int = 20,
+        sort: str = "id",
+    ) -> Tuple[List[Client], Optional[str]]:
+        """
+        Курсорная пагинация: n клиентов, следующих за cursor в порядке (sort, id).
+
+        Возвращает страницу и токен следующей страницы (None — страниц больше нет).
+        """
+        _check_page_sort(sort)
+        if n <= 0:
+            return [], None
+
+        ordered, keys = self._page_order(sort)
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(keys, decode_page_cursor(cursor, sort))
+
+        page = ordered[start:start + n]
+        next_cursor = None
+        if len(page) == n and start + n < len(ordered):
+            next_cursor = encode_page_cursor(sort, *keys[start + n - 1])
+        return page, next_cursor
+
+    def _page_order(self, sort: str) -> Tuple[List[Client], List[Tuple[Any, int]]]:
+        """
+        Клиенты в порядке (sort, id) и их ключи для bisect.
+
+        Сортировка выполняется один раз на версию данных: любое изменение
+        или перечитывание меняет self._version, и порядок строится заново.
+        """
+        version = self._version
+        cached = self._page_orders.get(sort)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        getter = PAGE_SORT_COLUMNS[sort]
+        ordered = sorted(self.items, key=lambda c: (getter(c), c.get_id()))
+        keys = [(getter(c), c.get_id()) for c in ordered]
+        self._page_orders[sort] = (version, ordered, keys)
+        return ordered, keys
+
     # e. Сортировка по выбранному полю (по умолчанию по фамилии)
     def sort_by(self, param: str = "last_name") -> None:
         key_map = {
@@ -56,54 +504,233 @@ class ClientRepBase(ABC):
             "last_name": lambda x: x.get_last_name(),
         }
         key_fn = key_map.get(param, key_map["last_name"])
-        self.items.sort(key=key_fn)
-
-    def _is_unique(self, client: Client) -> bool:
-        """Проверка уникальности клиента по (фамилия, количество стрижек)."""
-        for c in self.items:
-            if (
-                c.get_last_name() == client.get_last_name()
-                and c.get_haircut_counter() == client.get_haircut_counter()
-            ):
-                return False
-        return True
+        with self._lock:
+            self.items.sort(key=key_fn)
+            self._reindex()
+            self._version += 1
+
+    def _is_unique(self, client: Client, exclude_id: Optional[int] = None) -> bool:
+        """
+        Проверка уникальности клиента по (фамилия, количество стрижек).
+
+        exclude_id — id клиента, который заменяется: совпадение ключа
+        с ним самим конфликтом не считается.
+        """
+        ids = self._unique_index.get(self._unique_key(client))
+        if ids is None:
+            return True
+        # Множество — уже несколько клиентов с этим ключом: конфликт в любом случае
+        return not isinstance(ids, set) and ids == exclude_id
 
     # f. Добавить объект (сформировать новый ID)
     def add(self, client: Client) -> Optional[int]:
-        if self._is_unique(client):
-            new_id = self._generate_new_id()
-            client.set_id(new_id)
-            self.items.append(client)
-            self.write_all()
-            return new_id
-        return None
+        return self._execute(lambda: self._apply_add(client))
 
     # g. Заменить по ID
     def replace_by_id(self, client_id: int, new_client: Client) -> bool:
-        if client_id >= 0 and self._is_unique(new_client):
-            for i, c in enumerate(self.items):
-                if c.get_id() == client_id:
-                    new_client.set_id(client_id)
-                    self.items[i] = new_client
-                    self.write_all()
-                    return True
-        return False
+        return self._execute(lambda: self._apply_replace(client_id, new_client))
 
     # h. Удалить по ID
     def delete_by_id(self, client_id: int) -> bool:
-        for i, c in enumerate(self.items):
-            if c.get_id() == client_id:
-                del self.items[i]
-                self.write_all()
-                return True
-        return False
+        return self._execute(lambda: self._apply_delete(client_id))
+
+    # Пакетные операции: одна проверка уникальности, один блок id
+    # и одна запись в хранилище на весь пакет.
+    def add_many(self, clients: Iterable[Client]) -> List[BulkResult]:
+        clients = list(clients)
+        return self._execute(lambda: self._apply_add_many(clients))
+
+    def replace_many(self, replacements: Iterable[Tuple[int, Client]]) -> List[BulkResult]:
+        replacements = list(replacements)
+        return self._execute(lambda: self._apply_replace_many(replacements))
+
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]:
+        client_ids = list(client_ids)
+        return self._execute(lambda: self._apply_delete_many(client_ids))
+
+    # Применение изменений к self.items (вызываются под self._lock)
+    def _apply_add(self, client: Client) -> Optional[int]:
+        if not self._is_unique(client):
+            return None
+        new_id = self._generate_new_id()
+        client.set_id(new_id)
+        self.items.append(client)
+        self._index_client(client, len(self.items) - 1)
+        self._record_change("put", client)
+        return new_id
+
+    def _apply_replace(self, client_id: int, new_client: Client) -> bool:
+        pos = self._id_index.get(client_id)
+        if pos is None or client_id < 0 or not self._is_unique(new_client, client_id):
+            return False
+        new_client.set_id(client_id)
+        self._unindex_unique(self.items[pos])
+        self.items[pos] = new_client
+        self._index_client(new_client, pos)
+        self._record_change("put", new_client)
+        return True
+
+    def _apply_delete(self, client_id: int) -> bool:
+        pos = self._id_index.pop(client_id, None)
+        if pos is None:
+            return False
+        removed = self.items.pop(pos)
+        self._unindex_unique(removed)
+        # позиции всех клиентов после удалённого сдвинулись на 1
+        self._reindex(pos)
+        self._record_change("delete", removed)
+        return True
+
+    def _apply_add_many(self, clients: List[Client]) -> List[BulkResult]:
+        results: List[BulkResult] = []
+        accepted: List[Client] = []
+        batch_keys: Set[Tuple[str, int]] = set()
+        for i, client in enumerate(clients):
+            key = self._unique_key(client)
+            if key in batch_keys or not self._is_unique(client):
+                results.append(BulkResult(i, False, error=BULK_NOT_UNIQUE))
+                continue
+            batch_keys.add(key)
+            accepted.append(client)
+            results.append(BulkResult(i, True))
+
+        # id для всего пакета резервируются одним блоком
+        next_id = self._reserve_ids(len(accepted)) if accepted else 0
+        for result, client in zip((r for r in results if r.ok), accepted):
+            client.set_id(next_id)
+            result.id = next_id
+            next_id += 1
+            self.items.append(client)
+            self._index_client(client, len(self.items) - 1)
+            self._record_change("put", client)
+        return results
+
+    def _apply_replace_many(self, replacements: List[Tuple[int, Client]]) -> List[BulkResult]:
+        results: List[BulkResult] = []
+        for i, (client_id, new_client) in enumerate(replacements):
+            if client_id < 0 or client_id not in self._id_index:
+                results.append(BulkResult(i, False, client_id, BULK_NOT_FOUND))
+            elif self._apply_replace(client_id, new_client):
+                results.append(BulkResult(i, True, client_id))
+            else:
+                results.append(BulkResult(i, False, client_id, BULK_NOT_UNIQUE))
+        return results
+
+    def _apply_delete_many(self, client_ids: List[int]) -> List[BulkResult]:
+        results: List[BulkResult] = []
+        removed_ids: Set[int] = set()
+        first_pos = len(self.items)
+        for i, client_id in enumerate(client_ids):
+            pos = self._id_index.get(client_id)
+            if pos is None or client_id in removed_ids:
+                results.append(BulkResult(i, False, client_id, BULK_NOT_FOUND))
+                continue
+            removed_ids.add(client_id)
+            first_pos = min(first_pos, pos)
+            results.append(BulkResult(i, True, client_id))
+
+        if removed_ids:
+            # Один проход по списку вместо сдвига позиций после каждого удаления
+            kept: List[Client] = []
+            for client in self.items:
+                if client.get_id() in removed_ids:
+                    del self._id_index[client.get_id()]
+                    self._unindex_unique(client)
+                    self._record_change("delete", client)
+                else:
+                    kept.append(client)
+            self.items = kept
+            self._reindex(first_pos)
+        return results
+
+    def _execute(self, apply: Callable[[], Any]) -> Any:
+        """
+        Применить изменение и дождаться его записи на диск.
+
+        Без group commit каждое изменение сохраняется сразу. С group commit
+        изменения, пришедшие в течение group_commit_ms, сохраняются одной
+        записью, а вызывающий поток возвращается только после неё.
+        """
+        if not self.group_commit_ms:
+            with self._write_guard():
+                result = apply()
+                self._flush_or_rollback()
+            return result
+        return self._group_commit(apply)
+
+    def _group_commit(self, apply: Callable[[], Any]) -> Any:
+        op = _QueuedChange(apply)
+        with self._commit_cond:
+            self._commit_queue.append(op)
+            while not op.done and self._committing:
+                self._commit_cond.wait()
+            if op.done:
+                if op.error is not None:
+                    raise op.error
+                return op.result
+            # Никто не пишет — этот поток становится «лидером» группы
+            self._committing = True
+
+        batch: List[_QueuedChange] = []
+        try:
+            time.sleep(self.group_commit_ms / 1000)
+            with self._commit_cond:
+                batch, self._commit_queue = self._commit_queue, []
+            with self._write_guard():
+                for queued in batch:
+                    try:
+                        queued.result = queued.apply()
+                    except Exception as exc:  # noqa: BLE001
+                        queued.error = exc
+                try:
+                    self._flush_or_rollback()
+                except Exception as exc:  # noqa: BLE001
+                    for queued in batch:
+                        queued.error = exc
+        finally:
+            with self._commit_cond:
+                for queued in batch:
+                    queued.done = True
+                self._committing = False
+                self._commit_cond.notify_all()
+
+        if op.error is not None:
+            raise op.error
+        return op.result
+
+    def _flush_or_rollback(self) -> None:
+        """Сохранить изменения; при ошибке вернуть self.items к данным на диске."""
+        try:
+            self._flush_changes()
+        except Exception:
+            self._pending_changes.clear()
+            self.read_all()
+            raise
+
+    def _record_change(self, op: str, client: Client) -> None:
+        """Запомнить изменение ("put" или "delete") до ближайшего сохранения."""
+        self._pending_changes.append((op, client))
+        self._version += 1
+        self._notify_change(op, client)
+
+    def _flush_changes(self) -> None:
+        """
+        Сохранить накопленные изменения.
+
+        По умолчанию файл переписывается целиком; наследники с более
+        дешёвым способом записи (журнал, шарды) переопределяют этот метод.
+        """
+        if not self._pending_changes:
+            return  # операция ничего не изменила
+        self._pending_changes.clear()
+        self.write_all()
 
     # i. Кол-во элементов
     def get_count(self) -> int:
         return len(self.items)
 
     def _generate_new_id(self) -> int:
-        return max((c.get_id() for c in self.items), default=0) + 1
+        return self._reserve_ids(1)
 
     def print_all(self) -> None:
         """Вывод всех клиентов."""
@@ -114,6 +741,10 @@ class ClientRepBase(ABC):
         for i, client in enumerate(self.items):
             print(f"{i}: {client}")
 
+    def _dump_clients(self, clients: List[Client], file_name: Optional[str] = None) -> None:
+        """Записать клиентов; форматы с быстрой сериализацией переопределяют."""
+        self._dump_to_storage([c.to_dict() for c in clients], file_name=file_name)
+
     # Абстрактные «крючки» для формата хранения
     @abstractmethod
     def _load_from_storage(self) -> List[dict]:
@@ -128,32 +759,290 @@ class ClientRepBase(ABC):
         raise NotImplementedError
 
 
-class ClientRepJson(ClientRepBase):
-    def __init__(self, file_path: str = "clients.json") -> None:
-        super().__init__(file_path)
+def iter_json_array(f: TextIO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Потоково перебрать элементы JSON-массива верхнего уровня.
+
+    Файл читается кусками по chunk_size символов, в памяти одновременно
+    находятся только текущий кусок и разбираемый элемент.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Пропускаем пробелы и запятые между элементами, дочитывая файл
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            buf, pos = f.read(chunk_size), 0
+            eof = not buf
+
+        if pos >= len(buf):
+            if not started:
+                return  # пустой файл
+            raise ValueError("Неожиданный конец JSON-массива")
+
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Ожидался JSON-массив")
+            started = True
+            pos += 1
+            continue
+
+        if buf[pos] == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            obj, end = None, len(buf)
+        if end == len(buf) and not eof:
+            # Элемент мог оборваться на границе куска — дочитываем и разбираем снова
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        yield obj
+        pos = end
+
+
+class LazyItemsMixin:
+    """
+    Клиенты загружаются в self.items только при первом изменении (или первом
+    обращении к items). До этого чтения идут прямо из хранилища через
+    iter_records, а read_all лишь запоминает подпись файла.
+
+    Наследник задаёт self._materialized = False до ClientRepBase.__init__,
+    чтобы включить отложенную загрузку.
+    """
+
+    _materialized = True
+
+    @property
+    def items(self) -> List[Client]:
+        if not self._materialized:
+            self._materialize()
+        return self._items
+
+    @items.setter
+    def items(self, value: List[Client]) -> None:
+        self._items = value
+
+    @property
+    def stream_reads(self) -> bool:
+        """Чтения идут прямо из хранилища: клиенты ещё не загружены в память."""
+        return not self._materialized
+
+    def _materialize(self) -> None:
+        """Загрузить все записи в self.items."""
+        with self._lock:
+            if self._materialized:
+                return
+            self._materialized = True
+            try:
+                super().read_all()
+            except BaseException:
+                self._materialized = False
+                raise
+
+    def read_all(self) -> None:
+        if self._materialized:
+            super().read_all()
+            return
+        # Записи читаются по запросу: запоминаем только подпись файла
+        with self._lock:
+            signature = self._storage_signature()
+            self._items = []
+            self._open_storage()
+            self._loaded_signature = signature
+            self._version += 1
+            self._notify_change("reload", None)
+
+    def _open_storage(self) -> None:
+        """Подготовить чтение записей без загрузки (например, отобразить файл в память)."""
+
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать записи хранилища (dict) по одной."""
+        raise NotImplementedError
+
+    def _execute(self, apply: Callable[[], Any]) -> Any:
+        self._materialize()
+        return super()._execute(apply)
+
+    def get_by_id(self, client_id: int) -> Optional[Client]:
+        if not self.stream_reads:
+            return super().get_by_id(client_id)
+        if client_id < 0:
+            return None
+        for record in self.iter_records():
+            if record.get("id") == client_id:
+                return self._client_from_storage(record)
+        return None
+
+    def get_count(self) -> int:
+        if self.stream_reads:
+            return self.stream_count()
+        return super().get_count()
+
+    def stream_page(
+        self,
+        k: int,
+        n: int,
+        filter_fn: Optional[Callable[[Client], bool]] = None,
+        record_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> List[Client]:
+        """
+        k-я страница по n клиентов, прочитанная из хранилища потоково.
+
+        Без фильтров чтение останавливается после k*n записей, а Client
+        создаётся только для записей самой страницы. record_filter
+        проверяет «сырой» dict до создания Client; filter_fn требует Client,
+        поэтому он создаётся для каждой записи, прошедшей record_filter.
+        """
+        if n <= 0 or k <= 0:
+            return []
+
+        to_skip = (k - 1) * n
+        page: List[Client] = []
+        for record in self.iter_records():
+            if record_filter is not None and not record_filter(record):
+                continue
+            client = None
+            if filter_fn is not None:
+                client = self._client_from_storage(record)
+                if not filter_fn(client):
+                    continue
+            if to_skip:
+                to_skip -= 1
+                continue
+            page.append(client or self._client_from_storage(record))
+            if len(page) == n:
+                break
+        return page
+
+    def stream_count(
+        self,
+        filter_fn: Optional[Callable[[Client], bool]] = None,
+        record_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> int:
+        """Количество записей (подходящих под фильтры), прочитанное потоково."""
+        count = 0
+        for record in self.iter_records():
+            if record_filter is not None and not record_filter(record):
+                continue
+            if filter_fn is not None and not filter_fn(self._client_from_storage(record)):
+                continue
+            count += 1
+        return count
+
+    def get_k_n_short_list(self, k: int, n: int) -> List[Client]:
+        if self.stream_reads:
+            return self.stream_page(k, n)
+        return super().get_k_n_short_list(k, n)
+
+
+class ClientRepJson(LazyItemsMixin, ClientRepBase):
+    def __init__(
+        self,
+        file_path: str = "clients.json",
+        group_commit_ms: float = 0,
+        streaming: bool = False,
+        process_lock: bool = False,
+        compact: bool = False,
+    ) -> None:
+        # streaming=True: страницы и подсчёт читаются из файла потоково,
+        # без разбора всего массива на каждый запрос; self.items
+        # загружаются только при первом изменении (см. _materialize)
+        self.streaming = streaming
+        self._materialized = not streaming
+        # compact=True: файл пишется без отступов из кэшированных кодировок клиентов
+        self.compact = compact
+        # process_lock=True: с файлом работают несколько процессов (см. ClientRepBase)
+        self.process_lock = process_lock
+        super().__init__(file_path, group_commit_ms)
+
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать записи файла по одной, не загружая его целиком."""
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            yield from iter_json_array(f)
 
     def _load_from_storage(self) -> List[dict]:
         with open(self.file_path, "r", encoding="utf-8") as f:
             return json.load(f) or []
 
+    def _dump_clients(self, clients: List[Client], file_name: Optional[str] = None) -> None:
+        if not self.compact:
+            super()._dump_clients(clients, file_name=file_name)
+            return
+        atomic_write(file_name or self.file_path, encode_clients_json(clients))
+
     def _dump_to_storage(
         self,
         data: List[dict],
         file_name: Optional[str] = None,
     ) -> None:
         path = file_name or self.file_path
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if self.compact:
+            payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2)
+        atomic_write(path, payload.encode("utf-8"))
 
 
 class ClientRepYaml(ClientRepBase):
-    def __init__(self, file_path: str = "clients.yaml") -> None:
-        super().__init__(file_path)
+    """
+    Репозиторий клиентов в YAML.
+
+    YAML правят руками, поэтому записи при чтении всегда валидируются.
+
+    При snapshot_cache=True рядом с файлом хранится <file_path>.cache —
+    уже разобранный снимок (marshal) с подписью и хэшем исходного YAML.
+    Пока YAML не меняли, чтение берёт данные из него и не разбирает YAML.
+    """
+
+    SNAPSHOT_FORMAT = 1
+    trusted_storage = False
+
+    def __init__(
+        self,
+        file_path: str = "clients.yaml",
+        group_commit_ms: float = 0,
+        snapshot_cache: bool = False,
+        process_lock: bool = False,
+    ) -> None:
+        self.snapshot_cache = snapshot_cache
+        self.snapshot_path = file_path + ".cache"
+        self.process_lock = process_lock
+        super().__init__(file_path, group_commit_ms)
 
     def _load_from_storage(self) -> List[dict]:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-            return data or []
+        signature = self._storage_signature()
+        with open(self.file_path, "rb") as f:
+            raw = f.read()
+
+        if self.snapshot_cache:
+            digest = hashlib.sha256(raw).hexdigest()
+            snapshot = self._read_snapshot()
+            if snapshot is not None and snapshot["sha256"] == digest:
+                if tuple(snapshot["signature"]) != signature:
+                    # Файл «тронули», но содержимое то же — обновляем подпись
+                    self._write_snapshot(snapshot["data"], signature, digest)
+                return snapshot["data"]
+
+        data = yaml.load(raw, Loader=YamlLoader) or []
+        if self.snapshot_cache:
+            self._write_snapshot(data, signature, digest)
+        return data
 
     def _dump_to_storage(
         self,
@@ -161,56 +1050,368 @@ class ClientRepYaml(ClientRepBase):
         file_name: Optional[str] = None,
     ) -> None:
         path = file_name or self.file_path
-        with open(path, "w", encoding="utf-8") as f:
-            yaml.safe_dump(
+        payload = yaml.dump(
+            data,
+            Dumper=YamlDumper,
+            allow_unicode=True,
+            sort_keys=False,
+            indent=2,
+            default_flow_style=False,
+        ).encode("utf-8")
+        atomic_write(path, payload)
+        if self.snapshot_cache and path == self.file_path:
+            self._write_snapshot(
                 data,
-                f,
-                allow_unicode=True,
-                sort_keys=False,
-                indent=2,
-                default_flow_style=False,
+                self._storage_signature(),
+                hashlib.sha256(payload).hexdigest(),
             )
 
+    # ---------- снимок ----------
+    def _read_snapshot(self) -> Optional[dict]:
+        """Прочитать снимок; None, если его нет или он повреждён."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("format") != self.SNAPSHOT_FORMAT:
+            return None
+        return snapshot
+
+    def _write_snapshot(self, data: List[dict], signature: Optional[tuple], digest: str) -> None:
+        # Снимок — только кэш: если сохранить его не удалось, работаем без него
+        try:
+            payload = marshal.dumps({
+                "format": self.SNAPSHOT_FORMAT,
+                "signature": signature,
+                "sha256": digest,
+                "data": data,
+            })
+            atomic_write(self.snapshot_path, payload)
+        except (OSError, ValueError):
+            pass
+
+
+class PoolTimeoutError(Exception):
+    """Не удалось получить соединение из пула за отведённое время."""
+
 
 class DatabaseConnection:
-    """Одиночка для работы с PostgreSQL."""
+    """
+    Потокобезопасный пул соединений с PostgreSQL.
+
+    - от min_size до max_size открытых соединений;
+    - проверка соединения при выдаче (health check);
+    - простаивающие дольше max_idle_seconds соединения сверх min_size закрываются;
+    - статистика ожидания и загрузки — в stats().
+
+    Соединение берётся через контекстный менеджер:
+
+        with db.connection() as conn:
+            ...
+
+    connect — фабрика соединений (по умолчанию psycopg2.connect),
+    её можно подменить, например, для тестов без сервера.
+    """
+
+    # По одному пулу на dsn (см. get_instance)
+    _instances: Dict[str, "DatabaseConnection"] = {}
+    _instances_lock = threading.Lock()
 
-    _instance: Optional["DatabaseConnection"] = None
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_idle_seconds: float = 300.0,
+        checkout_timeout: float = 30.0,
+        health_check: bool = True,
+        connect: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Нужно 0 <= min_size <= max_size и max_size >= 1")
 
-    def __init__(self, dsn: str) -> None:
         self.dsn = dsn
-        self.conn = psycopg2.connect(dsn)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.checkout_timeout = checkout_timeout
+        self.health_check = health_check
+        self._connect = connect or psycopg2.connect
+
+        self._cond = threading.Condition()
+        # Свободные соединения: (соединение, момент возврата в пул)
+        self._idle: List[Tuple[Any, float]] = []
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Статистика
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._health_failures = 0
+        self._recycled = 0
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(dsn), time.monotonic()))
+            self._size += 1
 
     @classmethod
-    def get_instance(cls, dsn: str) -> "DatabaseConnection":
+    def get_instance(cls, dsn: str, **kwargs: Any) -> "DatabaseConnection":
         """
-        Возвращает единственный экземпляр соединения с БД.
-        Если соединение ещё не создано — создаёт его.
+        Возвращает общий пул для данного dsn.
+        Если пула ещё нет — создаёт его (kwargs передаются в конструктор).
         """
-        if cls._instance is None:
-            cls._instance = cls(dsn)
-        return cls._instance
+        with cls._instances_lock:
+            pool = cls._instances.get(dsn)
+            if pool is None or pool._closed:
+                pool = cls(dsn, **kwargs)
+                cls._instances[dsn] = pool
+            return pool
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Взять соединение из пула на время блока with и вернуть его обратно."""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def _checkout(self) -> Any:
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        waited = False
+        conn = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Пул соединений закрыт")
+                self._recycle_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Резервируем место, само соединение откроем вне блокировки
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Нет свободных соединений за {self.checkout_timeout} с"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            wait = time.monotonic() - started
+            self._checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if waited:
+                self._waits += 1
 
-    def get_connection(self):
-        """Вернуть объект соединения psycopg2."""
-        return self.conn
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                with self._cond:
+                    self._health_failures += 1
+                self._close_quietly(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect(self.dsn)
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def _checkin(self, conn: Any) -> None:
+        broken = bool(getattr(conn, "closed", False))
+        if not broken:
+            try:
+                # Завершаем транзакцию, которую мог оставить открытой SELECT
+                conn.rollback()
+            except Exception:  # noqa: BLE001
+                broken = True
+
+        with self._cond:
+            self._in_use -= 1
+            if broken or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if broken or self._closed:
+            self._close_quietly(conn)
+
+    def _is_healthy(self, conn: Any) -> bool:
+        if getattr(conn, "closed", False):
+            return False
+        if not self.health_check:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _recycle_idle(self) -> None:
+        """Закрыть давно простаивающие соединения сверх min_size (под self._cond)."""
+        now = time.monotonic()
+        # Самые старые соединения в начале списка (выдаём с конца)
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0][1] > self.max_idle_seconds
+        ):
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            self._recycled += 1
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика пула: размер, загрузка и время ожидания соединения."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "utilisation": self._in_use / self.max_size,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "total_wait_seconds": self._total_wait,
+                "max_wait_seconds": self._max_wait,
+                "avg_wait_seconds": self._total_wait / self._checkouts if self._checkouts else 0.0,
+                "health_check_failures": self._health_failures,
+                "recycled": self._recycled,
+            }
 
     def close(self) -> None:
-        """Закрыть соединение и сбросить одиночку."""
-        if self.conn is not None:
-            self.conn.close()
-            self.conn = None
-        DatabaseConnection._instance = None
+        """Закрыть все свободные соединения; занятые закроются при возврате."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+        with DatabaseConnection._instances_lock:
+            if DatabaseConnection._instances.get(self.dsn) is self:
+                del DatabaseConnection._instances[self.dsn]
+
+
+_DATA_VERSION_SQL = "SELECT version FROM clients_version WHERE id = 1"
+
+# Версия данных: увеличивается триггером на каждую изменяющую инструкцию;
+# по ней ClientRepDBAdapter понимает, что таблицу нужно перечитать
+# (см. ClientRepDB.data_version). Все инструкции можно выполнять повторно.
+_CLIENTS_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS clients_version (
+        id      SMALLINT PRIMARY KEY CHECK (id = 1),
+        version BIGINT   NOT NULL
+    );
+    INSERT INTO clients_version (id, version) VALUES (1, 0)
+    ON CONFLICT (id) DO NOTHING;
+
+    CREATE OR REPLACE FUNCTION clients_bump_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE clients_version SET version = version + 1 WHERE id = 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS clients_bump_version ON clients;
+    CREATE TRIGGER clients_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON clients
+        FOR EACH STATEMENT EXECUTE PROCEDURE clients_bump_version();
+"""
 
 
 class ClientRepDB:
+    # Стиль параметров SQL-запросов драйвера (см. ClientRepDBDecorator)
+    placeholder = "%s"
+
     def __init__(self, db: DatabaseConnection) -> None:
-        # Делегируем работу с соединением объекту-одиночке
+        # Соединения берутся из пула на время каждого запроса
         self.db = db
+        # Версии данных до и после последней записи этого репозитория (см. _write_transaction)
+        self.last_write: Optional[Tuple[int, int]] = None
+        # Есть ли таблица clients_version (None — ещё не проверяли)
+        self._has_version_table: Optional[bool] = None
 
-    @property
-    def conn(self) -> psycopg2.extensions.connection:
-        return self.db.get_connection()
+    def _ensure_version_table(self) -> bool:
+        """
+        Создать clients_version и триггер при первом обращении, если база
+        создана без ensure_clients_table. Если создать их нельзя (например,
+        нет прав на DDL), версия не используется: записи идут без блокировки
+        строки версии, а адаптер перечитывает таблицу при каждой проверке.
+        """
+        if self._has_version_table is None:
+            try:
+                with self.db.connection() as conn, conn:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT to_regclass('clients_version')")
+                        if cur.fetchone()[0] is None:
+                            cur.execute(_CLIENTS_VERSION_DDL)
+                self._has_version_table = True
+            except psycopg2.Error:
+                self._has_version_table = False
+        return self._has_version_table
+
+    def data_version(self) -> Optional[int]:
+        """
+        Номер версии данных из clients_version: триггер увеличивает его
+        при каждой изменяющей инструкции, в том числе из других процессов.
+        None — таблицы версии нет и создать её не удалось.
+        """
+        if not self._ensure_version_table():
+            return None
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute(_DATA_VERSION_SQL)
+            row = cur.fetchone()
+        return row[0] if row else 0
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[Any]:
+        """
+        Транзакция записи.
+
+        Строка версии блокируется в начале, поэтому между версией «до»
+        и нашими изменениями чужих записей быть не может: если «до»
+        совпадает с версией, загруженной адаптером, после записи ему
+        достаточно запомнить версию «после» (last_write), а не перечитывать таблицу.
+        Без таблицы версии (см. _ensure_version_table) last_write остаётся None.
+        """
+        if not self._ensure_version_table():
+            with self.db.connection() as conn, conn:
+                with conn.cursor() as cur:
+                    yield cur
+            self.last_write = None
+            return
+        with self.db.connection() as conn, conn:
+            with conn.cursor() as cur:
+                cur.execute(_DATA_VERSION_SQL + " FOR UPDATE")
+                before = cur.fetchone()[0]
+                yield cur
+                cur.execute(_DATA_VERSION_SQL)
+                after = cur.fetchone()[0]
+        self.last_write = (before, after)
 
     # Преобразование строки из БД в dict для Client(d).
     def _row_to_dict(self, row: Any) -> dict:
@@ -228,7 +1429,7 @@ class ClientRepDB:
         if client_id < 0:
             return None
 
-        with self.conn.cursor() as cur:
+        with self.db.connection() as conn, conn.cursor() as cur:
             cur.execute(
                 """
                 SELECT id, first_name, last_name, father_name,
@@ -243,7 +1444,7 @@ class ClientRepDB:
         if row is None:
             return None
 
-        return Client(self._row_to_dict(row))
+        return Client.from_trusted(self._row_to_dict(row))
 
     # b. get_k_n_short_list: Получить список k по счету n объектов
     def get_k_n_short_list(self, k: int, n: int) -> List[Client]:
@@ -252,7 +1453,7 @@ class ClientRepDB:
 
         offset = (k - 1) * n
 
-        with self.conn.cursor() as cur:
+        with self.db.connection() as conn, conn.cursor() as cur:
             cur.execute(
                 """
                 SELECT id, first_name, last_name, father_name,
@@ -265,30 +1466,86 @@ class ClientRepDB:
             )
             rows = cur.fetchall()
 
-        return [Client(self._row_to_dict(r)) for r in rows]
+        return [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        n: int = 20,
+        sort: str = "id",
+    ) -> Tuple[List[Client], Optional[str]]:
+        """
+        Курсорная (keyset) пагинация.
+
+        Вместо OFFSET ищем сразу после последней строки предыдущей страницы:
+        WHERE id > last_id или WHERE (sort, id) > (last_value, last_id).
+        Стоимость не зависит от глубины страницы.
+        """
+        _check_page_sort(sort)
+        if n <= 0:
+            return [], None
+
+        if sort == "id":
+            order = sql.SQL("ORDER BY id")
+            where = sql.SQL("")
+            params: List[Any] = []
+            if cursor:
+                _, last_id = decode_page_cursor(cursor, sort)
+                where = sql.SQL("WHERE id > %s")
+                params = [last_id]
+        else:
+            col = sql.Identifier(sort)
+            order = sql.SQL("ORDER BY {col}, id").format(col=col)
+            where = sql.SQL("")
+            params = []
+            if cursor:
+                value, last_id = decode_page_cursor(cursor, sort)
+                where = sql.SQL("WHERE ({col}, id) > (%s, %s)").format(col=col)
+                params = [value, last_id]
+
+        query = sql.SQL(
+            """
+            SELECT id, first_name, last_name, father_name,
+                   haircut_counter, discount
+            FROM clients
+            {where}
+            {order}
+            LIMIT %s
+            """
+        ).format(where=where, order=order)
+
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, (*params, n))
+            rows = cur.fetchall()
+
+        clients = [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+        next_cursor = None
+        if len(clients) == n:
+            last = clients[-1]
+            next_cursor = encode_page_cursor(sort, PAGE_SORT_COLUMNS[sort](last), last.get_id())
+        return clients, next_cursor
 
     # c. Добавить объект в список (при добавлении сформировать новый ID)
     def add(self, client: Client) -> int:
         # ID генерируется автоматически в БД (SERIAL)
-        with self.conn:
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO clients
-                        (first_name, last_name, father_name,
-                         haircut_counter, discount)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING id
-                    """,
-                    (
-                        client.get_first_name(),
-                        client.get_last_name(),
-                        client.get_father_name(),
-                        client.get_haircut_counter(),
-                        client.get_discount(),
-                    ),
-                )
-                new_id = cur.fetchone()[0]
+        with self._write_transaction() as cur:
+            cur.execute(
+                """
+                INSERT INTO clients
+                    (first_name, last_name, father_name,
+                     haircut_counter, discount)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (
+                    client.get_first_name(),
+                    client.get_last_name(),
+                    client.get_father_name(),
+                    client.get_haircut_counter(),
+                    client.get_discount(),
+                ),
+            )
+            new_id = cur.fetchone()[0]
 
         return new_id
 
@@ -297,28 +1554,27 @@ class ClientRepDB:
         if client_id < 0:
             return False
 
-        with self.conn:
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    """
-                    UPDATE clients
-                    SET first_name = %s,
-                        last_name = %s,
-                        father_name = %s,
-                        haircut_counter = %s,
-                        discount = %s
-                    WHERE id = %s
-                    """,
-                    (
-                        new_client.get_first_name(),
-                        new_client.get_last_name(),
-                        new_client.get_father_name(),
-                        new_client.get_haircut_counter(),
-                        new_client.get_discount(),
-                        client_id,
-                    ),
-                )
-                updated = cur.rowcount > 0
+        with self._write_transaction() as cur:
+            cur.execute(
+                """
+                UPDATE clients
+                SET first_name = %s,
+                    last_name = %s,
+                    father_name = %s,
+                    haircut_counter = %s,
+                    discount = %s
+                WHERE id = %s
+                """,
+                (
+                    new_client.get_first_name(),
+                    new_client.get_last_name(),
+                    new_client.get_father_name(),
+                    new_client.get_haircut_counter(),
+                    new_client.get_discount(),
+                    client_id,
+                ),
+            )
+            updated = cur.rowcount > 0
 
         return updated
 
@@ -327,29 +1583,292 @@ class ClientRepDB:
         if client_id < 0:
             return False
 
-        with self.conn:
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    "DELETE FROM clients WHERE id = %s",
-                    (client_id,),
-                )
-                deleted = cur.rowcount > 0
+        with self._write_transaction() as cur:
+            cur.execute(
+                "DELETE FROM clients WHERE id = %s",
+                (client_id,),
+            )
+            deleted = cur.rowcount > 0
 
         return deleted
 
+    # Пакетные операции: одна транзакция, запросы пачками execute_values
+    def add_many(self, clients: Iterable[Client]) -> List[BulkResult]:
+        """Вставить клиентов, пропустив неуникальных; отчёт по каждой строке."""
+        clients = list(clients)
+        results: List[BulkResult] = []
+        accepted: List[Client] = []
+        with self._write_transaction() as cur:
+            taken = self._taken_keys(cur, clients)
+            for i, client in enumerate(clients):
+                key = (client.get_last_name(), client.get_haircut_counter())
+                if key in taken:
+                    results.append(BulkResult(i, False, error=BULK_NOT_UNIQUE))
+                    continue
+                taken[key] = set()
+                accepted.append(client)
+                results.append(BulkResult(i, True))
+
+            rows = []
+            if accepted:
+                rows = execute_values(
+                    cur,
+                    """
+                    INSERT INTO clients
+                        (first_name, last_name, father_name,
+                         haircut_counter, discount)
+                    VALUES %s
+                    RETURNING id
+                    """,
+                    [
+                        (
+                            c.get_first_name(),
+                            c.get_last_name(),
+                            c.get_father_name(),
+                            c.get_haircut_counter(),
+                            c.get_discount(),
+                        )
+                        for c in accepted
+                    ],
+                    page_size=1000,
+                    fetch=True,
+                )
+
+        new_ids = iter(r[0] for r in rows)
+        for result, client in zip((r for r in results if r.ok), accepted):
+            result.id = next(new_ids)
+            client.set_id(result.id)
+        return results
+
+    def replace_many(self, replacements: Iterable[Tuple[int, Client]]) -> List[BulkResult]:
+        """Заменить клиентов по id одним UPDATE ... FROM (VALUES ...); отчёт по каждой строке."""
+        replacements = list(replacements)
+        results: List[BulkResult] = []
+        accepted: List[Tuple[int, Client]] = []
+        with self._write_transaction() as cur:
+            taken = self._taken_keys(cur, [c for _, c in replacements])
+            for i, (client_id, client) in enumerate(replacements):
+                key = (client.get_last_name(), client.get_haircut_counter())
+                if client_id < 0:
+                    results.append(BulkResult(i, False, client_id, BULK_NOT_FOUND))
+                    continue
+                if taken.get(key, set()) - {client_id}:
+                    results.append(BulkResult(i, False, client_id, BULK_NOT_UNIQUE))
+                    continue
+                taken[key] = {client_id}
+                accepted.append((client_id, client))
+                results.append(BulkResult(i, True, client_id))
+
+            updated: Set[int] = set()
+            if accepted:
+                rows = execute_values(
+                    cur,
+                    """
+                    UPDATE clients AS c
+                    SET first_name = v.first_name,
+                        last_name = v.last_name,
+                        father_name = v.father_name,
+                        haircut_counter = v.haircut_counter,
+                        discount = v.discount
+                    FROM (VALUES %s) AS v (id, first_name, last_name, father_name,
+                                          haircut_counter, discount)
+                    WHERE c.id = v.id
+                    RETURNING c.id
+                    """,
+                    [
+                        (
+                            client_id,
+                            c.get_first_name(),
+                            c.get_last_name(),
+                            c.get_father_name(),
+                            c.get_haircut_counter(),
+                            c.get_discount(),
+                        )
+                        for client_id, c in accepted
+                    ],
+                    page_size=1000,
+                    fetch=True,
+                )
+                updated = {r[0] for r in rows}
+
+        for result in results:
+            if result.ok and result.id not in updated:
+                result.ok = False
+                result.error = BULK_NOT_FOUND
+        return results
+
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]:
+        """Удалить клиентов одним DELETE ... WHERE id = ANY(...); отчёт по каждому id."""
+        client_ids = list(client_ids)
+        if not client_ids:
+            return []
+
+        with self._write_transaction() as cur:
+            cur.execute(
+                "DELETE FROM clients WHERE id = ANY(%s) RETURNING id",
+                (client_ids,),
+            )
+            deleted = {r[0] for r in cur.fetchall()}
+
+        results: List[BulkResult] = []
+        for i, client_id in enumerate(client_ids):
+            if client_id in deleted:
+                # повторный id в том же пакете уже ничего не удаляет
+                deleted.discard(client_id)
+                results.append(BulkResult(i, True, client_id))
+            else:
+                results.append(BulkResult(i, False, client_id, BULK_NOT_FOUND))
+        return results
+
+    @staticmethod
+    def _taken_keys(cur: Any, clients: List[Client]) -> Dict[Tuple[str, int], Set[int]]:
+        """
+        Один запрос: какие ключи уникальности (фамилия, кол-во стрижек)
+        из пакета уже заняты в таблице и какими id.
+        """
+        keys = {(c.get_last_name(), c.get_haircut_counter()) for c in clients}
+        if not keys:
+            return {}
+        rows = execute_values(
+            cur,
+            """
+            SELECT c.last_name, c.haircut_counter, c.id
+            FROM clients AS c
+            JOIN (VALUES %s) AS v (last_name, haircut_counter)
+              ON c.last_name = v.last_name
+             AND c.haircut_counter = v.haircut_counter
+            """,
+            list(keys),
+            page_size=1000,
+            fetch=True,
+        )
+        taken: Dict[Tuple[str, int], Set[int]] = {}
+        for last_name, haircut_counter, client_id in rows:
+            taken.setdefault((last_name, haircut_counter), set()).add(client_id)
+        return taken
+
     # f. get_count: Получить количество элементов
     def get_count(self) -> int:
-        with self.conn.cursor() as cur:
+        with self.db.connection() as conn, conn.cursor() as cur:
             cur.execute("SELECT COUNT(*) FROM clients")
             count = cur.fetchone()[0]
         return count
 
     def close(self) -> None:
-        """Закрываем соединение через одиночку."""
+        """Закрываем пул соединений."""
         self.db.close()
 
+    def sync_changes(
+        self,
+        inserts: List[Client],
+        updates: List[Client],
+        deletes: List[int],
+    ) -> List[int]:
+        """
+        Применить набор изменений одной транзакцией пачками execute_values.
+
+        Возвращает id вставленных клиентов в порядке inserts.
+        """
+        new_ids: List[int] = []
+        with self._write_transaction() as cur:
+            if deletes:
+                cur.execute("DELETE FROM clients WHERE id = ANY(%s)", (list(deletes),))
+            if len(updates) > 1:
+                # Строки могут обмениваться ключами (фамилия, кол-во стрижек):
+                # сначала уводим их ключи на временные значения -1 - id, чтобы
+                # уникальный индекс, если он есть, не сработал посреди пакета
+                cur.execute(
+                    "UPDATE clients SET haircut_counter = -1 - id WHERE id = ANY(%s)",
+                    ([c.get_id() for c in updates],),
+                )
+            if updates:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE clients AS c
+                    SET first_name = v.first_name,
+                        last_name = v.last_name,
+                        father_name = v.father_name,
+                        haircut_counter = v.haircut_counter,
+                        discount = v.discount
+                    FROM (VALUES %s) AS v (id, first_name, last_name, father_name,
+                                          haircut_counter, discount)
+                    WHERE c.id = v.id
+                    """,
+                    [
+                        (
+                            c.get_id(),
+                            c.get_first_name(),
+                            c.get_last_name(),
+                            c.get_father_name(),
+                            c.get_haircut_counter(),
+                            c.get_discount(),
+                        )
+                        for c in updates
+                    ],
+                    page_size=1000,
+                )
+            if inserts:
+                rows = execute_values(
+                    cur,
+                    """
+                    INSERT INTO clients
+                        (first_name, last_name, father_name,
+                         haircut_counter, discount)
+                    VALUES %s
+                    RETURNING id
+                    """,
+                    [
+                        (
+                            c.get_first_name(),
+                            c.get_last_name(),
+                            c.get_father_name(),
+                            c.get_haircut_counter(),
+                            c.get_discount(),
+                        )
+                        for c in inserts
+                    ],
+                    page_size=1000,
+                    fetch=True,
+                )
+                new_ids = [r[0] for r in rows]
+        return new_ids
+
+    def select_where(
+        self,
+        where: str,
+        params: List[Any],
+        order_by: str,
+        limit: int,
+        offset: int,
+    ) -> List[Client]:
+        """
+        Выборка по готовым фрагментам WHERE / ORDER BY (см. ClientRepDBDecorator).
+        Значения передаются только через params.
+        """
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT id, first_name, last_name, father_name,
+                       haircut_counter, discount
+                FROM clients
+                {where}
+                {order_by}
+                LIMIT %s OFFSET %s
+                """,
+                (*params, limit, offset),
+            )
+            rows = cur.fetchall()
+
+        return [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+
+    def count_where(self, where: str, params: List[Any]) -> int:
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM clients {where}", tuple(params))
+            return cur.fetchone()[0]
+
     def get_all(self) -> List[Client]:
-        with self.conn.cursor() as cur:
+        with self.db.connection() as conn, conn.cursor() as cur:
             cur.execute(
                 """
                 SELECT id, first_name, last_name, father_name,
@@ -360,7 +1879,7 @@ class ClientRepDB:
             )
             rows = cur.fetchall()
 
-        return [Client(self._row_to_dict(r)) for r in rows]
+        return [Client.from_trusted(self._row_to_dict(r)) for r in rows]
 
     def print_all(self) -> None:
         """Красивый вывод клиентов из БД."""
@@ -391,11 +1910,10 @@ class ClientRepDB:
     def clear_all(self) -> bool:
         """Очистить таблицу clients."""
         try:
-            with self.conn:
-                with self.conn.cursor() as cur:
-                    cur.execute("TRUNCATE TABLE clients RESTART IDENTITY CASCADE;")
-                    print("Таблица clients очищена.")
-                    return True
+            with self._write_transaction() as cur:
+                cur.execute("TRUNCATE TABLE clients RESTART IDENTITY CASCADE;")
+                print("Таблица clients очищена.")
+                return True
         except Exception as exc:  # noqa: BLE001
             print(f"Ошибка при очистке таблицы: {exc}")
             return False
@@ -404,24 +1922,92 @@ class ClientRepDB:
 class ClientRepDBAdapter(ClientRepBase):
     """Adapter: делает ClientRepDB совместимым с интерфейсом ClientRepBase."""
 
+    reads_storage_directly = True
+
     def __init__(self, db_repo: ClientRepDB) -> None:
         # сохраняем "адаптируемый" объект, чтобы read_all уже мог к нему обращаться
         self.db_repo = db_repo
+        # Состояние БД на момент последней синхронизации: id -> значения полей.
+        # По нему write_all вычисляет, что нужно вставить, обновить и удалить.
+        self._synced: Dict[int, ClientRecord] = {}
         # file_path фиктивный, в БД он не используется
         super().__init__(file_path=":db:")
 
     # Переопределение чтения и записи
     def read_all(self) -> None:
         """Загрузка всех клиентов из БД в self.items для совместимости."""
+        signature = self._storage_signature()
         clients = self.db_repo.get_all()
         self.items = clients[:]
+        self._reindex()
+        self._synced = {c.get_id(): c.to_record() for c in self.items}
+        self._loaded_signature = signature
+        self._version += 1
+        self._notify_change("reload", None)
+
+    def _storage_signature(self) -> Optional[tuple]:
+        """
+        Версия данных, если БД умеет её сообщать (SQLite: PRAGMA data_version,
+        PostgreSQL: clients_version), иначе None — тогда данные перечитываются
+        при каждой проверке.
+        """
+        data_version = getattr(self.db_repo, "data_version", None)
+        version = data_version() if data_version is not None else None
+        if version is None:
+            return None
+        return (version,)
+
+    def _after_write(self) -> None:
+        """
+        Своя запись меняет версию данных в PostgreSQL; если до неё чужих
+        изменений не было, запоминаем новую версию вместо перечитывания таблицы.
+        (В SQLite data_version свои записи не меняют, last_write там нет.)
+        """
+        last_write = getattr(self.db_repo, "last_write", None)
+        if last_write is not None and self._loaded_signature == (last_write[0],):
+            self._loaded_signature = (last_write[1],)
+
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            signature = self._storage_signature()
+            if signature is not None and signature == self._loaded_signature:
+                return False
+            self.read_all()
+            return True
 
     def write_all(self, file_name: Optional[str] = None) -> None:
-        """Синхронизировать self.items с БД (простой вариант: очистить и залить)."""
-        self.db_repo.clear_all()
-        for client in self.items:
-            new_id = self.db_repo.add(client)
-            client.set_id(new_id)
+        """
+        Синхронизировать self.items с БД.
+
+        Сравниваем items с состоянием последней синхронизации и одной
+        транзакцией отправляем только вставки, изменения и удаления;
+        id существующих клиентов сохраняются.
+        """
+        with self._lock:
+            inserts: List[Client] = []
+            updates: List[Client] = []
+            seen: Set[int] = set()
+            for client in self.items:
+                client_id = client.get_id()
+                if client_id in self._synced and client_id not in seen:
+                    seen.add(client_id)
+                    if self._synced[client_id] != client.to_record():
+                        updates.append(client)
+                else:
+                    inserts.append(client)
+            deletes = [client_id for client_id in self._synced if client_id not in seen]
+
+            if not (inserts or updates or deletes):
+                return
+
+            new_ids = self.db_repo.sync_changes(inserts, updates, deletes)
+            self._after_write()
+            for client, new_id in zip(inserts, new_ids):
+                client.set_id(new_id)
+            self._reindex()
+            self._synced = {c.get_id(): c.to_record() for c in self.items}
+            self._version += 1
+            self._notify_change("reload", None)
 
     def _load_from_storage(self) -> List[dict]:
         return []
@@ -440,27 +2026,129 @@ class ClientRepDBAdapter(ClientRepBase):
     def get_k_n_short_list(self, k: int, n: int) -> List[Client]:
         return self.db_repo.get_k_n_short_list(k, n)
 
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        n: int = 20,
+        sort: str = "id",
+    ) -> Tuple[List[Client], Optional[str]]:
+        return self.db_repo.get_page(cursor, n, sort)
+
+    # Мутации идут напрямую в БД, а self.items и индексы обновляются
+    # на месте, без повторной выгрузки всей таблицы.
     def add(self, client: Client) -> int:
-        self.read_all()
-        if not self._is_unique(client):
-            return -1
-        new_id = self.db_repo.add(client)
-        client.set_id(new_id)
-        self.read_all()
-        return new_id
+        with self._lock:
+            self.reload_if_changed()
+            if not self._is_unique(client):
+                return -1
+            new_id = self.db_repo.add(client)
+            self._after_write()
+            client.set_id(new_id)
+            self.items.append(client)
+            self._index_client(client, len(self.items) - 1)
+            self._synced[new_id] = client.to_record()
+            self._version += 1
+            self._notify_change("put", client)
+            return new_id
 
     def replace_by_id(self, client_id: int, new_client: Client) -> bool:
-        self.read_all()
-        if not self._is_unique(new_client):
-            return False
-        ok = self.db_repo.replace_by_id(client_id, new_client)
-        self.read_all()
-        return ok
+        with self._lock:
+            self.reload_if_changed()
+            if not self._is_unique(new_client, client_id):
+                return False
+            ok = self.db_repo.replace_by_id(client_id, new_client)
+            self._after_write()
+            pos = self._id_index.get(client_id)
+            if ok and pos is not None:
+                new_client.set_id(client_id)
+                self._unindex_unique(self.items[pos])
+                self.items[pos] = new_client
+                self._index_client(new_client, pos)
+                self._synced[client_id] = new_client.to_record()
+                self._version += 1
+                self._notify_change("put", new_client)
+            return ok
 
     def delete_by_id(self, client_id: int) -> bool:
-        ok = self.db_repo.delete_by_id(client_id)
-        self.read_all()
-        return ok
+        with self._lock:
+            ok = self.db_repo.delete_by_id(client_id)
+            self._after_write()
+            pos = self._id_index.get(client_id)
+            if ok and pos is not None:
+                del self._id_index[client_id]
+                removed = self.items.pop(pos)
+                self._unindex_unique(removed)
+                self._reindex(pos)
+                self._version += 1
+                self._notify_change("delete", removed)
+            self._synced.pop(client_id, None)
+            return ok
+
+    # Пакетные операции: уникальность проверяется по индексу в памяти,
+    # а в БД уходит одна транзакция sync_changes.
+    def add_many(self, clients: Iterable[Client]) -> List[BulkResult]:
+        with self._lock:
+            self.reload_if_changed()
+            results: List[BulkResult] = []
+            accepted: List[Client] = []
+            batch_keys: Set[Tuple[str, int]] = set()
+            for i, client in enumerate(clients):
+                key = self._unique_key(client)
+                if key in batch_keys or not self._is_unique(client):
+                    results.append(BulkResult(i, False, error=BULK_NOT_UNIQUE))
+                    continue
+                batch_keys.add(key)
+                accepted.append(client)
+                results.append(BulkResult(i, True))
+
+            if not accepted:
+                return results
+
+            new_ids = iter(self.db_repo.sync_changes(accepted, [], []))
+            self._after_write()
+            for result, client in zip((r for r in results if r.ok), accepted):
+                result.id = next(new_ids)
+                client.set_id(result.id)
+                self.items.append(client)
+                self._index_client(client, len(self.items) - 1)
+                self._synced[result.id] = client.to_record()
+                self._version += 1
+                self._notify_change("put", client)
+            return results
+
+    def replace_many(self, replacements: Iterable[Tuple[int, Client]]) -> List[BulkResult]:
+        with self._lock:
+            self.reload_if_changed()
+            results = self._apply_replace_many(list(replacements))
+            updates = [self.items[self._id_index[r.id]] for r in results if r.ok]
+            if updates:
+                try:
+                    self.db_repo.sync_changes([], updates, [])
+                except Exception:
+                    self.read_all()
+                    raise
+                self._after_write()
+                for client in updates:
+                    self._synced[client.get_id()] = client.to_record()
+            self._pending_changes.clear()
+            return results
+
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]:
+        with self._lock:
+            self.reload_if_changed()
+            results = self._apply_delete_many(list(client_ids))
+            deletes = [r.id for r in results if r.ok]
+            if deletes:
+                try:
+                    self.db_repo.sync_changes([], [], deletes)
+                except Exception:
+                    self.read_all()
+                    raise
+                self._after_write()
+                for client_id in deletes:
+                    self._synced.pop(client_id, None)
+            self._pending_changes.clear()
+            return results
 
     def get_count(self) -> int:
         return self.db_repo.get_count()
@@ -470,6 +2158,91 @@ class ClientRepDBAdapter(ClientRepBase):
         super().print_all()
 
 
+# Поля клиента, доступные для декларативных фильтров и сортировок
+CLIENT_FIELDS: Dict[str, Callable[[Client], Any]] = {
+    "id": lambda c: c.get_id(),
+    "first_name": lambda c: c.get_first_name(),
+    "last_name": lambda c: c.get_last_name(),
+    "father_name": lambda c: c.get_father_name(),
+    "haircut_counter": lambda c: c.get_haircut_counter(),
+    "discount": lambda c: c.get_discount(),
+}
+
+# Операции декларативных фильтров: op -> проверка (значение поля, значение условия)
+FILTER_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+}
+
+
+@dataclass(frozen=True)
+class ClientFilter:
+    """
+    Декларативный фильтр: условия (поле, операция, значение), объединённые через AND.
+
+        ClientFilter.where("discount", ">=", 10).and_where("last_name", "=", "Иванов")
+
+    Объект можно вызывать как обычный filter_fn, поэтому он работает с любым
+    репозиторием; ClientRepDBDecorator переводит его в SQL WHERE.
+    """
+
+    conditions: Tuple[Tuple[str, str, Any], ...] = ()
+
+    def __post_init__(self) -> None:
+        for field_name, op, value in self.conditions:
+            if field_name not in CLIENT_FIELDS:
+                raise ValueError(f"Фильтр по полю {field_name} не поддерживается")
+            if op not in FILTER_OPS:
+                raise ValueError(f"Неизвестная операция фильтра: {op}")
+            if op == "in" and not isinstance(value, tuple):
+                raise ValueError("Для операции in значение должно быть кортежем")
+
+    @classmethod
+    def where(cls, field_name: str, op: str, value: Any) -> "ClientFilter":
+        return cls(((field_name, op, value),))
+
+    def and_where(self, field_name: str, op: str, value: Any) -> "ClientFilter":
+        return ClientFilter(self.conditions + ((field_name, op, value),))
+
+    def __call__(self, client: Client) -> bool:
+        return all(
+            FILTER_OPS[op](CLIENT_FIELDS[field_name](client), value)
+            for field_name, op, value in self.conditions
+        )
+
+
+@dataclass(frozen=True)
+class ClientSort:
+    """
+    Декларативная сортировка по полю клиента.
+
+    Вызов возвращает ключ сортировки, поэтому объект подходит как sort_key
+    для любого декоратора; направление задаёт descending (вместе с reverse).
+    """
+
+    field: str
+    descending: bool = False
+
+    def __post_init__(self) -> None:
+        if self.field not in CLIENT_FIELDS:
+            raise ValueError(f"Сортировка по полю {self.field} не поддерживается")
+
+    def __call__(self, client: Client) -> Any:
+        return CLIENT_FIELDS[self.field](client)
+
+
+def _effective_reverse(sort_key: Any, reverse: bool) -> bool:
+    """Для ClientSort учитываем и его descending, и параметр reverse."""
+    if isinstance(sort_key, ClientSort):
+        return reverse != sort_key.descending
+    return reverse
+
+
 class ClientRepDBDecorator:
     """
     Декоратор для ClientRepDB.
@@ -500,13 +2273,19 @@ class ClientRepDBDecorator:
         if n <= 0 or k <= 0:
             return []
 
+        if self._is_declarative(filter_fn, sort_key):
+            # Фильтр, сортировка и страница целиком выполняются в БД
+            where, params = self._compile_where(filter_fn)
+            order = self._compile_order(sort_key, reverse)
+            return self._wrapped.select_where(where, params, order, n, (k - 1) * n)
+
         clients = self._wrapped.get_all()
 
         if filter_fn is not None:
             clients = [c for c in clients if filter_fn(c)]
 
         if sort_key is not None:
-            clients.sort(key=sort_key, reverse=reverse)
+            clients.sort(key=sort_key, reverse=_effective_reverse(sort_key, reverse))
 
         start = (k - 1) * n
         end = start + n
@@ -525,9 +2304,56 @@ class ClientRepDBDecorator:
         if filter_fn is None:
             return self._wrapped.get_count()
 
+        if isinstance(filter_fn, ClientFilter):
+            where, params = self._compile_where(filter_fn)
+            return self._wrapped.count_where(where, params)
+
         clients = self._wrapped.get_all()
         return sum(1 for c in clients if filter_fn(c))
 
+    # ---------- перевод ClientFilter / ClientSort в SQL ----------
+    @staticmethod
+    def _is_declarative(filter_fn: Any, sort_key: Any) -> bool:
+        return (filter_fn is None or isinstance(filter_fn, ClientFilter)) and (
+            sort_key is None or isinstance(sort_key, ClientSort)
+        )
+
+    def _compile_where(self, spec: Optional[ClientFilter]) -> Tuple[str, List[Any]]:
+        """
+        ClientFilter -> ("WHERE ...", параметры).
+
+        Имена полей и операции проверены по белым спискам, значения
+        передаются только параметрами.
+        """
+        if spec is None or not spec.conditions:
+            return "", []
+
+        ph = getattr(self._wrapped, "placeholder", "%s")
+        parts: List[str] = []
+        params: List[Any] = []
+        for field_name, op, value in spec.conditions:
+            if op == "in":
+                if not value:
+                    parts.append("1 = 0")
+                    continue
+                parts.append(f"{field_name} IN ({', '.join([ph] * len(value))})")
+                params.extend(value)
+            else:
+                parts.append(f"{field_name} {op} {ph}")
+                params.append(value)
+        return "WHERE " + " AND ".join(parts), params
+
+    @staticmethod
+    def _compile_order(spec: Optional[ClientSort], reverse: bool) -> str:
+        if spec is None:
+            return "ORDER BY id"
+        direction = "DESC" if _effective_reverse(spec, reverse) else "ASC"
+        if spec.field == "id":
+            return f"ORDER BY id {direction}"
+        # id по возрастанию — для устойчивого порядка страниц при равных
+        # значениях (как у устойчивой сортировки list.sort и с reverse=True)
+        return f"ORDER BY {spec.field} {direction}, id"
+
     def __getattr__(self, name: str) -> Any:
         """
         Все остальные методы/атрибуты делегируем обёрнутому ClientRepDB.
@@ -544,10 +2370,25 @@ class ClientRepFileDecorator:
 
     Добавляет возможность передачи filter_fn и sort_key
     в методы get_k_n_short_list и get_count.
+
+    Отфильтрованные списки и отсортированные представления кэшируются
+    по (filter_fn, sort_key, reverse) и сбрасываются, как только меняется
+    версия данных репозитория.
     """
 
+    # Сколько разных фильтров / сортировок держим в кэше
+    CACHE_SIZE = 32
+    # Частичная сортировка (heapq) выгоднее полной, пока нужный префикс
+    # меньше этой доли списка
+    TOP_K_FRACTION = 0.25
+
     def __init__(self, wrapped: ClientRepBase) -> None:
         self._wrapped = wrapped
+        self._cache_version: Optional[int] = None
+        # filter_fn -> отфильтрованный список
+        self._filtered: "OrderedDict[Any, List[Client]]" = OrderedDict()
+        # (filter_fn, sort_key, reverse) -> (отсортированный префикс, полный ли он)
+        self._sorted: "OrderedDict[Any, Tuple[List[Client], bool]]" = OrderedDict()
 
     def get_k_n_short_list(
         self,
@@ -560,27 +2401,28 @@ class ClientRepFileDecorator:
         """
         Расширенная пагинация для файлового репозитория.
 
-        1. Обновляем items из файла (read_all)
-        2. Берём список клиентов
-        3. Применяем фильтр (если задан)
-        4. Применяем сортировку (если задана)
-        5. Возвращаем k-ю страницу по n элементов
+        1. Перечитываем файл, если он изменился
+        2. Берём отфильтрованный список (из кэша или фильтруем)
+        3. Сортируем: берём готовое представление из кэша, для первых
+           страниц — частичная сортировка heapq, иначе полная
+        4. Возвращаем k-ю страницу по n элементов
         """
         if n <= 0 or k <= 0:
             return []
 
-        self._wrapped.read_all()
-        clients = list(self._wrapped.items)
-
-        if filter_fn is not None:
-            clients = [c for c in clients if filter_fn(c)]
-
-        if sort_key is not None:
-            clients.sort(key=sort_key, reverse=reverse)
+        if sort_key is None and getattr(self._wrapped, "stream_reads", False):
+            # Без сортировки страницу можно прочитать потоково
+            return self._wrapped.stream_page(k, n, filter_fn)
 
+        self._sync_cache()
         start = (k - 1) * n
         end = start + n
-        return clients[start:end]
+        clients = self._get_filtered(filter_fn)
+
+        if sort_key is None:
+            return clients[start:end]
+
+        return self._get_sorted(clients, filter_fn, sort_key, reverse, end)[start:end]
 
     def get_count(
         self,
@@ -590,14 +2432,86 @@ class ClientRepFileDecorator:
         Расширенный get_count:
 
         - Если filter_fn не задан, просто делегируем в базовый get_count()
-        - Если filter_fn задан, считаем только тех клиентов, кто ему соответствует.
+        - Если filter_fn задан, считаем только тех клиентов, кто ему соответствует
+          (результат фильтрации общий с get_k_n_short_list).
         """
-        self._wrapped.read_all()
+        if filter_fn is not None and getattr(self._wrapped, "stream_reads", False):
+            return self._wrapped.stream_count(filter_fn)
+
+        self._sync_cache()
 
         if filter_fn is None:
             return self._wrapped.get_count()
 
-        return sum(1 for c in self._wrapped.items if filter_fn(c))
+        return len(self._get_filtered(filter_fn))
+
+    # ---------- кэш ----------
+    def _sync_cache(self) -> None:
+        """Перечитать файл при изменениях и сбросить кэш, если сменилась версия."""
+        self._wrapped.reload_if_changed()
+        version = self._wrapped.version
+        if version != self._cache_version:
+            self._filtered.clear()
+            self._sorted.clear()
+            self._cache_version = version
+
+    @staticmethod
+    def _cache_get(cache: "OrderedDict[Any, Any]", key: Any) -> Any:
+        try:
+            return cache.get(key)
+        except TypeError:
+            return None
+
+    def _remember(self, cache: "OrderedDict[Any, Any]", key: Any, value: Any) -> None:
+        try:
+            cache[key] = value
+        except TypeError:
+            # Нехэшируемый filter_fn / sort_key просто не кэшируем
+            return
+        cache.move_to_end(key)
+        while len(cache) > self.CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _get_filtered(self, filter_fn: Optional[Callable[[Client], bool]]) -> List[Client]:
+        if filter_fn is None:
+            return self._wrapped.items
+        cached = self._cache_get(self._filtered, filter_fn)
+        if cached is not None:
+            self._filtered.move_to_end(filter_fn)
+            return cached
+        clients = [c for c in self._wrapped.items if filter_fn(c)]
+        self._remember(self._filtered, filter_fn, clients)
+        return clients
+
+    def _get_sorted(
+        self,
+        clients: List[Client],
+        filter_fn: Optional[Callable[[Client], bool]],
+        sort_key: Callable[[Client], Any],
+        reverse: bool,
+        needed: int,
+    ) -> List[Client]:
+        """Отсортированный список, в котором есть как минимум needed первых элементов."""
+        reverse = _effective_reverse(sort_key, reverse)
+        cache_key = (filter_fn, sort_key, reverse)
+        cached = self._cache_get(self._sorted, cache_key)
+        if cached is not None:
+            ordered, complete = cached
+            if complete or len(ordered) >= needed:
+                self._sorted.move_to_end(cache_key)
+                return ordered
+
+        if needed < len(clients) * self.TOP_K_FRACTION:
+            # Нужны только первые страницы — O(N log needed) вместо O(N log N)
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            ordered = select(needed, clients, key=sort_key)
+            complete = False
+        else:
+            ordered = sorted(clients, key=sort_key, reverse=reverse)
+            complete = True
+
+        self._remember(self._sorted, cache_key, (ordered, complete))
+        return ordered
 
     def __getattr__(self, name: str) -> Any:
         """
@@ -669,6 +2583,16 @@ def ensure_clients_table() -> None:
                 );
                 """
             )
+            # Версия данных (см. ClientRepDB.data_version)
+            cur.execute(_CLIENTS_VERSION_DDL)
+            # Индексы под курсорную пагинацию по (колонка, id)
+            for column in ("last_name", "haircut_counter", "discount"):
+                cur.execute(
+                    sql.SQL("CREATE INDEX IF NOT EXISTS {name} ON clients ({col}, id)").format(
+                        name=sql.Identifier(f"clients_{column}_id"),
+                        col=sql.Identifier(column),
+                    )
+                )
 
             cur.execute("SELECT COUNT(*) FROM clients;")
             count = cur.fetchone()[0]
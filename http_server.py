@@ -64,7 +64,10 @@ class AppHandler(BaseHTTPRequestHandler):
 
         result = handler(**params)
         code, ctype, body = result
-        self._send(code, ctype, body.encode("utf-8"))
+        # JSON-списки приходят уже закодированными
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self._send(code, ctype, body)
 
     def do_POST(self):
         handler, params = self.router.match("POST", self.path)
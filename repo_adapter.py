@@ -1,18 +1,89 @@
 # repo_adapter.py
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional, Protocol, Dict, Any
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional, Protocol, Dict, Any, Iterable, Set, Tuple
 
-from hair_salon_lab1_task9 import Client
-from hair_salon_lab2 import ClientRepBase, ClientRepJson  # можно заменить на YAML/DBAdapter
+from client_schema import CLIENT_FORM, format_errors
+from hair_salon_lab1_task9 import Client, ClientRecord
+from hair_salon_lab2 import (
+    BULK_NOT_UNIQUE,
+    BulkResult,
+    ClientRepBase,
+    ClientRepDBAdapter,
+    ClientRepJson,
+)
+from repo_binary import ClientRepBinary
+from repo_journal import ClientRepJournal
+from repo_sharded import ClientRepSharded
+from repo_sqlite import ClientRepSqlite
+
+
+@dataclass(frozen=True)
+class ClientSnapshot:
+    """
+    Неизменяемый снимок списка клиентов.
+
+    version совпадает с версией репозитория, из которого снят снимок:
+    по ней удобно строить ключи кэшей (HTML, JSON).
+    """
+    clients: Tuple[Client, ...]
+    version: int
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    """Разница двух снимков: новые, удалённые и изменённые (было, стало) клиенты."""
+    added: Tuple[ClientRecord, ...]
+    removed: Tuple[ClientRecord, ...]
+    changed: Tuple[Tuple[ClientRecord, ClientRecord], ...]
+
+
+def diff_snapshots(old: ClientSnapshot, new: ClientSnapshot) -> SnapshotDiff:
+    """
+    Сравнить два снимка за O(n): неизменённые клиенты отсекаются
+    разностью множеств записей, остальные сопоставляются по id.
+    """
+    old_records = {c.to_record() for c in old.clients}
+    new_records = {c.to_record() for c in new.clients}
+    gone = {r.id: r for r in old_records - new_records}
+    added: List[ClientRecord] = []
+    changed: List[Tuple[ClientRecord, ClientRecord]] = []
+    for record in new_records - old_records:
+        before = gone.pop(record.id, None)
+        if before is None:
+            added.append(record)
+        else:
+            changed.append((before, record))
+    return SnapshotDiff(tuple(added), tuple(gone.values()), tuple(changed))
 
 
 class IClientRepository(Protocol):
-    def list_all(self) -> List[Client]: ...
+    def snapshot(self) -> ClientSnapshot: ...
+    def list_all(self) -> Tuple[Client, ...]: ...
     def get(self, client_id: int) -> Optional[Client]: ...
     def create(self, payload: Dict[str, Any]) -> int: ...
     def update(self, client_id: int, payload: Dict[str, Any]) -> bool: ...
     def delete(self, client_id: int) -> bool: ...
+    def list_page(
+        self, cursor: Optional[str] = None, n: int = 20, sort: str = "id"
+    ) -> Tuple[List[Client], Optional[str]]: ...
+    def create_many(self, payloads: Iterable[Dict[str, Any]]) -> List[BulkResult]: ...
+    def update_many(
+        self, updates: Iterable[Tuple[int, Dict[str, Any]]]
+    ) -> List[BulkResult]: ...
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]: ...
+
+
+def _client_from_payload(payload: Dict[str, Any], client_id: int) -> Client:
+    cleaned = CLIENT_FORM.clean(payload)
+    cleaned["id"] = client_id
+    # значения уже проверены схемой — повторная валидация не нужна
+    return Client.from_trusted(cleaned)
+
+
+def _client_from_cleaned(cleaned: Dict[str, Any], client_id: int) -> Client:
+    return Client.from_trusted({**cleaned, "id": client_id})
 
 
 @dataclass
@@ -22,50 +93,170 @@ class ClientRepoAdapter(IClientRepository):
     а хранилище могло быть JSON/YAML/DB (через твои репозитории).
     """
     repo: ClientRepBase
+    # Счётчики кэша: сколько раз данные взяты из памяти и сколько раз перечитаны
+    cache_hits: int = field(default=0)
+    cache_reloads: int = field(default=0)
+    # Текущий опубликованный снимок; заменяется целиком, читатели его не копируют
+    _snapshot: Optional[ClientSnapshot] = field(default=None, init=False, repr=False, compare=False)
 
-    def list_all(self) -> List[Client]:
-        self.repo.read_all()
-        return list(self.repo.items)
+    def _refresh(self) -> None:
+        """Перечитать хранилище, только если оно изменилось."""
+        if self.repo.reload_if_changed():
+            self.cache_reloads += 1
+        else:
+            self.cache_hits += 1
+
+    def _refresh_before_call(self) -> None:
+        """
+        Сверить данные в памяти с хранилищем перед обращением к репозиторию.
+
+        Репозиторий БД читает по id и страницами прямо из базы и сам проверяет
+        версию данных перед изменениями — для него проверка лишняя.
+        """
+        if not self.repo.reads_storage_directly:
+            self._refresh()
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"hits": self.cache_hits, "reloads": self.cache_reloads}
+
+    def snapshot(self) -> ClientSnapshot:
+        """
+        Снимок всех клиентов, согласованный с версией репозитория.
+
+        Новый снимок строится один раз после каждого изменения и публикуется
+        одним присваиванием; до следующего изменения все читатели получают
+        один и тот же объект без копирования.
+        """
+        self._refresh()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.repo.version:
+            return snapshot
+        # Под блокировкой репозитория items не меняется, пока снимаем копию
+        with self.repo.locked():
+            snapshot = ClientSnapshot(tuple(self.repo.items), self.repo.version)
+        self._snapshot = snapshot
+        return snapshot
+
+    def list_all(self) -> Tuple[Client, ...]:
+        return self.snapshot().clients
 
     def get(self, client_id: int) -> Optional[Client]:
-        self.repo.read_all()
+        self._refresh_before_call()
         return self.repo.get_by_id(client_id)
 
+    def list_page(
+        self, cursor: Optional[str] = None, n: int = 20, sort: str = "id"
+    ) -> Tuple[List[Client], Optional[str]]:
+        """Страница списка и токен следующей страницы (курсорная пагинация)."""
+        self._refresh_before_call()
+        return self.repo.get_page(cursor, n, sort)
+
     def create(self, payload: Dict[str, Any]) -> int:
-        self.repo.read_all()
-        c = Client({
-            "first_name": payload["first_name"],
-            "last_name": payload["last_name"],
-            "father_name": payload["father_name"],
-            "haircut_counter": int(payload["haircut_counter"]),
-            "discount": int(payload["discount"]),
-            "id": 0,  # будет переустановлен репозиторием
-        })
+        self._refresh_before_call()
+        c = _client_from_payload(payload, 0)  # id будет переустановлен репозиторием
         new_id = self.repo.add(c)
-        if new_id is None:
+        # файловые репозитории возвращают None, ClientRepDBAdapter — -1
+        if new_id is None or new_id < 0:
             raise ValueError("Client not unique")
         return int(new_id)
 
     def update(self, client_id: int, payload: Dict[str, Any]) -> bool:
-        self.repo.read_all()
-        c = Client({
-            "first_name": payload["first_name"],
-            "last_name": payload["last_name"],
-            "father_name": payload["father_name"],
-            "haircut_counter": int(payload["haircut_counter"]),
-            "discount": int(payload["discount"]),
-            "id": int(client_id),
-        })
+        self._refresh_before_call()
+        c = _client_from_payload(payload, int(client_id))
         return bool(self.repo.replace_by_id(int(client_id), c))
 
     def delete(self, client_id: int) -> bool:
-        self.repo.read_all()
+        self._refresh_before_call()
         return bool(self.repo.delete_by_id(int(client_id)))
 
+    # Пакетные операции: невалидные строки попадают в отчёт с ошибкой,
+    # остальные уходят в репозиторий одним пакетом (одна запись на пакет).
+    def create_many(self, payloads: Iterable[Dict[str, Any]]) -> List[BulkResult]:
+        self._refresh_before_call()
+        results: List[Optional[BulkResult]] = []
+        clients: List[Client] = []
+        positions: List[int] = []
+        # Точные повторы строк импорта отсекаются проверкой вхождения в set
+        # и не доходят до репозитория; его правило уникальности (фамилия и
+        # число стрижек — и внутри пакета, и с хранилищем) проверяет add_many
+        seen: Set[ClientRecord] = set()
+        for i, cleaned, errors in CLIENT_FORM.iter_validate(payloads):
+            if cleaned is None:
+                results.append(BulkResult(i, False, error=format_errors(errors)))
+                continue
+            record = ClientRecord.from_dict({**cleaned, "id": 0})
+            if record in seen:
+                results.append(BulkResult(i, False, error=BULK_NOT_UNIQUE))
+                continue
+            seen.add(record)
+            clients.append(_client_from_cleaned(cleaned, 0))
+            positions.append(i)
+            results.append(None)
+        return self._merge(results, positions, self.repo.add_many(clients))
+
+    def update_many(self, updates: Iterable[Tuple[int, Dict[str, Any]]]) -> List[BulkResult]:
+        self._refresh_before_call()
+        results: List[Optional[BulkResult]] = []
+        replacements: List[Tuple[int, Client]] = []
+        positions: List[int] = []
+        for i, (client_id, payload) in enumerate(updates):
+            try:
+                client_id = int(client_id)
+            except (TypeError, ValueError):
+                results.append(BulkResult(i, False, error="id: Должно быть целым числом"))
+                continue
+            ok, cleaned, errors = CLIENT_FORM.validate(payload)
+            if not ok:
+                results.append(BulkResult(i, False, error=format_errors(errors)))
+                continue
+            replacements.append((client_id, _client_from_cleaned(cleaned, client_id)))
+            positions.append(i)
+            results.append(None)
+        return self._merge(results, positions, self.repo.replace_many(replacements))
+
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]:
+        self._refresh_before_call()
+        return self.repo.delete_many([int(client_id) for client_id in client_ids])
+
+    @staticmethod
+    def _merge(
+        results: List[Optional[BulkResult]],
+        positions: List[int],
+        repo_results: List[BulkResult],
+    ) -> List[BulkResult]:
+        """Вернуть номера строк из отчёта репозитория к номерам входных данных."""
+        for pos, result in zip(positions, repo_results):
+            result.index = pos
+            results[pos] = result
+        return results
+
+
+# Переменная окружения для выбора хранилища: json (по умолчанию), journal, binary, sharded или sqlite
+STORAGE_ENV = "HAIR_SALON_STORAGE"
+
+
+def build_repository(backend: Optional[str] = None) -> IClientRepository:
+    backend = backend or os.environ.get(STORAGE_ENV, "json")
+
+    if backend == "json":
+        # вариант 1: JSON (без БД); файл могут делить несколько процессов app.py
+        repo: ClientRepBase = ClientRepJson("data/clients.json", process_lock=True)
+    elif backend == "journal":
+        # JSON-снимок + журнал изменений (запись не переписывает весь файл);
+        # свой файл, чтобы не делить снимок и .meta с хранилищем json
+        repo = ClientRepJournal("data/clients_journal.json")
+    elif backend == "binary":
+        # компактный бинарный формат с доступом через mmap
+        repo = ClientRepBinary("data/clients.bin")
+    elif backend == "sharded":
+        # клиенты разбиты по диапазонам id на несколько JSON-файлов
+        repo = ClientRepSharded("data/clients_shards")
+    elif backend == "sqlite":
+        # встроенная БД с индексами, без отдельного сервера
+        repo = ClientRepDBAdapter(ClientRepSqlite("data/clients.sqlite3"))
+    else:
+        raise ValueError(f"Неизвестное хранилище: {backend}")
 
-def build_repository() -> IClientRepository:
-    # вариант 1: JSON (без БД)
-    repo = ClientRepJson("data/clients.json")
     return ClientRepoAdapter(repo=repo)
 
     # вариант 2: если захочешь БД:
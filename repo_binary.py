@@ -0,0 +1,382 @@
+# repo_binary.py
+"""
+Компактный бинарный формат хранения клиентов и конвертер JSON / YAML / bin.
+
+Формат файла (little-endian):
+
+    заголовок   MAGIC(4s) VERSION(H) reserved(H) count(Q) heap_offset(Q)
+    записи      count записей фиксированной длины RECORD:
+                id(q) haircut_counter(i) discount(d)
+                last_off(I) last_len(I) first_off(I) first_len(I)
+                father_off(I) father_len(I)
+    куча строк  UTF-8 байты имён; смещения записей отсчитываются от heap_offset
+
+Запись i лежит по адресу HEADER.size + i * RECORD.size, поэтому доступ
+к любой записи и к любой странице не требует разбора остального файла.
+Одинаковые строки хранятся в куче один раз.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from typing import Callable, Dict, Iterator, List, Optional
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientRepBase, ClientRepJson, ClientRepYaml, LazyItemsMixin, atomic_write
+
+MAGIC = b"HSCB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+RECORD = struct.Struct("<qidIIIIII")
+
+# Смещения числовых колонок внутри записи (для обновления на месте)
+_HAIRCUT_FIELD = struct.Struct("<i")
+_HAIRCUT_OFFSET = 8
+_DISCOUNT_FIELD = struct.Struct("<d")
+_DISCOUNT_OFFSET = 12
+
+
+def encode_clients(data: List[dict]) -> bytes:
+    """Упаковать список клиентов (dict) в бинарный формат."""
+    heap = bytearray()
+    heap_index: Dict[str, int] = {}
+
+    def put(s: str) -> tuple:
+        raw = s.encode("utf-8")
+        off = heap_index.get(s)
+        if off is None:
+            off = len(heap)
+            heap_index[s] = off
+            heap.extend(raw)
+        return off, len(raw)
+
+    records = bytearray()
+    for d in data:
+        last = put(d["last_name"])
+        first = put(d["first_name"])
+        father = put(d["father_name"])
+        records += RECORD.pack(
+            d["id"],
+            d["haircut_counter"],
+            d["discount"],
+            *last,
+            *first,
+            *father,
+        )
+
+    heap_offset = HEADER.size + len(records)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(data), heap_offset)
+    return bytes(header) + bytes(records) + bytes(heap)
+
+
+def _record_to_dict(buf, row: int, heap_offset: int) -> dict:
+    (
+        client_id,
+        haircut_counter,
+        discount,
+        last_off,
+        last_len,
+        first_off,
+        first_len,
+        father_off,
+        father_len,
+    ) = RECORD.unpack_from(buf, HEADER.size + row * RECORD.size)
+
+    def get(off: int, length: int) -> str:
+        start = heap_offset + off
+        return bytes(buf[start:start + length]).decode("utf-8")
+
+    return {
+        "first_name": get(first_off, first_len),
+        "last_name": get(last_off, last_len),
+        "father_name": get(father_off, father_len),
+        "haircut_counter": haircut_counter,
+        # скидка хранится как double; целые значения возвращаем как int
+        "discount": int(discount) if discount.is_integer() else discount,
+        "id": client_id,
+    }
+
+
+def _read_header(buf) -> tuple:
+    magic, version, _, count, heap_offset = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("Файл не является бинарным хранилищем клиентов")
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия формата: {version}")
+    return count, heap_offset
+
+
+class ClientRepBinary(LazyItemsMixin, ClientRepBase):
+    """
+    Репозиторий клиентов в бинарном формате, читаемом через mmap.
+
+    Пока клиентов не меняли, get_by_id, страницы и get_count читаются прямо
+    из отображённого файла (fetch_by_id / fetch_page), без декодирования
+    остальных записей; self.items загружаются при первом изменении.
+    Замена клиента с теми же ФИО (новые haircut_counter / discount)
+    записывается на место, без перезаписи файла; update_counters до загрузки
+    items правит запись прямо в отображённом файле.
+    """
+
+    def __init__(self, file_path: str = "clients.bin", group_commit_ms: float = 0) -> None:
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._count = 0
+        self._heap_offset = 0
+        # id -> номер записи в файле
+        self._row_by_id: Dict[int, int] = {}
+        self._materialized = False
+        super().__init__(file_path, group_commit_ms)
+
+    # ---------- отображение файла ----------
+    def _map(self) -> None:
+        """(Пере)открыть mmap файла и построить индекс id -> запись."""
+        self._unmap()
+        self._count = 0
+        self._heap_offset = 0
+        self._row_by_id = {}
+        if not os.path.exists(self.file_path) or os.path.getsize(self.file_path) == 0:
+            return
+
+        self._file = open(self.file_path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._count, self._heap_offset = _read_header(self._mm)
+        # Читаем только колонку id — имена при этом не декодируются
+        for row in range(self._count):
+            (client_id,) = struct.unpack_from("<q", self._mm, HEADER.size + row * RECORD.size)
+            self._row_by_id[client_id] = row
+
+    def _unmap(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        self._unmap()
+
+    # ---------- формат хранения ----------
+    def _open_storage(self) -> None:
+        self._map()
+
+    def iter_records(self) -> Iterator[dict]:
+        for row in range(self._count):
+            yield _record_to_dict(self._mm, row, self._heap_offset)
+
+    def _load_from_storage(self) -> List[dict]:
+        self._map()
+        return list(self.iter_records())
+
+    def _dump_to_storage(
+        self,
+        data: List[dict],
+        file_name: Optional[str] = None,
+    ) -> None:
+        path = file_name or self.file_path
+        payload = encode_clients(data)
+        if path != self.file_path:
+            atomic_write(path, payload)
+            return
+        # Файл нельзя заменить, пока он отображён в память (Windows)
+        self._unmap()
+        atomic_write(path, payload)
+        self._map()
+
+    # ---------- чтение без разбора файла ----------
+    def get_by_id(self, client_id: int) -> Optional[Client]:
+        if self.stream_reads:
+            return self.fetch_by_id(client_id)
+        return super().get_by_id(client_id)
+
+    def stream_page(
+        self,
+        k: int,
+        n: int,
+        filter_fn: Optional[Callable[[Client], bool]] = None,
+        record_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> List[Client]:
+        if filter_fn is None and record_filter is None:
+            return self.fetch_page(k, n)
+        return super().stream_page(k, n, filter_fn, record_filter)
+
+    def stream_count(
+        self,
+        filter_fn: Optional[Callable[[Client], bool]] = None,
+        record_filter: Optional[Callable[[dict], bool]] = None,
+    ) -> int:
+        if filter_fn is None and record_filter is None:
+            return self._count
+        return super().stream_count(filter_fn, record_filter)
+
+    def fetch_by_id(self, client_id: int) -> Optional[Client]:
+        """Прочитать одного клиента прямо из файла по id."""
+        row = self._row_by_id.get(client_id)
+        if row is None:
+            return None
+        return self._client_from_storage(_record_to_dict(self._mm, row, self._heap_offset))
+
+    def fetch_page(self, k: int, n: int) -> List[Client]:
+        """k-я страница по n клиентов прямо из файла."""
+        if n <= 0 or k <= 0:
+            return []
+        start = (k - 1) * n
+        end = min(start + n, self._count)
+        return [
+            self._client_from_storage(_record_to_dict(self._mm, row, self._heap_offset))
+            for row in range(start, end)
+        ]
+
+    # ---------- изменение на месте ----------
+    def update_counters(
+        self,
+        client_id: int,
+        haircut_counter: Optional[int] = None,
+        discount: Optional[float] = None,
+    ) -> bool:
+        """
+        Обновить haircut_counter и/или discount клиента.
+
+        Возвращает False, если клиента нет или новое значение нарушает уникальность.
+        Пока клиенты не загружены в память, запись меняется прямо в файле:
+        читается только она сама (и колонка счётчиков для проверки уникальности).
+        """
+        if self.stream_reads:
+            with self._write_guard():
+                if self.stream_reads:
+                    return self._update_counters_in_file(client_id, haircut_counter, discount)
+        return self._execute(lambda: self._apply_update_counters(client_id, haircut_counter, discount))
+
+    def _update_counters_in_file(
+        self,
+        client_id: int,
+        haircut_counter: Optional[int],
+        discount: Optional[float],
+    ) -> bool:
+        row = self._row_by_id.get(client_id)
+        if row is None:
+            return False
+        data = _record_to_dict(self._mm, row, self._heap_offset)
+        old_counter = data["haircut_counter"]
+        if haircut_counter is not None:
+            data["haircut_counter"] = haircut_counter
+        if discount is not None:
+            data["discount"] = discount
+        client = Client(data)  # валидация новых значений
+        if client.get_haircut_counter() != old_counter and self._key_taken_in_file(row, client):
+            return False
+        self._write_counters(row, client)
+        self._version += 1
+        self._notify_change("put", client)
+        return True
+
+    def _key_taken_in_file(self, row: int, client: Client) -> bool:
+        """Есть ли в файле другой клиент с той же фамилией и числом стрижек."""
+        counter = client.get_haircut_counter()
+        last_name = client.get_last_name()
+        for other in range(self._count):
+            if other == row:
+                continue
+            offset = HEADER.size + other * RECORD.size
+            # Фамилия декодируется только у записей с тем же счётчиком
+            (other_counter,) = _HAIRCUT_FIELD.unpack_from(self._mm, offset + _HAIRCUT_OFFSET)
+            if other_counter != counter:
+                continue
+            if _record_to_dict(self._mm, other, self._heap_offset)["last_name"] == last_name:
+                return True
+        return False
+
+    def _write_counters(self, row: int, client: Client) -> None:
+        """Записать haircut_counter и discount клиента на место записи row."""
+        offset = HEADER.size + row * RECORD.size
+        _HAIRCUT_FIELD.pack_into(self._mm, offset + _HAIRCUT_OFFSET, client.get_haircut_counter())
+        _DISCOUNT_FIELD.pack_into(self._mm, offset + _DISCOUNT_OFFSET, client.get_discount())
+        self._mm.flush()
+        if self.process_lock:
+            self._bump_disk_version()
+        self._loaded_signature = self._storage_signature()
+
+    def _apply_update_counters(
+        self,
+        client_id: int,
+        haircut_counter: Optional[int],
+        discount: Optional[float],
+    ) -> bool:
+        pos = self._id_index.get(client_id)
+        if pos is None:
+            return False
+        data = self.items[pos].to_dict()
+        if haircut_counter is not None:
+            data["haircut_counter"] = haircut_counter
+        if discount is not None:
+            data["discount"] = discount
+        return self._apply_replace(client_id, Client(data))  # валидация новых значений
+
+    def _apply_replace(self, client_id: int, new_client: Client) -> bool:
+        pos = self._id_index.get(client_id)
+        row = self._row_by_id.get(client_id)
+        # На место пишутся только числовые колонки, и только если файл
+        # совпадает с self.items (нет изменений, ждущих записи)
+        if pos is None or row is None or self._pending_changes:
+            return super()._apply_replace(client_id, new_client)
+        old = self.items[pos]
+        if (
+            old.get_last_name() != new_client.get_last_name()
+            or old.get_first_name() != new_client.get_first_name()
+            or old.get_father_name() != new_client.get_father_name()
+        ):
+            return super()._apply_replace(client_id, new_client)
+        if not self._is_unique(new_client, client_id):
+            return False
+
+        new_client.set_id(client_id)
+        self._write_counters(row, new_client)
+
+        self._unindex_unique(old)
+        self.items[pos] = new_client
+        self._index_client(new_client, pos)
+        self._version += 1
+        self._notify_change("put", new_client)
+        return True
+
+
+# ---------- конвертер форматов ----------
+_FORMATS = {
+    ".json": ClientRepJson,
+    ".yaml": ClientRepYaml,
+    ".yml": ClientRepYaml,
+    ".bin": ClientRepBinary,
+}
+
+
+def _repo_class(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _FORMATS:
+        raise ValueError(f"Неизвестный формат файла: {path}")
+    return _FORMATS[ext]
+
+
+def convert(src_path: str, dst_path: str) -> int:
+    """
+    Переложить клиентов из src_path в dst_path; формат определяется
+    по расширению (.json, .yaml/.yml, .bin). Возвращает число клиентов.
+    """
+    src = _repo_class(src_path)(src_path)
+    data = [c.to_dict() for c in src.items]
+    dst = _repo_class(dst_path)(dst_path)
+    dst.dump_records(data)
+    for repo in (src, dst):
+        if isinstance(repo, ClientRepBinary):
+            repo.close()
+    return len(data)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Использование: python repo_binary.py <откуда> <куда>")
+        sys.exit(1)
+    total = convert(sys.argv[1], sys.argv[2])
+    print(f"Перенесено клиентов: {total}")
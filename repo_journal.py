@@ -0,0 +1,262 @@
+# repo_journal.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, Dict, List, Optional
+
+from hair_salon_lab2 import ClientRepBase, atomic_write
+
+# Политики fsync для журнала
+FSYNC_ALWAYS = "always"      # fsync после каждой записи: изменение не теряется при сбое
+FSYNC_INTERVAL = "interval"  # fsync не чаще раза в fsync_interval секунд
+FSYNC_NEVER = "never"        # сброс на диск оставляется ОС
+
+
+class ClientRepJournal(ClientRepBase):
+    """
+    Репозиторий с журналом изменений.
+
+    Основной файл (file_path) — обычный JSON-снимок, как у ClientRepJson.
+    Каждое изменение дописывается в конец <file_path>.journal одной
+    строкой NDJSON:
+
+        {"op": "put", "client": {...}}
+        {"op": "delete", "id": 5}
+
+    При запуске снимок загружается и журнал проигрывается поверх него.
+    Когда журнал превышает compact_threshold байт, он в фоне сворачивается
+    в новый снимок.
+    """
+
+    def __init__(
+        self,
+        file_path: str = "clients.json",
+        fsync_policy: str = FSYNC_ALWAYS,
+        fsync_interval: float = 1.0,
+        compact_threshold: int = 4 * 1024 * 1024,
+        background_compaction: bool = True,
+        group_commit_ms: float = 0,
+    ) -> None:
+        if fsync_policy not in (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER):
+            raise ValueError(f"Неизвестная политика fsync: {fsync_policy}")
+
+        self.journal_path = file_path + ".journal"
+        # Журнал, который сейчас сворачивается в снимок (или остался после сбоя)
+        self.compacting_path = file_path + ".journal.compacting"
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.background_compaction = background_compaction
+
+        self._journal_lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._journal: Optional[BinaryIO] = None
+        self._journal_size = 0
+        self._last_fsync = 0.0
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        super().__init__(file_path, group_commit_ms)
+
+    # ---------- чтение ----------
+    def _storage_signature(self) -> Optional[tuple]:
+        signatures = []
+        for path in (self.file_path, self.compacting_path, self.journal_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                signatures.append(None)
+                continue
+            signatures.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        if not any(signatures):
+            return None
+        return tuple(signatures)
+
+    def read_all(self) -> None:
+        with self._journal_lock:
+            super().read_all()
+            try:
+                self._journal_size = os.path.getsize(self.journal_path)
+            except FileNotFoundError:
+                self._journal_size = 0
+
+    def _load_from_storage(self) -> List[dict]:
+        records: Dict[int, dict] = {}
+        if os.path.exists(self.file_path):
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for d in json.load(f) or []:
+                    records[d["id"]] = d
+
+        for path in (self.compacting_path, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            valid_size = self._replay(path, records)
+            if valid_size < os.path.getsize(path):
+                # Обрезаем оборванный хвост, иначе следующая запись
+                # склеится с ним в одну испорченную строку.
+                with open(path, "r+b") as f:
+                    f.truncate(valid_size)
+
+        return list(records.values())
+
+    @staticmethod
+    def _replay(path: str, records: Dict[int, dict]) -> int:
+        """
+        Проиграть журнал поверх records (id -> данные клиента).
+
+        Возвращает размер корректной части журнала в байтах.
+        """
+        valid_size = 0
+        with open(path, "rb") as f:
+            for raw_line in f:
+                if not raw_line.endswith(b"\n"):
+                    # Оборванная последняя строка после сбоя
+                    break
+                line = raw_line.strip()
+                if line:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if entry["op"] == "put":
+                        records[entry["client"]["id"]] = entry["client"]
+                    elif entry["op"] == "delete":
+                        records.pop(entry["id"], None)
+                valid_size += len(raw_line)
+        return valid_size
+
+    # ---------- запись ----------
+    def _flush_changes(self) -> None:
+        lines = []
+        for op, client in self._pending_changes:
+            if op == "put":
+                # Кэшированная кодировка клиента вставляется как есть
+                lines.append(b'{"op":"put","client":' + client.to_json_bytes() + b"}")
+            else:
+                lines.append(json.dumps({"op": "delete", "id": client.get_id()}).encode("utf-8"))
+        self._pending_changes.clear()
+        if not lines:
+            return
+
+        payload = b"\n".join(lines) + b"\n"
+        with self._journal_lock:
+            journal = self._open_journal()
+            journal.write(payload)
+            journal.flush()
+            self._sync_journal(journal)
+            self._journal_size += len(payload)
+            self._loaded_signature = self._storage_signature()
+            need_compaction = self._journal_size >= self.compact_threshold
+
+        if need_compaction:
+            if self.background_compaction:
+                self._start_background_compaction()
+            else:
+                self.compact()
+
+    def _open_journal(self) -> BinaryIO:
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+        return self._journal
+
+    def _sync_journal(self, journal: BinaryIO) -> None:
+        if self.fsync_policy == FSYNC_ALWAYS:
+            os.fsync(journal.fileno())
+        elif self.fsync_policy == FSYNC_INTERVAL:
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(journal.fileno())
+                self._last_fsync = now
+
+    def write_all(self, file_name: Optional[str] = None) -> None:
+        """
+        Полная запись.
+
+        В другой файл — обычный экспорт снимка; в свой файл — свёртка
+        журнала в новый снимок.
+        """
+        if file_name is not None and file_name != self.file_path:
+            self._dump_to_storage([c.to_dict() for c in self.items], file_name=file_name)
+            return
+        self.compact()
+
+    def _snapshot_payload(self) -> bytes:
+        data = [c.to_dict() for c in self.items]
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+    # ---------- свёртка журнала ----------
+    def compact(self) -> None:
+        """Свернуть журнал в снимок (синхронно)."""
+        # Свёртки не должны пересекаться: иначе более старый снимок
+        # может перезаписать более новый.
+        with self._compaction_lock:
+            # Порядок блокировок тот же, что и при записи: сначала
+            # блокировка репозитория, затем журнала.
+            with self._lock, self._journal_lock:
+                payload = self._rotate_journal()
+            if payload is None:
+                return
+            atomic_write(self.file_path, payload)
+            with self._journal_lock:
+                if os.path.exists(self.compacting_path):
+                    os.remove(self.compacting_path)
+                self._loaded_signature = self._storage_signature()
+
+    def _rotate_journal(self) -> Optional[bytes]:
+        """
+        Под блокировкой журнала: снять данные для снимка и переименовать
+        текущий журнал в compacting_path. Новые изменения пойдут в свежий журнал.
+        """
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        payload = self._snapshot_payload()
+        if os.path.exists(self.compacting_path):
+            # Незаконченная свёртка после сбоя: снимок содержит оба журнала,
+            # поэтому пишем его сразу, не выходя из блокировки.
+            atomic_write(self.file_path, payload)
+            os.remove(self.compacting_path)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._journal_size = 0
+            self._loaded_signature = self._storage_signature()
+            return None
+
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, self.compacting_path)
+        self._journal_size = 0
+        return payload
+
+    def _start_background_compaction(self) -> None:
+        with self._journal_lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self.compact,
+                name="journal-compaction",
+                daemon=True,
+            )
+            self._compaction_thread.start()
+
+    def close(self) -> None:
+        """Дождаться фоновой свёртки и закрыть журнал."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    # ---------- снимок ----------
+    def _dump_to_storage(
+        self,
+        data: List[dict],
+        file_name: Optional[str] = None,
+    ) -> None:
+        path = file_name or self.file_path
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        atomic_write(path, payload)
@@ -0,0 +1,390 @@
+# repo_sharded.py
+"""
+Репозиторий клиентов, разбитый на несколько JSON-файлов (шардов).
+
+Каталог file_path содержит:
+
+    manifest.json      схема разбиения, список шардов и число клиентов в каждом
+    shard-0000.json    обычный JSON-массив клиентов, как у ClientRepJson
+    ...
+
+Схемы разбиения:
+- range — шард отвечает за диапазон id [start, start следующего шарда);
+  переполненный шард делится пополам по медиане id, а последний шард
+  (куда попадают все новые id) — после первых max_shard_size клиентов,
+  чтобы заполненные шарды не оставались полупустыми;
+- hash  — шард выбирается как id % число шардов; при переполнении любого
+  шарда их число удваивается и клиенты перераспределяются.
+
+Изменение переписывает только затронутые шарды. Шарды читаются лениво:
+get_by_id, get_count, удаление и курсорные страницы по id (схема range)
+читают только нужные файлы. Добавление и замена клиента загружают все шарды
+(уникальность (фамилия, кол-во стрижек) проверяется по всем клиентам),
+как и обращение к items (полный список, сортировка, страницы по другим полям).
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import (
+    BulkResult,
+    ClientRepBase,
+    atomic_write,
+    decode_page_cursor,
+    encode_page_cursor,
+)
+
+SCHEME_RANGE = "range"
+SCHEME_HASH = "hash"
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ClientRepSharded(ClientRepBase):
+    def __init__(
+        self,
+        file_path: str = "clients_shards",
+        scheme: str = SCHEME_RANGE,
+        max_shard_size: int = 1000,
+        hash_shards: int = 4,
+        group_commit_ms: float = 0,
+    ) -> None:
+        if scheme not in (SCHEME_RANGE, SCHEME_HASH):
+            raise ValueError(f"Неизвестная схема разбиения: {scheme}")
+        if max_shard_size < 2:
+            raise ValueError("max_shard_size должен быть не меньше 2")
+
+        self.manifest_path = os.path.join(file_path, MANIFEST_NAME)
+        self.scheme = scheme
+        self.max_shard_size = max_shard_size
+        self.hash_shards = hash_shards
+
+        self._manifest: dict = {}
+        self._items: List[Client] = []
+        # Загружен ли шард; id клиентов каждого шарда в порядке файла
+        self._loaded: List[bool] = []
+        self._shard_ids: List[Dict[int, None]] = []
+        # True, пока применяется изменение, которому хватает загруженных шардов
+        self._partial_access = False
+        super().__init__(file_path, group_commit_ms)
+
+    # ---------- ленивая загрузка ----------
+    @property
+    def items(self) -> List[Client]:
+        """Все клиенты; при первом обращении дочитываются все шарды."""
+        with self._lock:
+            if not self._partial_access:
+                self._ensure_all_loaded()
+            return self._items
+
+    @items.setter
+    def items(self, value: List[Client]) -> None:
+        self._items = value
+
+    def read_all(self) -> None:
+        """Прочитать только манифест; шарды загрузятся при обращении к ним."""
+        with self._lock:
+            signature = self._storage_signature()
+            self._manifest = self._read_manifest()
+            count = len(self._manifest["shards"])
+            self._items = []
+            self._id_index = {}
+            self._unique_index = {}
+            self._names = {}
+            self._loaded = [False] * count
+            self._shard_ids = [{} for _ in range(count)]
+            self._loaded_signature = signature
+            self._version += 1
+            self._notify_change("reload", None)
+
+    def _ensure_all_loaded(self) -> None:
+        for shard in range(len(self._loaded)):
+            self._ensure_loaded(shard)
+
+    def _ensure_loaded(self, shard: int) -> None:
+        if self._loaded[shard]:
+            return
+        path = self._shard_path(shard)
+        data: List[dict] = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f) or []
+        for d in data:
+            client = self._client_from_storage(d)
+            client_id = client.get_id()
+            # После прерванной перебалансировки в старом файле могут остаться
+            # клиенты, которые уже принадлежат другому шарду, — пропускаем их
+            if self._shard_of(client_id) != shard or client_id in self._id_index:
+                continue
+            self._items.append(client)
+            self._index_client(client, len(self._items) - 1)
+            self._shard_ids[shard][client_id] = None
+        self._loaded[shard] = True
+
+    # ---------- манифест и шарды ----------
+    def _read_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        # Новое хранилище: один шард для range, hash_shards шардов для hash
+        count = 1 if self.scheme == SCHEME_RANGE else self.hash_shards
+        return {
+            "scheme": self.scheme,
+            "next_file": count,
+            "shards": [
+                {"file": self._file_name(i), "start": 0, "count": 0}
+                for i in range(count)
+            ],
+        }
+
+    def _write_manifest(self) -> None:
+        os.makedirs(self.file_path, exist_ok=True)
+        payload = json.dumps(self._manifest, ensure_ascii=False, indent=2)
+        atomic_write(self.manifest_path, payload.encode("utf-8"))
+
+    @staticmethod
+    def _file_name(number: int) -> str:
+        return f"shard-{number:04d}.json"
+
+    def _new_file_name(self) -> str:
+        number = self._manifest["next_file"]
+        self._manifest["next_file"] = number + 1
+        return self._file_name(number)
+
+    def _shard_path(self, shard: int) -> str:
+        return os.path.join(self.file_path, self._manifest["shards"][shard]["file"])
+
+    def _shard_of(self, client_id: int) -> int:
+        shards = self._manifest["shards"]
+        if self._manifest["scheme"] == SCHEME_HASH:
+            return client_id % len(shards)
+        starts = [s["start"] for s in shards]
+        return max(bisect.bisect_right(starts, client_id) - 1, 0)
+
+    def _write_shard(self, shard: int) -> None:
+        data = [self._items[self._id_index[i]].to_dict() for i in self._shard_ids[shard]]
+        self._manifest["shards"][shard]["count"] = len(data)
+        os.makedirs(self.file_path, exist_ok=True)
+        payload = json.dumps(data, ensure_ascii=False, indent=2)
+        atomic_write(self._shard_path(shard), payload.encode("utf-8"))
+
+    def _storage_signature(self) -> Optional[tuple]:
+        """Подписи манифеста и всех файлов шардов (внешняя правка любого из них)."""
+        try:
+            entries = sorted(os.scandir(self.file_path), key=lambda e: e.name)
+        except FileNotFoundError:
+            return None
+        signatures = []
+        for entry in entries:
+            if entry.name.endswith(".json"):
+                st = entry.stat()
+                signatures.append((entry.name, st.st_mtime_ns, st.st_size, st.st_ino))
+        return tuple(signatures) or None
+
+    # ---------- чтение ----------
+    def get_by_id(self, client_id: int) -> Optional[Client]:
+        if client_id < 0:
+            return None
+        with self._lock:
+            self._ensure_loaded(self._shard_of(client_id))
+            pos = self._id_index.get(client_id)
+            return None if pos is None else self._items[pos]
+
+    def get_count(self) -> int:
+        with self._lock:
+            if all(self._loaded):
+                return len(self._items)
+            return sum(s["count"] for s in self._manifest["shards"])
+
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        n: int = 20,
+        sort: str = "id",
+    ) -> Tuple[List[Client], Optional[str]]:
+        """
+        Курсорная страница. По id в схеме range шарды упорядочены
+        по диапазонам, поэтому читаются только шарды начиная с курсора.
+        """
+        if sort != "id" or self._manifest["scheme"] != SCHEME_RANGE:
+            return super().get_page(cursor, n, sort)
+        if n <= 0:
+            return [], None
+
+        after = decode_page_cursor(cursor, sort)[1] if cursor else -1
+        page: List[Client] = []
+        with self._lock:
+            shard = self._shard_of(after + 1)
+            # Берём на одного клиента больше: так видно, есть ли следующая страница
+            while shard < len(self._manifest["shards"]) and len(page) <= n:
+                self._ensure_loaded(shard)
+                ids = sorted(i for i in self._shard_ids[shard] if i > after)
+                page.extend(self._items[self._id_index[i]] for i in ids[:n + 1 - len(page)])
+                shard += 1
+
+        next_cursor = None
+        if len(page) > n:
+            page = page[:n]
+            next_cursor = encode_page_cursor(sort, page[-1].get_id(), page[-1].get_id())
+        return page, next_cursor
+
+    # ---------- запись ----------
+    def delete_by_id(self, client_id: int) -> bool:
+        return self._execute(lambda: self._apply_delete(client_id), [client_id])
+
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]:
+        client_ids = list(client_ids)
+        return self._execute(lambda: self._apply_delete_many(client_ids), client_ids)
+
+    def _execute(self, apply: Callable[[], Any], client_ids: Optional[List[int]] = None) -> Any:
+        """
+        Загрузить нужные шарды и применить изменение.
+
+        Удалению хватает шардов удаляемых id (client_ids); проверка
+        уникальности и выдача id требуют всех шардов в памяти.
+        """
+        def apply_loaded() -> Any:
+            if client_ids is None:
+                self._ensure_all_loaded()
+                return apply()
+            for shard in {self._shard_of(i) for i in client_ids if i >= 0}:
+                self._ensure_loaded(shard)
+            # Удаление работает с items и индексами только загруженных шардов
+            self._partial_access = True
+            try:
+                return apply()
+            finally:
+                self._partial_access = False
+
+        return super()._execute(apply_loaded)
+
+    def _flush_changes(self) -> None:
+        """Переписать только шарды, затронутые накопленными изменениями."""
+        if not self._pending_changes:
+            return
+        dirty = set()
+        for op, client in self._pending_changes:
+            client_id = client.get_id()
+            shard = self._shard_of(client_id)
+            if op == "put":
+                self._shard_ids[shard][client_id] = None
+            else:
+                self._shard_ids[shard].pop(client_id, None)
+            dirty.add(shard)
+        self._pending_changes.clear()
+
+        counts_before = [s["count"] for s in self._manifest["shards"]]
+        for shard in sorted(dirty):
+            self._write_shard(shard)
+
+        if any(len(self._shard_ids[shard]) > self.max_shard_size for shard in dirty):
+            self._rebalance()
+        elif [s["count"] for s in self._manifest["shards"]] != counts_before:
+            self._write_manifest()
+        self._loaded_signature = self._storage_signature()
+
+    def _rebalance(self) -> None:
+        """
+        Разделить переполненные шарды.
+
+        Порядок записи: новые файлы шардов, затем манифест, затем старые
+        файлы. При сбое на любом шаге ни один клиент не теряется.
+        """
+        if self._manifest["scheme"] == SCHEME_HASH:
+            self._rebalance_hash()
+            return
+
+        shard = 0
+        while shard < len(self._manifest["shards"]):
+            ids = self._shard_ids[shard]
+            if len(ids) <= self.max_shard_size:
+                shard += 1
+                continue
+            ordered = sorted(ids)
+            if shard == len(self._manifest["shards"]) - 1:
+                # Последний шард: новые id всегда больше, поэтому оставляем
+                # в нём ровно max_shard_size клиентов, остальные — в новый шард
+                split_at = ordered[self.max_shard_size]
+            else:
+                # Делим по медиане id: правая половина уходит в новый шард
+                split_at = ordered[len(ordered) // 2]
+            right = {i: None for i in ids if i >= split_at}
+            left = {i: None for i in ids if i < split_at}
+
+            self._manifest["shards"].insert(
+                shard + 1,
+                {"file": self._new_file_name(), "start": split_at, "count": 0},
+            )
+            self._loaded.insert(shard + 1, True)
+            self._shard_ids.insert(shard + 1, right)
+            self._write_shard(shard + 1)
+            self._write_manifest()
+            self._shard_ids[shard] = left
+            self._write_shard(shard)
+            # Левая половина ещё может быть больше лимита — проверим её снова
+        self._write_manifest()
+
+    def _rebalance_hash(self) -> None:
+        old_files = [s["file"] for s in self._manifest["shards"]]
+        count = len(old_files)
+        while any(len(ids) > self.max_shard_size for ids in self._shard_ids):
+            count *= 2
+            shard_ids: List[Dict[int, None]] = [{} for _ in range(count)]
+            for ids in self._shard_ids:
+                for client_id in ids:
+                    shard_ids[client_id % count][client_id] = None
+            self._shard_ids = shard_ids
+
+        self._manifest["shards"] = [
+            {"file": self._new_file_name(), "start": 0, "count": 0}
+            for _ in range(count)
+        ]
+        self._loaded = [True] * count
+        for shard in range(count):
+            self._write_shard(shard)
+        self._write_manifest()
+        for name in old_files:
+            path = os.path.join(self.file_path, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write_all(self, file_name: Optional[str] = None) -> None:
+        """
+        Полная запись.
+
+        В другой файл — экспорт всех клиентов одним JSON-массивом;
+        в своё хранилище — перезапись всех шардов.
+        """
+        with self._lock:
+            data = [c.to_dict() for c in self.items]
+            if file_name is not None and file_name != self.file_path:
+                self._dump_to_storage(data, file_name=file_name)
+                return
+            self._shard_ids = [{} for _ in self._manifest["shards"]]
+            for client in self._items:
+                self._shard_ids[self._shard_of(client.get_id())][client.get_id()] = None
+            for shard in range(len(self._shard_ids)):
+                self._write_shard(shard)
+            if any(len(ids) > self.max_shard_size for ids in self._shard_ids):
+                self._rebalance()
+            else:
+                self._write_manifest()
+            self._loaded_signature = self._storage_signature()
+
+    # ---------- формат хранения ----------
+    def _load_from_storage(self) -> List[dict]:
+        with self._lock:
+            return [c.to_dict() for c in self.items]
+
+    def _dump_to_storage(
+        self,
+        data: List[dict],
+        file_name: Optional[str] = None,
+    ) -> None:
+        path = file_name or self.file_path
+        payload = json.dumps(data, ensure_ascii=False, indent=2)
+        atomic_write(path, payload.encode("utf-8"))
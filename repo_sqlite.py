@@ -0,0 +1,485 @@
+# repo_sqlite.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import (
+    BULK_NOT_FOUND,
+    BULK_NOT_UNIQUE,
+    PAGE_SORT_COLUMNS,
+    BulkResult,
+    decode_page_cursor,
+    encode_page_cursor,
+)
+
+
+class ClientRepSqlite:
+    """
+    Встроенная БД SQLite с тем же интерфейсом, что и ClientRepDB.
+
+    Не требует сервера PostgreSQL. Через ClientRepDBAdapter подключается
+    везде, где ожидается ClientRepBase.
+    """
+
+    # Стиль параметров SQL-запросов драйвера (см. ClientRepDBDecorator)
+    placeholder = "?"
+
+    def __init__(self, db_path: str = "clients.sqlite3") -> None:
+        self.db_path = db_path
+        # Соединение одно на репозиторий, доступ из потоков HTTP-сервера — под блокировкой
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            # AUTOINCREMENT: id удалённых клиентов не выдаются повторно
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS clients (
+                    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                    first_name      TEXT    NOT NULL,
+                    last_name       TEXT    NOT NULL,
+                    father_name     TEXT    NOT NULL,
+                    haircut_counter INTEGER NOT NULL,
+                    discount        INTEGER NOT NULL
+                )
+                """
+            )
+            # Уникальность (фамилия, кол-во стрижек); ведущая колонка last_name,
+            # поэтому этот же индекс обслуживает поиск по фамилии.
+            self.conn.execute(
+                """
+                CREATE UNIQUE INDEX IF NOT EXISTS clients_last_name_haircut
+                ON clients (last_name, haircut_counter)
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS clients_discount ON clients (discount)"
+            )
+            # Индексы под курсорную пагинацию по (колонка, id)
+            for column in ("last_name", "haircut_counter", "discount"):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS clients_{column}_id ON clients ({column}, id)"
+                )
+
+    # Преобразование строки из БД в dict для Client(d).
+    def _row_to_dict(self, row: Any) -> dict:
+        return {
+            "first_name": row[1],
+            "last_name": row[2],
+            "father_name": row[3],
+            "haircut_counter": row[4],
+            "discount": row[5],
+            "id": row[0],
+        }
+
+    @staticmethod
+    def _client_params(client: Client) -> tuple:
+        return (
+            client.get_first_name(),
+            client.get_last_name(),
+            client.get_father_name(),
+            client.get_haircut_counter(),
+            client.get_discount(),
+        )
+
+    def data_version(self) -> int:
+        """
+        Номер версии данных: меняется, когда другое соединение
+        зафиксировало изменения (PRAGMA data_version).
+        """
+        with self._lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # a. Получить объект по ID
+    def get_by_id(self, client_id: int) -> Optional[Client]:
+        if client_id < 0:
+            return None
+
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT id, first_name, last_name, father_name,
+                       haircut_counter, discount
+                FROM clients
+                WHERE id = ?
+                """,
+                (client_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return Client.from_trusted(self._row_to_dict(row))
+
+    # b. get_k_n_short_list: Получить список k по счету n объектов
+    def get_k_n_short_list(self, k: int, n: int) -> List[Client]:
+        if n <= 0 or k <= 0:
+            return []
+
+        offset = (k - 1) * n
+
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT id, first_name, last_name, father_name,
+                       haircut_counter, discount
+                FROM clients
+                ORDER BY id
+                LIMIT ? OFFSET ?
+                """,
+                (n, offset),
+            ).fetchall()
+
+        return [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        n: int = 20,
+        sort: str = "id",
+    ) -> Tuple[List[Client], Optional[str]]:
+        """Курсорная (keyset) пагинация, см. ClientRepDB.get_page."""
+        if sort not in PAGE_SORT_COLUMNS:
+            raise ValueError(f"Сортировка по {sort} не поддерживается")
+        if n <= 0:
+            return [], None
+
+        # sort проверен по белому списку, поэтому его можно подставить в SQL
+        order = "id" if sort == "id" else f"{sort}, id"
+        where = ""
+        params: List[Any] = []
+        if cursor:
+            value, last_id = decode_page_cursor(cursor, sort)
+            if sort == "id":
+                where = "WHERE id > ?"
+                params = [last_id]
+            else:
+                where = f"WHERE ({sort}, id) > (?, ?)"
+                params = [value, last_id]
+
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT id, first_name, last_name, father_name,
+                       haircut_counter, discount
+                FROM clients
+                {where}
+                ORDER BY {order}
+                LIMIT ?
+                """,
+                (*params, n),
+            ).fetchall()
+
+        clients = [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+        next_cursor = None
+        if len(clients) == n:
+            last = clients[-1]
+            next_cursor = encode_page_cursor(sort, PAGE_SORT_COLUMNS[sort](last), last.get_id())
+        return clients, next_cursor
+
+    # c. Добавить объект в список (при добавлении сформировать новый ID)
+    def add(self, client: Client) -> int:
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                """
+                INSERT INTO clients
+                    (first_name, last_name, father_name,
+                     haircut_counter, discount)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                self._client_params(client),
+            )
+            return cur.lastrowid
+
+    # Пакетные операции: одна транзакция на пакет.
+    def add_many(self, clients: Iterable[Client]) -> List[BulkResult]:
+        """
+        Вставить клиентов, пропустив неуникальных; отчёт по каждой строке.
+
+        Занятые ключи находятся одним запросом (_taken_keys), остальные
+        клиенты вставляются одним executemany.
+        """
+        clients = list(clients)
+        results: List[BulkResult] = []
+        accepted: List[Client] = []
+        with self._lock, self.conn:
+            taken = self._taken_keys(clients)
+            for i, client in enumerate(clients):
+                key = (client.get_last_name(), client.get_haircut_counter())
+                if key in taken:
+                    results.append(BulkResult(i, False, error=BULK_NOT_UNIQUE))
+                    continue
+                # Повтор ключа внутри пакета тоже неуникален
+                taken.add(key)
+                accepted.append(client)
+                results.append(BulkResult(i, True))
+
+            if accepted:
+                self.conn.executemany(
+                    """
+                    INSERT INTO clients
+                        (first_name, last_name, father_name,
+                         haircut_counter, discount)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [self._client_params(c) for c in accepted],
+                )
+                # Транзакция пишет одна, поэтому id пакета идут подряд
+                last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                new_id = last_id - len(accepted) + 1
+                for result, client in zip((r for r in results if r.ok), accepted):
+                    client.set_id(new_id)
+                    result.id = new_id
+                    new_id += 1
+        return results
+
+    def _taken_keys(self, clients: List[Client]) -> Set[Tuple[str, int]]:
+        """
+        Какие ключи уникальности (фамилия, кол-во стрижек) из пакета уже
+        заняты в таблице. Ключи пакета кладутся во временную таблицу,
+        а занятые находятся одним JOIN по UNIQUE-индексу.
+        """
+        keys = {(c.get_last_name(), c.get_haircut_counter()) for c in clients}
+        if not keys:
+            return set()
+        self.conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS batch_keys (
+                last_name       TEXT    NOT NULL,
+                haircut_counter INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute("DELETE FROM batch_keys")
+        self.conn.executemany("INSERT INTO batch_keys VALUES (?, ?)", keys)
+        rows = self.conn.execute(
+            """
+            SELECT c.last_name, c.haircut_counter
+            FROM clients AS c
+            JOIN batch_keys AS k
+              ON c.last_name = k.last_name
+             AND c.haircut_counter = k.haircut_counter
+            """
+        ).fetchall()
+        return set(rows)
+
+    def replace_many(self, replacements: Iterable[Tuple[int, Client]]) -> List[BulkResult]:
+        """Заменить клиентов по id в одной транзакции; отчёт по каждой строке."""
+        results: List[BulkResult] = []
+        with self._lock, self.conn:
+            for i, (client_id, client) in enumerate(replacements):
+                cur = self.conn.execute(
+                    """
+                    UPDATE OR IGNORE clients
+                    SET first_name = ?,
+                        last_name = ?,
+                        father_name = ?,
+                        haircut_counter = ?,
+                        discount = ?
+                    WHERE id = ?
+                    """,
+                    (*self._client_params(client), client_id),
+                )
+                if cur.rowcount > 0:
+                    results.append(BulkResult(i, True, client_id))
+                    continue
+                exists = self.conn.execute(
+                    "SELECT 1 FROM clients WHERE id = ?", (client_id,)
+                ).fetchone()
+                error = BULK_NOT_UNIQUE if exists else BULK_NOT_FOUND
+                results.append(BulkResult(i, False, client_id, error))
+        return results
+
+    def delete_many(self, client_ids: Iterable[int]) -> List[BulkResult]:
+        """Удалить клиентов по id в одной транзакции; отчёт по каждому id."""
+        results: List[BulkResult] = []
+        with self._lock, self.conn:
+            for i, client_id in enumerate(client_ids):
+                cur = self.conn.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+                if cur.rowcount > 0:
+                    results.append(BulkResult(i, True, client_id))
+                else:
+                    results.append(BulkResult(i, False, client_id, BULK_NOT_FOUND))
+        return results
+
+    def sync_changes(
+        self,
+        inserts: List[Client],
+        updates: List[Client],
+        deletes: List[int],
+    ) -> List[int]:
+        """
+        Применить набор изменений одной транзакцией (executemany).
+
+        Возвращает id вставленных клиентов в порядке inserts.
+        """
+        new_ids: List[int] = []
+        with self._lock, self.conn:
+            if deletes:
+                self.conn.executemany(
+                    "DELETE FROM clients WHERE id = ?",
+                    [(client_id,) for client_id in deletes],
+                )
+            if len(updates) > 1:
+                # Строки могут обмениваться ключами (фамилия, кол-во стрижек):
+                # сначала уводим их ключи на временные значения -1 - id
+                # (отрицательные и разные), иначе UNIQUE-индекс сработает
+                # посреди пакета
+                self.conn.executemany(
+                    "UPDATE clients SET haircut_counter = -1 - id WHERE id = ?",
+                    [(c.get_id(),) for c in updates],
+                )
+            if updates:
+                self.conn.executemany(
+                    """
+                    UPDATE clients
+                    SET first_name = ?,
+                        last_name = ?,
+                        father_name = ?,
+                        haircut_counter = ?,
+                        discount = ?
+                    WHERE id = ?
+                    """,
+                    [(*self._client_params(c), c.get_id()) for c in updates],
+                )
+            if inserts:
+                self.conn.executemany(
+                    """
+                    INSERT INTO clients
+                        (first_name, last_name, father_name,
+                         haircut_counter, discount)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [self._client_params(c) for c in inserts],
+                )
+                last_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                new_ids = list(range(last_id - len(inserts) + 1, last_id + 1))
+        return new_ids
+
+    # d. Заменить элемент списка по ID
+    def replace_by_id(self, client_id: int, new_client: Client) -> bool:
+        if client_id < 0:
+            return False
+
+        try:
+            with self._lock, self.conn:
+                cur = self.conn.execute(
+                    """
+                    UPDATE clients
+                    SET first_name = ?,
+                        last_name = ?,
+                        father_name = ?,
+                        haircut_counter = ?,
+                        discount = ?
+                    WHERE id = ?
+                    """,
+                    (*self._client_params(new_client), client_id),
+                )
+                return cur.rowcount > 0
+        except sqlite3.IntegrityError:
+            # Нарушение уникальности (фамилия, кол-во стрижек)
+            return False
+
+    # e. Удалить элемент списка по ID
+    def delete_by_id(self, client_id: int) -> bool:
+        if client_id < 0:
+            return False
+
+        with self._lock, self.conn:
+            cur = self.conn.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+            return cur.rowcount > 0
+
+    # f. get_count: Получить количество элементов
+    def get_count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def select_where(
+        self,
+        where: str,
+        params: List[Any],
+        order_by: str,
+        limit: int,
+        offset: int,
+    ) -> List[Client]:
+        """Выборка по готовым фрагментам WHERE / ORDER BY (см. ClientRepDBDecorator)."""
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT id, first_name, last_name, father_name,
+                       haircut_counter, discount
+                FROM clients
+                {where}
+                {order_by}
+                LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset),
+            ).fetchall()
+
+        return [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+
+    def count_where(self, where: str, params: List[Any]) -> int:
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM clients {where}", params).fetchone()[0]
+
+    def get_all(self) -> List[Client]:
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT id, first_name, last_name, father_name,
+                       haircut_counter, discount
+                FROM clients
+                ORDER BY id
+                """
+            ).fetchall()
+
+        return [Client.from_trusted(self._row_to_dict(r)) for r in rows]
+
+    def print_all(self) -> None:
+        """Красивый вывод клиентов из БД."""
+        clients = self.get_all()
+
+        if not clients:
+            print("Список клиентов пуст.")
+            return
+
+        print("\n" + "=" * 60)
+        print(
+            f"{'ID':<4} {'Фамилия':<15} {'Имя':<12} "
+            f"{'Отчество':<15} {'Стрижки':<8} {'Скидка':<6}"
+        )
+        print("-" * 60)
+
+        for client in clients:
+            print(
+                f"{client.get_id():<4} "
+                f"{client.get_last_name():<15} "
+                f"{client.get_first_name():<12} "
+                f"{client.get_father_name():<15} "
+                f"{client.get_haircut_counter():<8} "
+                f"{client.get_discount():<6}%"
+            )
+        print("=" * 60)
+
+    def clear_all(self) -> bool:
+        """Очистить таблицу clients."""
+        try:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM clients")
+                self.conn.execute("DELETE FROM sqlite_sequence WHERE name = 'clients'")
+                print("Таблица clients очищена.")
+                return True
+        except sqlite3.Error as exc:
+            print(f"Ошибка при очистке таблицы: {exc}")
+            return False
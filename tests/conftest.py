@@ -0,0 +1,21 @@
+# Модули проекта лежат в корне репозитория (плоская структура)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hair_salon_lab1_task9 import Client  # noqa: E402
+
+# Все поля клиента — для snapshot, сравнивающего записи целиком
+ALL_FIELDS = ("id", "first_name", "last_name", "father_name", "haircut_counter", "discount")
+
+
+def make_client(last_name="Иванов", counter=1, discount=0, first_name="Иван"):
+    """Клиент для тестов; id назначит репозиторий."""
+    return Client(first_name, last_name, "Иванович", counter, discount, 0)
+
+
+def snapshot(repo, fields=("id", "last_name", "haircut_counter")):
+    """Клиенты репозитория как отсортированные кортежи значений fields."""
+    return sorted(tuple(c.to_dict()[name] for name in fields) for c in repo.items)
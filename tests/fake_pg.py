@@ -0,0 +1,120 @@
+# fake_pg.py
+"""
+Минимальная замена соединения psycopg2 для тестов без сервера PostgreSQL.
+
+Понимает только запросы, которые выполняют ClientRepDB.get_all / get_by_id /
+add / replace_by_id / delete_by_id и проверка версии данных; версия растёт
+на каждую изменяющую инструкцию, как триггер clients_bump_version.
+Без таблицы версии (has_version_table=False) её можно создать DDL из
+ClientRepDB, если не задано deny_ddl.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+
+
+class FakeDatabase:
+    def __init__(self, has_version_table: bool = True, deny_ddl: bool = False) -> None:
+        self.rows: Dict[int, Tuple[Any, ...]] = {}
+        self.has_version_table = has_version_table
+        self.deny_ddl = deny_ddl
+        self.version = 0
+        self.next_id = 1
+        self.full_reads = 0
+        self.version_reads = 0
+
+    def connect(self, dsn: str) -> "FakeConnection":
+        return FakeConnection(self)
+
+    def external_insert(self, *values: Any) -> None:
+        """Запись «из другого процесса»."""
+        self.rows[self.next_id] = values
+        self.next_id += 1
+        self.bump_version()
+
+    def bump_version(self) -> None:
+        if self.has_version_table:
+            self.version += 1
+
+
+class FakeCursor:
+    def __init__(self, db: FakeDatabase) -> None:
+        self.db = db
+        self.result: List[Tuple[Any, ...]] = []
+        self.rowcount = 0
+
+    def __enter__(self) -> "FakeCursor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def execute(self, query: str, params: Optional[Tuple[Any, ...]] = None) -> None:
+        db = self.db
+        q = " ".join(query.split())
+        if q.startswith("SELECT version FROM clients_version"):
+            if not db.has_version_table:
+                raise psycopg2.Error('relation "clients_version" does not exist')
+            db.version_reads += 1
+            self.result = [(db.version,)]
+        elif q == "SELECT to_regclass('clients_version')":
+            self.result = [("clients_version" if db.has_version_table else None,)]
+        elif q.startswith("CREATE TABLE IF NOT EXISTS clients_version"):
+            if db.deny_ddl:
+                raise psycopg2.Error("permission denied for schema public")
+            db.has_version_table = True
+        elif q == "SELECT 1":
+            self.result = [(1,)]
+        elif q.startswith("SELECT id, first_name") and q.endswith("ORDER BY id"):
+            db.full_reads += 1
+            self.result = [(i, *v) for i, v in sorted(db.rows.items())]
+        elif q.startswith("SELECT id, first_name") and q.endswith("WHERE id = %s"):
+            values = db.rows.get(params[0])
+            self.result = [] if values is None else [(params[0], *values)]
+        elif q.startswith("INSERT INTO clients"):
+            db.rows[db.next_id] = tuple(params)
+            self.result = [(db.next_id,)]
+            db.next_id += 1
+            db.bump_version()
+        elif q.startswith("UPDATE clients SET"):
+            *values, client_id = params
+            self.rowcount = int(client_id in db.rows)
+            if self.rowcount:
+                db.rows[client_id] = tuple(values)
+            db.bump_version()
+        elif q.startswith("DELETE FROM clients WHERE id = %s"):
+            self.rowcount = int(db.rows.pop(params[0], None) is not None)
+            db.bump_version()
+        else:
+            raise AssertionError(f"Неожиданный запрос: {q}")
+
+    def fetchone(self) -> Optional[Tuple[Any, ...]]:
+        return self.result[0] if self.result else None
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        return self.result
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, db: FakeDatabase) -> None:
+        self.db = db
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.db)
+
+    def __enter__(self) -> "FakeConnection":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
@@ -0,0 +1,92 @@
+import pytest
+
+from client_schema import CLIENT, CLIENT_FORM, CLIENT_SHORT, format_errors
+from hair_salon_lab1_task9 import Client, ClientShort
+
+VALID = {
+    "last_name": "Петров",
+    "first_name": "Иван",
+    "father_name": "Иванович",
+    "haircut_counter": 3,
+    "discount": 5,
+    "id": 1,
+}
+
+
+def test_strict_schema_does_not_coerce():
+    assert CLIENT.clean(VALID) == VALID
+    with pytest.raises(ValueError, match="haircut_counter"):
+        CLIENT.clean({**VALID, "haircut_counter": "3"})
+    with pytest.raises(ValueError, match="Отсутствуют обязательные поля"):
+        CLIENT.clean({k: v for k, v in VALID.items() if k != "discount"})
+
+
+def test_short_schema_has_no_discount_and_id():
+    names = [f.name for f in CLIENT_SHORT.fields]
+    assert names == ["last_name", "first_name", "father_name", "haircut_counter"]
+
+
+def test_form_coerces_and_collects_all_errors():
+    ok, cleaned, errors = CLIENT_FORM.validate(
+        {
+            "last_name": "  Петров ",
+            "first_name": "Иван",
+            "father_name": "Иванович",
+            "haircut_counter": "12",
+            "discount": "7",
+        }
+    )
+    assert ok and not errors
+    assert cleaned["last_name"] == "Петров"
+    assert cleaned["haircut_counter"] == 12 and cleaned["discount"] == 7
+    assert "id" not in cleaned
+
+    ok, _, errors = CLIENT_FORM.validate(
+        {"last_name": "П", "first_name": "Иван1", "haircut_counter": "abc", "discount": 150}
+    )
+    assert not ok
+    assert set(errors) == {"last_name", "first_name", "father_name", "haircut_counter", "discount"}
+    assert "father_name: Обязательное поле" in format_errors(errors)
+
+
+def test_form_limits_are_stricter_than_model():
+    long_name = "Я" * 61
+    ok, _, errors = CLIENT_FORM.validate({**VALID, "last_name": long_name, "haircut_counter": 10_001})
+    assert not ok and set(errors) == {"last_name", "haircut_counter"}
+    # В модели (и в хранилище) такие значения допустимы
+    assert CLIENT.clean({**VALID, "last_name": long_name, "haircut_counter": 10_001})
+
+
+def test_batch_reports_errors_by_row():
+    rows = [VALID, {**VALID, "discount": -1}, "не объект", {**VALID, "last_name": "Сидоров"}]
+    result = CLIENT_FORM.validate_batch(rows)
+    assert result.positions == [0, 3]
+    assert [r["last_name"] for r in result.valid] == ["Петров", "Сидоров"]
+    assert [(e.index, sorted(e.errors)) for e in result.errors] == [
+        (1, ["discount"]),
+        (2, ["__all__"]),
+    ]
+
+
+def test_client_validates_through_schema():
+    with pytest.raises(ValueError, match="discount"):
+        Client("Иван", "Петров", "Иванович", 3, 101, 1)
+    with pytest.raises(ValueError, match="first_name"):
+        ClientShort("Петров", "Иван2", "Иванович", 3)
+    client = Client("Иван", "Петров", "Иванович", 3, 5, 1)
+    with pytest.raises(ValueError):
+        client.set_discount(-1)
+    assert client.get_discount() == 5
+
+
+def test_constructor_accepts_any_id_but_set_id_validates():
+    # Как и до схемы: id в конструкторе не проверяется
+    assert Client("Иван", "Петров", "Иванович", 3, 5, -1).get_id() == -1
+    client = Client({**VALID, "id": None})
+    assert client.get_id() is None
+    client.set_id(7)
+    assert client.get_id() == 7
+    for bad in (-1, "7", None):
+        with pytest.raises(ValueError):
+            client.set_id(bad)
+    assert client.get_id() == 7
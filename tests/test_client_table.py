@@ -0,0 +1,84 @@
+import pytest
+
+import client_table
+from client_table import ClientTable
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientFilter, ClientRepJson
+
+CLIENTS = [
+    ("Иван", "Петров", 3, 0),
+    ("Анна", "Сидорова", 12, 3),
+    ("Иван", "Кузнецов", 25, 3),
+    ("Олег", "Петров", 7, 0),
+]
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(client_table, "np", None)
+    return request.param
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = ClientRepJson(str(tmp_path / "clients.json"))
+    for first_name, last_name, counter, discount in CLIENTS:
+        repo.add(Client(first_name, last_name, "Иванович", counter, discount, 0))
+    return repo
+
+
+def test_aggregates(backend, repo):
+    table = ClientTable(repo)
+    loyal = table.mask("haircut_counter", ">=", 10)
+    assert table.count(loyal) == 2
+    assert table.mean("discount", loyal) == 3
+    assert sorted(table.ids(loyal)) == sorted(
+        c.get_id() for c in repo.items if c.get_haircut_counter() >= 10
+    )
+    assert table.histogram("haircut_counter", [0, 10, 20, 30]) == [2, 1, 1]
+    assert table.group_count("last_name") == {"Петров": 2, "Сидорова": 1, "Кузнецов": 1}
+    assert table.group_mean("last_name", "haircut_counter")["Петров"] == 5
+
+
+def test_where_matches_repository_filter(backend, repo):
+    table = ClientTable(repo)
+    spec = ClientFilter.where("first_name", "=", "Иван").and_where("haircut_counter", ">", 5)
+    expected = [c.get_id() for c in repo.items if spec(c)]
+    assert sorted(table.ids(table.where(spec))) == sorted(expected)
+    assert table.count(table.where(ClientFilter())) == len(CLIENTS)
+
+
+def test_appends_after_taking_a_vector(backend, repo):
+    table = ClientTable(repo)
+    # Держим колонку и маску, пока таблица догоняет новые записи: колонка
+    # не должна ссылаться на буфер array.array (иначе append — BufferError)
+    column = table._vector("haircut_counter")
+    held = table.mask("haircut_counter", ">", 0)
+    for i in range(3):
+        repo.add(Client("Пётр", "Новиков", "Петрович", 40 + i, 5, 0))
+    assert table.count() == len(CLIENTS) + 3
+    assert table.count(held) == len(CLIENTS)
+    assert [int(v) for v in column][: len(CLIENTS)] == [c[2] for c in CLIENTS]
+    assert table.count(table.mask("last_name", "=", "Новиков")) == 3
+
+
+def test_follows_updates_and_deletes(backend, repo):
+    table = ClientTable(repo)
+    first, second = repo.items[0], repo.items[1]
+    repo.delete_by_id(first.get_id())
+    updated = Client(
+        second.get_first_name(), second.get_last_name(), second.get_father_name(), 99, 0, 0
+    )
+    repo.replace_by_id(second.get_id(), updated)
+    assert first.get_id() not in table.ids()
+    assert table.group_count("haircut_counter")[99] == 1
+    assert table.count() == len(CLIENTS) - 1
+
+
+def test_unknown_column(backend, repo):
+    table = ClientTable(repo)
+    with pytest.raises(ValueError):
+        table.mask("phone", "=", 1)
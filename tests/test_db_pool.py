@@ -0,0 +1,185 @@
+import threading
+
+import pytest
+
+import hair_salon_lab2
+from hair_salon_lab2 import DatabaseConnection, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.dead:
+            raise RuntimeError("server closed the connection")
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.dead = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class Connector:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self, dsn):
+        conn = FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pool(**kwargs):
+    connector = Connector()
+    kwargs.setdefault("min_size", 0)
+    kwargs.setdefault("max_size", 2)
+    return connector, DatabaseConnection("fake", connect=connector, **kwargs)
+
+
+def test_connections_are_reused():
+    connector, pool = make_pool(min_size=1)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(connector.opened) == 1
+    # Незавершённая транзакция откатывается при возврате в пул
+    assert first.rollbacks >= 1
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    _, pool = make_pool(max_size=1, checkout_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    # После освобождения соединение снова выдаётся
+    with pool.connection():
+        pass
+
+
+def test_waiting_thread_gets_returned_connection():
+    _, pool = make_pool(max_size=1, checkout_timeout=5)
+    got = []
+    with pool.connection() as conn:
+        waiter = threading.Thread(target=lambda: got.append(pool._checkout()))
+        waiter.start()
+        waiter.join(0.05)
+        assert waiter.is_alive()
+    waiter.join(5)
+    assert got == [conn]
+    assert pool.stats()["waits"] == 1
+    pool._checkin(got[0])
+
+
+def test_dead_connection_is_replaced_on_checkout():
+    connector, pool = make_pool(min_size=1)
+    stale = connector.opened[0]
+    stale.dead = True
+    with pool.connection() as conn:
+        assert conn is not stale
+    assert stale.closed
+    assert pool.stats()["health_check_failures"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_broken_connection_is_not_returned_to_pool():
+    connector, pool = make_pool()
+    with pool.connection() as conn:
+        conn.closed = True
+    assert pool.stats()["size"] == 0
+    with pool.connection() as other:
+        assert other is not conn
+    assert len(connector.opened) == 2
+
+
+def test_idle_connections_above_min_size_are_recycled(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hair_salon_lab2.time, "monotonic", clock)
+    connector, pool = make_pool(min_size=1, max_size=3, max_idle_seconds=60)
+    with pool.connection(), pool.connection(), pool.connection():
+        pass
+    assert pool.stats()["size"] == 3
+
+    clock.now += 61
+    with pool.connection():
+        pass
+    stats = pool.stats()
+    # Остаётся не меньше min_size соединений
+    assert stats["size"] == 1
+    assert stats["recycled"] == 2
+    assert sum(conn.closed for conn in connector.opened) == 2
+
+
+def test_close_while_connections_are_checked_out():
+    connector, pool = make_pool(min_size=1, max_size=2)
+    with pool.connection() as busy:
+        with pool.connection():
+            pass
+        pool.close()
+        # Свободное соединение закрыто сразу, занятое — ещё нет
+        assert not busy.closed
+        assert sum(conn.closed for conn in connector.opened) == 1
+        with pytest.raises(PoolTimeoutError):
+            pool._checkout()
+    assert busy.closed
+    assert pool.stats()["size"] == 0
+    assert pool.stats()["in_use"] == 0
+
+
+def test_get_instance_replaces_closed_pool():
+    pool = DatabaseConnection.get_instance("fake-shared", min_size=0, connect=Connector())
+    assert DatabaseConnection.get_instance("fake-shared") is pool
+    pool.close()
+    fresh = DatabaseConnection.get_instance("fake-shared", min_size=0, connect=Connector())
+    assert fresh is not pool
+    fresh.close()
+
+
+def test_stats():
+    _, pool = make_pool(max_size=4)
+    with pool.connection(), pool.connection():
+        stats = pool.stats()
+        assert stats["in_use"] == 2
+        assert stats["utilisation"] == 0.5
+    stats = pool.stats()
+    assert stats == {
+        **stats,
+        "size": 2,
+        "in_use": 0,
+        "idle": 2,
+        "max_size": 4,
+        "checkouts": 2,
+        "waits": 0,
+        "health_check_failures": 0,
+        "recycled": 0,
+    }
+    assert stats["avg_wait_seconds"] == stats["total_wait_seconds"] / 2
@@ -0,0 +1,94 @@
+import pytest
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientRepFileDecorator, ClientRepJson, ClientSort
+
+
+@pytest.fixture
+def decorator(tmp_path):
+    repo = ClientRepJson(str(tmp_path / "clients.json"))
+    # Повторяющиеся значения discount проверяют устойчивость порядка
+    repo.add_many(
+        Client("Иван", f"Фамилия{chr(0x430 + i % 32)}{chr(0x430 + i // 32)}", "Иванович", i, (i * 7) % 10, 0)
+        for i in range(200)
+    )
+    return ClientRepFileDecorator(repo)
+
+
+class CountingKey:
+    """Ключ сортировки, считающий вызовы (хэшируемый — попадает в кэш)."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, client):
+        self.calls += 1
+        return client.get_discount()
+
+
+def ids(clients):
+    return [c.get_id() for c in clients]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_top_k_pages_match_full_sort(decorator, reverse):
+    clients = decorator._wrapped.items
+    expected = sorted(clients, key=lambda c: c.get_discount(), reverse=reverse)
+    sort_key = ClientSort("discount")
+    for k in (1, 2, 3, 20):
+        page = decorator.get_k_n_short_list(k, 10, sort_key=sort_key, reverse=reverse)
+        assert ids(page) == ids(expected[(k - 1) * 10:k * 10])
+
+
+def test_sorted_view_is_reused(decorator):
+    key = CountingKey()
+    decorator.get_k_n_short_list(1, 10, sort_key=key)
+    calls = key.calls
+    assert 0 < calls
+    # Та же и более ранняя страница берутся из кэша
+    decorator.get_k_n_short_list(1, 10, sort_key=key)
+    decorator.get_k_n_short_list(1, 5, sort_key=key)
+    assert key.calls == calls
+    # Глубокая страница требует полной сортировки, после неё — снова кэш
+    decorator.get_k_n_short_list(15, 10, sort_key=key)
+    calls = key.calls
+    decorator.get_k_n_short_list(19, 10, sort_key=key)
+    assert key.calls == calls
+
+
+def test_cache_is_dropped_after_change(decorator):
+    key = CountingKey()
+    decorator.get_k_n_short_list(1, 30, sort_key=key)
+    calls = key.calls
+    new_id = decorator.add(Client("Пётр", "Новиков", "Петрович", 1000, 0, 0))
+    # Новый клиент — последний из 21 со скидкой 0
+    page = decorator.get_k_n_short_list(3, 10, sort_key=key)
+    assert key.calls > calls
+    assert page[0].get_id() == new_id
+    assert decorator.get_count(lambda c: c.get_discount() == 0) == 21
+
+
+def test_filtered_list_is_shared_with_count(decorator):
+    calls = []
+
+    def only_zero(client):
+        calls.append(client)
+        return client.get_discount() == 0
+
+    assert decorator.get_count(only_zero) == 20
+    scanned = len(calls)
+    page = decorator.get_k_n_short_list(2, 5, filter_fn=only_zero)
+    assert len(calls) == scanned
+    assert all(c.get_discount() == 0 for c in page)
+
+
+def test_unhashable_key_is_not_cached(decorator):
+    class Unhashable:
+        __hash__ = None
+
+        def __call__(self, client):
+            return -client.get_haircut_counter()
+
+    page = decorator.get_k_n_short_list(1, 3, sort_key=Unhashable())
+    assert [c.get_haircut_counter() for c in page] == [199, 198, 197]
+    assert not decorator._sorted
@@ -0,0 +1,104 @@
+import pytest
+
+from repo_adapter import ClientRepoAdapter, SnapshotDiff, build_repository, diff_snapshots
+
+PAYLOAD = {
+    "first_name": "Иван",
+    "last_name": "Иванов",
+    "father_name": "Иванович",
+    "haircut_counter": 1,
+    "discount": 0,
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    return tmp_path / "data"
+
+
+def test_file_backends_do_not_share_files(data_dir):
+    json_repo = build_repository("json")
+    journal_repo = build_repository("journal")
+    assert json_repo.repo.file_path != journal_repo.repo.file_path
+    assert json_repo.repo.meta_path != journal_repo.repo.meta_path
+
+    journal_repo.create(PAYLOAD)
+    journal_repo.repo.close()
+    assert len(build_repository("journal").list_all()) == 1
+    assert build_repository("json").list_all() == ()
+
+
+def test_unknown_backend(data_dir):
+    with pytest.raises(ValueError):
+        build_repository("csv")
+
+
+def test_adapter_round_trip(data_dir):
+    repo = build_repository("json")
+    assert isinstance(repo, ClientRepoAdapter)
+    client_id = repo.create(PAYLOAD)
+    assert repo.update(client_id, {**PAYLOAD, "discount": 10})
+    assert repo.get(client_id).get_discount() == 10
+    with pytest.raises(ValueError):
+        repo.create({**PAYLOAD, "discount": 10})
+    assert repo.delete(client_id)
+    assert repo.list_all() == ()
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "binary", "sharded", "sqlite"])
+def test_create_many_reports_duplicates_from_repository(data_dir, backend):
+    repo = build_repository(backend)
+    existing = repo.create({**PAYLOAD, "last_name": "Петров"})
+    other = {**PAYLOAD, "last_name": "Сидоров"}
+    results = repo.create_many(
+        [
+            PAYLOAD,
+            {**PAYLOAD, "discount": 5},  # повтор строки 0 внутри пакета
+            {**PAYLOAD, "last_name": "Петров"},  # уже есть в хранилище
+            {**PAYLOAD, "haircut_counter": "много"},
+            other,
+        ]
+    )
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.ok for r in results] == [True, False, False, False, True]
+    assert results[1].error == results[2].error
+    assert "haircut_counter" in results[3].error
+    ids = sorted(c.get_id() for c in repo.list_all())
+    assert ids == sorted([existing, results[0].id, results[4].id])
+
+
+def test_create_many_skips_exact_repeats_before_repository(data_dir, monkeypatch):
+    repo = build_repository("json")
+    batches = []
+    add_many = repo.repo.add_many
+
+    def recording_add_many(clients):
+        batches.append(len(clients))
+        return add_many(clients)
+
+    monkeypatch.setattr(repo.repo, "add_many", recording_add_many)
+    results = repo.create_many([PAYLOAD, dict(PAYLOAD), {**PAYLOAD, "last_name": "Петров"}])
+    assert [r.ok for r in results] == [True, False, True]
+    assert batches == [2]
+
+
+def test_diff_snapshots(data_dir):
+    repo = build_repository("json")
+    kept = repo.create(PAYLOAD)
+    edited = repo.create({**PAYLOAD, "last_name": "Петров"})
+    removed = repo.create({**PAYLOAD, "last_name": "Сидоров"})
+    before = repo.snapshot()
+
+    repo.update(edited, {**PAYLOAD, "last_name": "Петров", "discount": 5})
+    repo.delete(removed)
+    added = repo.create({**PAYLOAD, "last_name": "Кузнецов"})
+    diff = diff_snapshots(before, repo.snapshot())
+
+    assert [r.id for r in diff.added] == [added]
+    assert [r.id for r in diff.removed] == [removed]
+    assert [(old.discount, new.discount) for old, new in diff.changed] == [(0, 5)]
+    assert diff.changed[0][1].id == edited
+    assert kept not in {r.id for r in diff.added + diff.removed}
+    assert diff_snapshots(before, before) == SnapshotDiff((), (), ())
@@ -0,0 +1,140 @@
+import os
+
+import pytest
+
+from conftest import ALL_FIELDS, make_client, snapshot
+from hair_salon_lab2 import ClientRepJson, ClientRepYaml
+from repo_binary import ClientRepBinary, convert
+
+
+def make_binary(tmp_path, names=("Иванов", "Петров", "Сидоров")):
+    path = str(tmp_path / "clients.bin")
+    repo = ClientRepBinary(path)
+    repo.add_many(make_client(name) for name in names)
+    repo.close()
+    return path
+
+
+def test_conversion_round_trip(tmp_path):
+    json_path = str(tmp_path / "clients.json")
+    source = ClientRepJson(json_path)
+    source.add_many([make_client("Иванов", 2, 5), make_client("Петров", 3, 12.5)])
+
+    bin_path = str(tmp_path / "clients.bin")
+    yaml_path = str(tmp_path / "clients.yaml")
+    assert convert(json_path, bin_path) == 2
+    assert convert(bin_path, yaml_path) == 2
+
+    binary = ClientRepBinary(bin_path)
+    assert snapshot(binary, ALL_FIELDS) == snapshot(source, ALL_FIELDS)
+    binary.close()
+    assert snapshot(ClientRepYaml(yaml_path), ALL_FIELDS) == snapshot(source, ALL_FIELDS)
+
+
+def test_reads_do_not_decode_the_whole_file(tmp_path, monkeypatch):
+    path = make_binary(tmp_path)
+
+    def no_full_load(self):
+        raise AssertionError("файл не должен разбираться целиком")
+
+    repo = ClientRepBinary(path)
+    monkeypatch.setattr(ClientRepBinary, "_load_from_storage", no_full_load)
+    ids = sorted(repo._row_by_id)
+
+    assert repo.get_count() == 3
+    assert repo.get_by_id(ids[1]).get_last_name() == "Петров"
+    assert repo.get_by_id(10_000) is None
+    assert [c.get_last_name() for c in repo.get_k_n_short_list(2, 2)] == ["Сидоров"]
+    repo.close()
+
+
+def test_counter_update_is_written_in_place(tmp_path):
+    path = make_binary(tmp_path)
+    repo = ClientRepBinary(path)
+    client_id = repo.get_k_n_short_list(1, 1)[0].get_id()
+    inode = os.stat(path).st_ino
+
+    assert repo.update_counters(client_id, haircut_counter=9, discount=15)
+    assert repo.replace_by_id(client_id, make_client("Иванов", 10, 20))
+    # Файл не перезаписывался (atomic_write создал бы новый inode)
+    assert os.stat(path).st_ino == inode
+    repo.close()
+
+    reopened = ClientRepBinary(path)
+    client = reopened.get_by_id(client_id)
+    assert (client.get_haircut_counter(), client.get_discount()) == (10, 20)
+    reopened.close()
+
+
+def test_counter_update_does_not_load_items(tmp_path, monkeypatch):
+    path = make_binary(tmp_path, names=("Иванов", "Петров"))
+    repo = ClientRepBinary(path)
+
+    def no_full_load(self):
+        raise AssertionError("файл не должен разбираться целиком")
+
+    monkeypatch.setattr(ClientRepBinary, "_load_from_storage", no_full_load)
+    first, second = sorted(repo._row_by_id)
+    inode = os.stat(path).st_ino
+    changes = []
+    repo.add_change_listener(lambda op, client, version: changes.append((op, client.get_id())))
+
+    assert repo.update_counters(first, discount=7.5)
+    assert repo.update_counters(second, haircut_counter=5)
+    # Записи правились прямо в файле: items не загружались, файл не заменялся
+    assert repo.stream_reads
+    assert os.stat(path).st_ino == inode
+    assert changes == [("put", first), ("put", second)]
+    assert repo.get_by_id(first).get_discount() == 7.5
+    assert not repo.update_counters(10_000, discount=1)
+    repo.close()
+
+    monkeypatch.undo()
+    reopened = ClientRepBinary(path)
+    client = reopened.get_by_id(second)
+    assert (client.get_last_name(), client.get_haircut_counter()) == ("Петров", 5)
+    reopened.close()
+
+
+def test_in_file_counter_update_keeps_uniqueness(tmp_path):
+    path = str(tmp_path / "clients.bin")
+    repo = ClientRepBinary(path)
+    repo.add_many([make_client("Иванов", 1), make_client("Иванов", 2), make_client("Петров", 3)])
+    repo.close()
+
+    repo = ClientRepBinary(path)
+    ids = sorted(repo._row_by_id)
+    assert not repo.update_counters(ids[0], haircut_counter=2)
+    assert repo.update_counters(ids[0], haircut_counter=3)  # 3 стрижки у Петрова — не конфликт
+    assert repo.stream_reads
+    assert [repo.get_by_id(i).get_haircut_counter() for i in ids] == [3, 2, 3]
+    with pytest.raises(ValueError):
+        repo.update_counters(ids[0], discount=101)
+    repo.close()
+
+
+def test_in_place_update_keeps_uniqueness(tmp_path):
+    path = make_binary(tmp_path, names=("Иванов",))
+    repo = ClientRepBinary(path)
+    client_id = repo.get_k_n_short_list(1, 1)[0].get_id()
+    other_id = repo.add(make_client("Иванов", 2))
+
+    assert not repo.update_counters(client_id, haircut_counter=2)
+    assert repo.get_by_id(client_id).get_haircut_counter() == 1
+    assert repo.get_by_id(other_id).get_haircut_counter() == 2
+    repo.close()
+
+
+def test_renamed_client_rewrites_the_file(tmp_path):
+    path = make_binary(tmp_path)
+    repo = ClientRepBinary(path)
+    client_id = repo.get_k_n_short_list(1, 1)[0].get_id()
+    assert repo.replace_by_id(client_id, make_client("Кузнецов"))
+    new_id = repo.add(make_client("Смирнов"))
+    repo.close()
+
+    reopened = ClientRepBinary(path)
+    assert reopened.get_by_id(client_id).get_last_name() == "Кузнецов"
+    assert reopened.get_by_id(new_id).get_last_name() == "Смирнов"
+    assert reopened.get_count() == 4
+    reopened.close()
@@ -0,0 +1,104 @@
+import pytest
+
+from fake_pg import FakeDatabase
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientRepDB, ClientRepDBAdapter, DatabaseConnection
+from repo_adapter import ClientRepoAdapter
+
+
+def make_adapter(**db_options):
+    db = FakeDatabase(**db_options)
+    db.external_insert("Иван", "Иванов", "Иванович", 4, 10)
+    pool = DatabaseConnection("fake", min_size=0, connect=db.connect)
+    return db, ClientRepDBAdapter(ClientRepDB(pool))
+
+
+def test_no_reload_without_changes():
+    db, repo = make_adapter()
+    assert db.full_reads == 1
+    assert repo.reload_if_changed() is False
+    assert db.full_reads == 1
+
+
+def test_own_writes_do_not_reload_the_table():
+    db, repo = make_adapter()
+    new_id = repo.add(Client("Пётр", "Петров", "Петрович", 1, 0, 0))
+    assert repo.replace_by_id(new_id, Client("Пётр", "Петров", "Петрович", 2, 5, new_id))
+    assert repo.delete_by_id(1)
+    assert repo.reload_if_changed() is False
+    assert db.full_reads == 1
+    assert [c.get_id() for c in repo.items] == [new_id]
+
+
+def test_external_write_triggers_reload():
+    db, repo = make_adapter()
+    db.external_insert("Анна", "Смирнова", "Олеговна", 3, 0)
+    assert repo.reload_if_changed() is True
+    assert db.full_reads == 2
+    assert len(repo.items) == 2
+
+
+def test_write_after_external_change_still_reloads():
+    db, repo = make_adapter()
+    db.external_insert("Анна", "Смирнова", "Олеговна", 3, 0)
+    # Чужая запись была до нашей — версия «до» не совпадает с загруженной
+    repo.db_repo.add(Client("Пётр", "Петров", "Петрович", 1, 0, 0))
+    repo._after_write()
+    assert repo.reload_if_changed() is True
+
+
+def test_app_adapter_reads_by_id_without_version_check():
+    db, repo = make_adapter()
+    adapter = ClientRepoAdapter(repo=repo)
+    db.external_insert("Анна", "Смирнова", "Олеговна", 3, 0)
+    version_reads = db.version_reads
+
+    assert adapter.get(2).get_last_name() == "Смирнова"
+    assert db.version_reads == version_reads
+    assert db.full_reads == 1
+
+
+def test_app_adapter_create_checks_version_once():
+    db, repo = make_adapter()
+    adapter = ClientRepoAdapter(repo=repo)
+    db.external_insert("Анна", "Смирнова", "Олеговна", 3, 0)
+
+    payload = {
+        "first_name": "Пётр",
+        "last_name": "Смирнова",
+        "father_name": "Петрович",
+        "haircut_counter": 3,
+        "discount": 0,
+    }
+    # Репозиторий сам перечитал таблицу и увидел чужого клиента с тем же ключом
+    with pytest.raises(ValueError):
+        adapter.create(payload)
+    assert db.full_reads == 2
+    # Снимок уже актуален — повторной выгрузки нет
+    assert len(adapter.list_all()) == 2
+    assert db.full_reads == 2
+
+
+def test_version_table_is_created_for_an_old_database():
+    # База создана до появления clients_version (без ensure_clients_table)
+    db, repo = make_adapter(has_version_table=False)
+    assert db.has_version_table
+    new_id = repo.add(Client("Пётр", "Петров", "Петрович", 1, 0, 0))
+    assert repo.get_by_id(new_id).get_last_name() == "Петров"
+    assert repo.reload_if_changed() is False
+    db.external_insert("Анна", "Смирнова", "Олеговна", 3, 0)
+    assert repo.reload_if_changed() is True
+
+
+def test_writes_work_without_version_table():
+    # Нет прав создать таблицу версии: записи идут без неё,
+    # а данные перечитываются при каждой проверке
+    db, repo = make_adapter(has_version_table=False, deny_ddl=True)
+    new_id = repo.add(Client("Пётр", "Петров", "Петрович", 1, 0, 0))
+    assert repo.replace_by_id(new_id, Client("Пётр", "Петров", "Петрович", 2, 5, new_id))
+    assert repo.delete_by_id(1)
+    assert repo.db_repo.last_write is None
+    reads = db.full_reads
+    assert repo.reload_if_changed() is True
+    assert db.full_reads == reads + 1
+    assert [c.get_id() for c in repo.items] == [new_id]
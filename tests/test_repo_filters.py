@@ -0,0 +1,80 @@
+import pytest
+
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientFilter, ClientRepDBDecorator, ClientSort
+from repo_sqlite import ClientRepSqlite
+
+CLIENTS = [
+    ("Анна", "Иванова", 3, 10),
+    ("Мария", "Петрова", 1, 0),
+    ("Ольга", "Иванова", 5, 20),
+    ("Елена", "Сидорова", 2, 10),
+    ("Ирина", "Кузнецова", 4, 5),
+]
+
+
+@pytest.fixture
+def decorator(tmp_path):
+    db = ClientRepSqlite(str(tmp_path / "clients.sqlite3"))
+    for first_name, last_name, counter, discount in CLIENTS:
+        db.add(Client(first_name, last_name, "Олеговна", counter, discount, 0))
+    return ClientRepDBDecorator(db)
+
+
+def names(clients):
+    return [c.get_first_name() for c in clients]
+
+
+def python_page(decorator, k, n, filter_fn, sort_key, reverse=False):
+    """Тот же запрос без перевода в SQL (обычные функции вместо ClientFilter/ClientSort)."""
+    return decorator.get_k_n_short_list(
+        k,
+        n,
+        filter_fn=(lambda c: filter_fn(c)) if filter_fn else None,
+        sort_key=(lambda c: sort_key(c)) if sort_key else None,
+        reverse=reverse != getattr(sort_key, "descending", False),
+    )
+
+
+@pytest.mark.parametrize(
+    "filter_fn",
+    [
+        None,
+        ClientFilter.where("discount", ">=", 10),
+        ClientFilter.where("last_name", "=", "Иванова").and_where("haircut_counter", ">", 3),
+        ClientFilter.where("first_name", "in", ("Анна", "Ирина")),
+        ClientFilter.where("first_name", "in", ()),
+    ],
+)
+@pytest.mark.parametrize(
+    "sort_key",
+    [None, ClientSort("haircut_counter"), ClientSort("discount", descending=True), ClientSort("last_name")],
+)
+def test_sql_matches_python(decorator, filter_fn, sort_key):
+    for k in (1, 2):
+        assert names(decorator.get_k_n_short_list(k, 2, filter_fn, sort_key)) == names(
+            python_page(decorator, k, 2, filter_fn, sort_key)
+        )
+    expected = decorator.get_count(lambda c: filter_fn(c)) if filter_fn else len(CLIENTS)
+    assert decorator.get_count(filter_fn) == expected
+
+
+def test_sql_page_is_pushed_down(decorator, monkeypatch):
+    def no_full_scan():
+        raise AssertionError("таблица не должна выгружаться целиком")
+
+    monkeypatch.setattr(decorator._wrapped, "get_all", no_full_scan)
+    page = decorator.get_k_n_short_list(
+        1, 2, ClientFilter.where("discount", "=", 10), ClientSort("haircut_counter"), reverse=True
+    )
+    assert names(page) == ["Анна", "Елена"]
+    assert decorator.get_count(ClientFilter.where("discount", "=", 10)) == 2
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        ClientFilter.where("id; DROP TABLE clients", "=", 1)
+    with pytest.raises(ValueError):
+        ClientFilter.where("discount", "LIKE", 1)
+    with pytest.raises(ValueError):
+        ClientSort("password")
@@ -0,0 +1,98 @@
+import os
+
+from conftest import make_client, snapshot
+from repo_journal import FSYNC_NEVER, ClientRepJournal
+
+
+def open_repo(path, **kwargs):
+    kwargs.setdefault("background_compaction", False)
+    return ClientRepJournal(str(path), **kwargs)
+
+
+def test_changes_survive_reopen(tmp_path):
+    path = tmp_path / "clients.json"
+    repo = open_repo(path)
+    first = repo.add(make_client("Иванов"))
+    second = repo.add(make_client("Петров"))
+    assert repo.replace_by_id(second, make_client("Петров", 7))
+    repo.close()
+
+    # Снимка ещё нет — всё состояние в журнале
+    assert not os.path.exists(path)
+    reopened = open_repo(path)
+    assert snapshot(reopened) == [(first, "Иванов", 1), (second, "Петров", 7)]
+    reopened.close()
+
+
+def test_delete_is_replayed(tmp_path):
+    path = tmp_path / "clients.json"
+    repo = open_repo(path)
+    first = repo.add(make_client("Иванов"))
+    second = repo.add(make_client("Петров"))
+    assert repo.delete_by_id(first)
+    repo.close()
+
+    reopened = open_repo(path)
+    assert snapshot(reopened) == [(second, "Петров", 1)]
+    reopened.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    path = tmp_path / "clients.json"
+    repo = open_repo(path, fsync_policy=FSYNC_NEVER)
+    first = repo.add(make_client("Иванов"))
+    repo.close()
+
+    journal_path = repo.journal_path
+    valid_size = os.path.getsize(journal_path)
+    # Запись оборвалась посреди строки
+    with open(journal_path, "ab") as f:
+        f.write(b'{"op":"put","client":{"id":99,"last_na')
+
+    reopened = open_repo(path, fsync_policy=FSYNC_NEVER)
+    assert snapshot(reopened) == [(first, "Иванов", 1)]
+    assert os.path.getsize(journal_path) == valid_size
+
+    # Следующая запись не склеивается с обрывком
+    second = reopened.add(make_client("Петров"))
+    reopened.close()
+    again = open_repo(path, fsync_policy=FSYNC_NEVER)
+    assert snapshot(again) == [(first, "Иванов", 1), (second, "Петров", 1)]
+    again.close()
+
+
+def test_compact_folds_journal_into_snapshot(tmp_path):
+    path = tmp_path / "clients.json"
+    repo = open_repo(path)
+    first = repo.add(make_client("Иванов"))
+    second = repo.add(make_client("Петров"))
+    assert repo.delete_by_id(first)
+    repo.compact()
+    repo.close()
+
+    assert os.path.exists(path)
+    assert not os.path.exists(repo.journal_path)
+    assert not os.path.exists(repo.compacting_path)
+    reopened = open_repo(path)
+    assert snapshot(reopened) == [(second, "Петров", 1)]
+    reopened.close()
+
+
+def test_interrupted_compaction_is_replayed(tmp_path):
+    path = tmp_path / "clients.json"
+    repo = open_repo(path)
+    first = repo.add(make_client("Иванов"))
+    repo.close()
+    # Сбой после переименования журнала, до записи снимка
+    os.replace(repo.journal_path, repo.compacting_path)
+
+    reopened = open_repo(path)
+    second = reopened.add(make_client("Петров"))
+    assert snapshot(reopened) == [(first, "Иванов", 1), (second, "Петров", 1)]
+    reopened.compact()
+    reopened.close()
+
+    assert not os.path.exists(repo.compacting_path)
+    again = open_repo(path)
+    assert snapshot(again) == [(first, "Иванов", 1), (second, "Петров", 1)]
+    again.close()
@@ -0,0 +1,205 @@
+import base64
+import json
+import os
+import threading
+
+import pytest
+
+import hair_salon_lab2
+from conftest import make_client, snapshot
+from hair_salon_lab2 import ClientRepFileDecorator, ClientRepJson
+
+
+def count_dumps(repo, monkeypatch):
+    calls = []
+    dump = repo._dump_clients
+
+    def counting_dump(clients, file_name=None):
+        calls.append(len(clients))
+        dump(clients, file_name=file_name)
+
+    monkeypatch.setattr(repo, "_dump_clients", counting_dump)
+    return calls
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_changes_survive_reopen(tmp_path, compact):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path, compact=compact)
+    first = repo.add(make_client("Иванов"))
+    second = repo.add(make_client("Петров"))
+    assert repo.replace_by_id(second, make_client("Петров", 3))
+
+    reopened = ClientRepJson(path, compact=compact)
+    assert snapshot(reopened) == [(first, "Иванов", 1), (second, "Петров", 3)]
+
+
+def test_atomic_write_leaves_no_temporary_files(tmp_path):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path)
+    repo.add(make_client("Иванов"))
+    repo.add(make_client("Петров"))
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+
+def test_failed_write_keeps_old_file_and_rolls_back(tmp_path, monkeypatch):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path)
+    first = repo.add(make_client("Иванов"))
+    with open(path, "rb") as f:
+        before = f.read()
+
+    def failing_replace(src, dst):
+        raise OSError("диск отключён")
+
+    monkeypatch.setattr(hair_salon_lab2.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        repo.add(make_client("Петров"))
+    monkeypatch.undo()
+
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+    # Память вернулась к данным на диске
+    assert snapshot(repo) == [(first, "Иванов", 1)]
+
+
+def test_group_commit_writes_concurrent_changes_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path, group_commit_ms=100)
+    calls = count_dumps(repo, monkeypatch)
+
+    names = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов"]
+    results = {}
+    barrier = threading.Barrier(len(names))
+
+    def worker(name):
+        barrier.wait()
+        results[name] = repo.add(make_client(name))
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results[name] is not None for name in names)
+    assert len(set(results.values())) == len(names)
+    # Все изменения пришли в одно окно — файл записан меньше раз, чем изменений
+    assert 1 <= len(calls) < len(names)
+
+    reopened = ClientRepJson(path)
+    assert sorted(c.get_last_name() for c in reopened.items) == sorted(names)
+
+
+def test_group_commit_reports_errors_per_change(tmp_path):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path, group_commit_ms=10)
+    first = repo.add(make_client("Иванов"))
+    # Дубликат по (фамилия, стрижки) не добавляется, но и не ломает группу
+    assert repo.add(make_client("Иванов")) is None
+    assert repo.replace_by_id(first, make_client("Иванов", 2))
+    assert snapshot(ClientRepJson(path)) == [(first, "Иванов", 2)]
+
+
+def make_streaming_repo(tmp_path, monkeypatch):
+    path = str(tmp_path / "clients.json")
+    ClientRepJson(path).add_many(make_client(name) for name in ["Иванов", "Петров", "Сидоров"])
+    loads = []
+    load = ClientRepJson._load_from_storage
+
+    def counting_load(self):
+        loads.append(1)
+        return load(self)
+
+    monkeypatch.setattr(ClientRepJson, "_load_from_storage", counting_load)
+    return ClientRepJson(path, streaming=True), loads
+
+
+def test_streaming_reads_do_not_load_the_file(tmp_path, monkeypatch):
+    repo, loads = make_streaming_repo(tmp_path, monkeypatch)
+    first_id = repo.stream_page(1, 1)[0].get_id()
+
+    assert [c.get_last_name() for c in repo.get_k_n_short_list(2, 2)] == ["Сидоров"]
+    assert repo.get_count() == 3
+    assert repo.get_by_id(first_id).get_last_name() == "Иванов"
+    assert repo.get_by_id(-1) is None
+    assert repo.reload_if_changed() is False
+    assert loads == []
+
+
+def test_streaming_loads_items_on_first_change(tmp_path, monkeypatch):
+    repo, loads = make_streaming_repo(tmp_path, monkeypatch)
+    new_id = repo.add(make_client("Кузнецов"))
+    assert loads == [1]
+    assert repo.stream_reads is False
+    assert repo.get_by_id(new_id).get_last_name() == "Кузнецов"
+    assert [c.get_last_name() for c in repo.get_k_n_short_list(2, 2)] == ["Сидоров", "Кузнецов"]
+
+
+def test_decorator_counts_loaded_items_without_streaming(tmp_path, monkeypatch):
+    repo, _ = make_streaming_repo(tmp_path, monkeypatch)
+    decorator = ClientRepFileDecorator(repo)
+    assert decorator.get_count() == 3
+    repo.add(make_client("Кузнецов"))
+
+    def no_streaming():
+        raise AssertionError("файл не должен перечитываться")
+
+    monkeypatch.setattr(repo, "iter_records", no_streaming)
+    assert decorator.get_count() == 4
+    assert decorator.get_count(lambda c: c.get_last_name().startswith("П")) == 1
+    assert len(decorator.get_k_n_short_list(1, 10)) == 4
+
+
+def crafted_cursor(*parts):
+    raw = json.dumps(list(parts)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+@pytest.mark.parametrize(
+    "sort, parts",
+    [
+        ("id", ["id", "x", "y"]),
+        ("id", ["id", 1, True]),
+        ("haircut_counter", ["haircut_counter", "много", 1]),
+        ("last_name", ["last_name", 5, 1]),
+        ("discount", ["discount", None, 1]),
+        ("id", ["id", 1]),
+    ],
+)
+def test_malformed_page_cursor_raises_value_error(tmp_path, sort, parts):
+    repo = ClientRepJson(str(tmp_path / "clients.json"))
+    repo.add(make_client("Иванов"))
+    with pytest.raises(ValueError):
+        repo.get_page(crafted_cursor(*parts), n=2, sort=sort)
+
+
+def test_page_order_is_sorted_once_per_version(tmp_path):
+    repo = ClientRepJson(str(tmp_path / "clients.json"))
+    repo.add_many(make_client(name, counter) for counter, name in enumerate(["Петров", "Иванов", "Сидоров"]))
+    first, cursor = repo.get_page(n=2, sort="last_name")
+    ordered = repo._page_order("last_name")[0]
+    rest, _ = repo.get_page(cursor, n=2, sort="last_name")
+    assert repo._page_order("last_name")[0] is ordered
+    assert [c.get_last_name() for c in first + rest] == ["Иванов", "Петров", "Сидоров"]
+
+    repo.add(make_client("Абрамов"))
+    assert repo._page_order("last_name")[0] is not ordered
+    first, cursor = repo.get_page(n=2, sort="last_name")
+    assert [c.get_last_name() for c in first] == ["Абрамов", "Иванов"]
+    assert [c.get_last_name() for c in repo.get_page(cursor, n=2, sort="last_name")[0]] == ["Петров", "Сидоров"]
+
+
+def test_locked_blocks_writers(tmp_path):
+    repo = ClientRepJson(str(tmp_path / "clients.json"))
+    writer = threading.Thread(target=repo.add, args=(make_client("Иванов"),))
+    with repo.locked():
+        with repo.locked():  # повторный вход из того же потока не блокирует
+            writer.start()
+            writer.join(timeout=0.2)
+            assert writer.is_alive()
+            assert repo.items == []
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+    assert [c.get_last_name() for c in repo.items] == ["Иванов"]
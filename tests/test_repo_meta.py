@@ -0,0 +1,108 @@
+import json
+import multiprocessing
+
+import pytest
+
+from conftest import make_client
+from hair_salon_lab2 import ClientRepJson, fcntl
+
+
+def open_repo(path):
+    return ClientRepJson(path, process_lock=True)
+
+
+def read_meta(path):
+    with open(path + ".meta", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_write_bumps_disk_version(tmp_path):
+    path = str(tmp_path / "clients.json")
+    repo = open_repo(path)
+    repo.add(make_client("Иванов"))
+    version = read_meta(path)["version"]
+    repo.add(make_client("Петров"))
+    assert read_meta(path)["version"] == version + 1
+
+
+def test_stale_writer_applies_changes_on_top_of_fresh_data(tmp_path):
+    path = str(tmp_path / "clients.json")
+    first = open_repo(path)
+    second = open_repo(path)
+    a = first.add(make_client("Иванов"))
+    # second ещё не видел запись first — и не должен её затереть
+    b = second.add(make_client("Петров"))
+    assert a != b
+    assert second.add(make_client("Иванов")) is None
+
+    reopened = open_repo(path)
+    assert sorted(c.get_last_name() for c in reopened.items) == ["Иванов", "Петров"]
+    assert first.reload_if_changed() is True
+    assert len(first.items) == 2
+
+
+def _add_clients(path, prefix, count):
+    repo = open_repo(path)
+    for i in range(count):
+        repo.add(make_client(prefix, i))
+
+
+@pytest.mark.skipif(fcntl is None, reason="нужен fcntl.flock")
+def test_concurrent_processes_do_not_lose_writes(tmp_path):
+    path = str(tmp_path / "clients.json")
+    open_repo(path)
+    ctx = multiprocessing.get_context("fork")
+    names = ["Иванов", "Петров", "Сидоров", "Кузнецов"]
+    workers = [ctx.Process(target=_add_clients, args=(path, name, 10)) for name in names]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    clients = open_repo(path).items
+    assert len(clients) == 40
+    assert len({c.get_id() for c in clients}) == 40
+
+
+def test_ids_are_not_reused_after_delete_and_reopen(tmp_path):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path)
+    first = repo.add(make_client("Иванов"))
+    second = repo.add(make_client("Петров"))
+    assert repo.delete_by_id(second)
+
+    reopened = ClientRepJson(path)
+    third = reopened.add(make_client("Сидоров"))
+    assert third > second > first
+
+
+def test_single_adds_leave_no_gaps(tmp_path):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path)
+    ids = [repo.add(make_client("Иванов", i)) for i in range(10)]
+    assert ids == list(range(ids[0], ids[0] + 10))
+    assert read_meta(path)["next_id"] == ids[-1] + 1
+
+    # Ни перезапуск, ни второй процесс не пропускают id
+    reopened = ClientRepJson(path)
+    assert reopened.add(make_client("Петров")) == ids[-1] + 1
+    assert repo.add(make_client("Сидоров")) == ids[-1] + 2
+    assert reopened.add(make_client("Кузнецов")) == ids[-1] + 3
+
+
+def test_batch_gets_one_block(tmp_path):
+    path = str(tmp_path / "clients.json")
+    repo = ClientRepJson(path)
+    results = repo.add_many(make_client("Иванов", i) for i in range(100))
+    ids = [r.id for r in results]
+    assert ids == list(range(ids[0], ids[0] + 100))
+    assert read_meta(path)["next_id"] == ids[0] + 100
+
+
+def test_sequence_starts_after_existing_ids(tmp_path):
+    path = str(tmp_path / "clients.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{**make_client("Иванов").to_dict(), "id": 41}], f, ensure_ascii=False)
+    repo = ClientRepJson(path)
+    assert repo.add(make_client("Петров")) == 42
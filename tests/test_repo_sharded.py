@@ -0,0 +1,115 @@
+import json
+import os
+
+from conftest import make_client
+from hair_salon_lab2 import ClientRepBase
+from repo_sharded import SCHEME_HASH, ClientRepSharded
+
+
+def fill(path, count, **kwargs):
+    repo = ClientRepSharded(path, **kwargs)
+    ids = [repo.add(make_client(counter=i)) for i in range(count)]
+    return repo, ids
+
+
+def shard_counts(repo):
+    return [s["count"] for s in repo._manifest["shards"]]
+
+
+def test_round_trip_and_reopen(tmp_path):
+    path = str(tmp_path / "shards")
+    repo, ids = fill(path, 10, max_shard_size=4)
+    assert repo.replace_by_id(ids[3], make_client(counter=100))
+
+    reopened = ClientRepSharded(path, max_shard_size=4)
+    assert reopened.get_count() == 10
+    assert reopened.get_by_id(ids[3]).get_haircut_counter() == 100
+    assert sorted(c.get_id() for c in reopened.items) == ids
+
+
+def test_tail_shard_is_split_after_max_size(tmp_path):
+    repo, ids = fill(str(tmp_path / "shards"), 10, max_shard_size=4)
+    # Растущие id заполняют шарды целиком, а не наполовину
+    assert shard_counts(repo) == [4, 4, 2]
+    assert [s["start"] for s in repo._manifest["shards"]] == [0, ids[4], ids[8]]
+
+
+def test_inner_shard_is_split_at_median(tmp_path):
+    path = str(tmp_path / "shards")
+    repo, ids = fill(path, 8, max_shard_size=4)
+    assert shard_counts(repo) == [4, 4]
+    # Внутренний шард переполняется только при полной перезаписи
+    repo.max_shard_size = 3
+    repo.write_all()
+    assert shard_counts(repo) == [2, 2, 3, 1]
+    reopened = ClientRepSharded(path, max_shard_size=3)
+    assert sorted(c.get_id() for c in reopened.items) == ids
+
+
+def test_reads_and_deletes_load_only_needed_shards(tmp_path):
+    path = str(tmp_path / "shards")
+    _, ids = fill(path, 12, max_shard_size=4)
+    repo = ClientRepSharded(path, max_shard_size=4)
+    first_shard = os.path.join(path, repo._manifest["shards"][0]["file"])
+    mtime = os.stat(first_shard).st_mtime_ns
+
+    assert repo.get_by_id(ids[5]).get_haircut_counter() == 5
+    assert repo._loaded == [False, True, False]
+    assert repo.delete_by_id(ids[6])
+    assert repo.delete_many([ids[9], ids[10], 10_000])[2].ok is False
+    assert repo._loaded == [False, True, True]
+    assert repo.get_count() == 9
+    assert os.stat(first_shard).st_mtime_ns == mtime
+
+    reopened = ClientRepSharded(path, max_shard_size=4)
+    assert sorted(c.get_id() for c in reopened.items) == [
+        i for i in ids if i not in (ids[6], ids[9], ids[10])
+    ]
+
+
+def test_id_pages_read_shards_from_cursor(tmp_path):
+    path = str(tmp_path / "shards")
+    _, ids = fill(path, 10, max_shard_size=4)
+    repo = ClientRepSharded(path, max_shard_size=4)
+
+    page, cursor = repo.get_page(n=3)
+    assert [c.get_id() for c in page] == ids[:3]
+    assert repo._loaded == [True, False, False]
+
+    seen = [c.get_id() for c in page]
+    while cursor:
+        page, cursor = repo.get_page(cursor, n=3)
+        seen.extend(c.get_id() for c in page)
+    assert seen == ids
+    # Те же страницы и курсоры, что и у общей реализации по items
+    first, cursor = repo.get_page(n=4)
+    assert (first, cursor) == ClientRepBase.get_page(repo, n=4)
+    assert repo.get_page(cursor, n=4) == ClientRepBase.get_page(repo, cursor, n=4)
+    page, _ = repo.get_page(n=4, sort="haircut_counter")
+    assert [c.get_haircut_counter() for c in page] == [0, 1, 2, 3]
+
+
+def test_interrupted_rebalance_does_not_duplicate_clients(tmp_path):
+    path = str(tmp_path / "shards")
+    repo, ids = fill(path, 6, max_shard_size=4)
+    # Сбой после записи манифеста, до перезаписи старого шарда:
+    # в его файле остались клиенты, переехавшие в новый шард
+    first_shard = os.path.join(path, repo._manifest["shards"][0]["file"])
+    with open(first_shard, "w", encoding="utf-8") as f:
+        json.dump([c.to_dict() for c in repo.items], f, ensure_ascii=False)
+
+    reopened = ClientRepSharded(path, max_shard_size=4)
+    assert sorted(c.get_id() for c in reopened.items) == ids
+
+
+def test_hash_scheme_doubles_shards(tmp_path):
+    path = str(tmp_path / "shards")
+    repo, ids = fill(path, 20, scheme=SCHEME_HASH, hash_shards=2, max_shard_size=4)
+    assert len(repo._manifest["shards"]) == 8
+    assert all(count <= 4 for count in shard_counts(repo))
+    assert sum(shard_counts(repo)) == 20
+    # Старые файлы шардов удалены
+    assert len([n for n in os.listdir(path) if n.startswith("shard-")]) == 8
+
+    reopened = ClientRepSharded(path, scheme=SCHEME_HASH)
+    assert sorted(c.get_id() for c in reopened.items) == ids
@@ -0,0 +1,93 @@
+from conftest import make_client
+from hair_salon_lab1_task9 import Client
+from hair_salon_lab2 import ClientRepDBAdapter
+from repo_sqlite import ClientRepSqlite
+
+
+def make_adapter(tmp_path):
+    return ClientRepDBAdapter(ClientRepSqlite(str(tmp_path / "clients.sqlite3")))
+
+
+def rows(tmp_path):
+    db = ClientRepSqlite(str(tmp_path / "clients.sqlite3"))
+    return sorted(
+        (c.get_id(), c.get_first_name(), c.get_last_name(), c.get_haircut_counter())
+        for c in db.get_all()
+    )
+
+
+def test_write_all_swaps_unique_keys(tmp_path):
+    repo = make_adapter(tmp_path)
+    first = repo.add(make_client("Иванов", 1, first_name="Анна"))
+    second = repo.add(make_client("Иванов", 2, first_name="Мария"))
+
+    # Клиенты обмениваются ключами (фамилия, кол-во стрижек)
+    repo.items[repo._id_index[first]] = Client("Анна", "Иванов", "Иванович", 2, 0, first)
+    repo.items[repo._id_index[second]] = Client("Мария", "Иванов", "Иванович", 1, 0, second)
+    repo.write_all()
+
+    assert rows(tmp_path) == [(first, "Анна", "Иванов", 2), (second, "Мария", "Иванов", 1)]
+
+
+def test_sync_changes_rotates_keys_with_insert_and_delete(tmp_path):
+    db = ClientRepSqlite(str(tmp_path / "clients.sqlite3"))
+    ids = [db.add(make_client("Иванов", n, first_name=name)) for n, name in enumerate(["Анна", "Мария", "Ольга"])]
+    updates = [
+        Client("Анна", "Иванов", "Иванович", 1, 0, ids[0]),
+        Client("Мария", "Иванов", "Иванович", 2, 0, ids[1]),
+    ]
+    # Удаление освобождает ключ для второго обновления,
+    # вставка занимает ключ, освобождённый первым
+    new_ids = db.sync_changes([make_client("Иванов", 0, first_name="Елена")], updates, [ids[2]])
+
+    assert rows(tmp_path) == [
+        (ids[0], "Анна", "Иванов", 1),
+        (ids[1], "Мария", "Иванов", 2),
+        (new_ids[0], "Елена", "Иванов", 0),
+    ]
+
+
+class CountingConnection:
+    """Обёртка соединения sqlite3, запоминающая выполненные инструкции."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.calls = []
+
+    def execute(self, query, *args):
+        self.calls.append(("execute", " ".join(query.split())))
+        return self.conn.execute(query, *args)
+
+    def executemany(self, query, params):
+        self.calls.append(("executemany", " ".join(query.split())))
+        return self.conn.executemany(query, params)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self.conn.__exit__(*exc)
+
+
+def test_add_many_inserts_batch_with_one_statement(tmp_path):
+    db = ClientRepSqlite(str(tmp_path / "clients.sqlite3"))
+    existing = db.add(make_client("Иванов", 1))
+    db.conn = CountingConnection(db.conn)
+
+    batch = [
+        make_client("Петров", 1),
+        make_client("Иванов", 1),  # ключ уже занят в таблице
+        make_client("Сидоров", 1),
+        make_client("Петров", 1, first_name="Мария"),  # повтор ключа внутри пакета
+    ]
+    results = db.add_many(batch)
+
+    assert [r.ok for r in results] == [True, False, True, False]
+    assert [r.id for r in results if r.ok] == [batch[0].get_id(), batch[2].get_id()]
+    inserts = [kind for kind, query in db.conn.calls if query.startswith("INSERT INTO clients")]
+    assert inserts == ["executemany"]
+    assert rows(tmp_path) == [
+        (existing, "Иван", "Иванов", 1),
+        (results[0].id, "Иван", "Петров", 1),
+        (results[2].id, "Иван", "Сидоров", 1),
+    ]
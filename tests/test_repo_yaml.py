@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+import hair_salon_lab2
+from conftest import make_client, snapshot
+from hair_salon_lab2 import ClientRepYaml
+
+
+@pytest.fixture
+def yaml_path(tmp_path):
+    path = str(tmp_path / "clients.yaml")
+    repo = ClientRepYaml(path, snapshot_cache=True)
+    repo.add_many([make_client("Иванов"), make_client("Петров")])
+    return path
+
+
+def count_yaml_loads(monkeypatch):
+    loads = []
+    load = hair_salon_lab2.yaml.load
+
+    def counting_load(*args, **kwargs):
+        loads.append(1)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(hair_salon_lab2.yaml, "load", counting_load)
+    return loads
+
+
+def test_round_trip_without_cache(tmp_path):
+    path = str(tmp_path / "clients.yaml")
+    repo = ClientRepYaml(path)
+    first = repo.add(make_client("Иванов"))
+    assert not os.path.exists(path + ".cache")
+    assert snapshot(ClientRepYaml(path)) == [(first, "Иванов", 1)]
+
+
+def test_reopen_uses_snapshot(yaml_path, monkeypatch):
+    assert os.path.exists(yaml_path + ".cache")
+    loads = count_yaml_loads(monkeypatch)
+    repo = ClientRepYaml(yaml_path, snapshot_cache=True)
+    assert [name for _, name, _ in snapshot(repo)] == ["Иванов", "Петров"]
+    assert loads == []
+
+
+def test_touched_file_keeps_snapshot(yaml_path, monkeypatch):
+    os.utime(yaml_path, ns=(1, 1))
+    loads = count_yaml_loads(monkeypatch)
+    assert len(ClientRepYaml(yaml_path, snapshot_cache=True).items) == 2
+    assert loads == []
+
+
+def test_edited_file_is_parsed_again(yaml_path, monkeypatch):
+    with open(yaml_path, "a", encoding="utf-8") as f:
+        f.write(
+            "- first_name: Анна\n"
+            "  last_name: Сидорова\n"
+            "  father_name: Олеговна\n"
+            "  haircut_counter: 2\n"
+            "  discount: 5\n"
+            "  id: 100\n"
+        )
+    loads = count_yaml_loads(monkeypatch)
+    repo = ClientRepYaml(yaml_path, snapshot_cache=True)
+    assert loads == [1]
+    assert repo.get_by_id(100).get_last_name() == "Сидорова"
+    # Снимок обновлён: следующее открытие снова без разбора YAML
+    ClientRepYaml(yaml_path, snapshot_cache=True)
+    assert loads == [1]
+
+
+def test_corrupted_snapshot_is_ignored(yaml_path):
+    with open(yaml_path + ".cache", "wb") as f:
+        f.write(b"\x00garbage")
+    assert len(ClientRepYaml(yaml_path, snapshot_cache=True).items) == 2
+
+
+def test_hand_edited_yaml_is_validated(tmp_path):
+    path = str(tmp_path / "clients.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "- first_name: Анна\n"
+            "  last_name: Сидорова\n"
+            "  father_name: Олеговна\n"
+            "  haircut_counter: -3\n"
+            "  discount: 5\n"
+            "  id: 1\n"
+        )
+    with pytest.raises(ValueError):
+        ClientRepYaml(path)
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        # нет father_name
+        "- first_name: Анна\n  last_name: Сидорова\n  haircut_counter: 3\n  discount: 5\n  id: 1\n",
+        # список вместо строки
+        "- first_name: [Анна]\n  last_name: Сидорова\n  father_name: Олеговна\n"
+        "  haircut_counter: 3\n  discount: 5\n  id: 1\n",
+        # строка вместо записи
+        "- Сидорова Анна Олеговна\n",
+    ],
+    ids=["missing-field", "list-name", "not-a-mapping"],
+)
+def test_malformed_yaml_row_raises_value_error(tmp_path, row):
+    path = str(tmp_path / "clients.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(row)
+    with pytest.raises(ValueError):
+        ClientRepYaml(path)
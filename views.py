@@ -1,7 +1,8 @@
 # views.py
 from __future__ import annotations
-from typing import List, Dict, Any
-from hair_salon_lab1_task9 import Client
+from functools import lru_cache
+from typing import List, Dict, Any, Sequence
+from hair_salon_lab1_task9 import Client, ClientRecord
 
 
 def page_layout(title: str, body: str, scripts: List[str]) -> str:
@@ -38,21 +39,26 @@ def not_found_page(msg: str) -> str:
     return page_layout("Not found", body, scripts=[])
 
 
-def index_page(clients: List[Client]) -> str:
-    rows = []
-    for c in clients:
-        rows.append(
-            f"<tr data-id='{c.get_id()}'>"
-            f"<td>{c.get_id()}</td>"
-            f"<td>{c.get_last_name()}</td>"
-            f"<td>{c.get_first_name()}</td>"
-            f"<td>{c.get_father_name()}</td>"
-            f"<td>{c.get_haircut_counter()}</td>"
-            f"<td>{c.get_discount()}</td>"
-            f"<td><button class='editbtn'>Редактировать</button></td>"
-            f"<td><button class='delbtn'>Удалить</button></td>"
-            f"</tr>"
-        )
+# Строка таблицы зависит только от значений клиента, поэтому ключ кэша —
+# неизменяемая запись: после правки одного клиента перестраивается одна строка
+@lru_cache(maxsize=16_384)
+def _client_row(c: ClientRecord) -> str:
+    return (
+        f"<tr data-id='{c.id}'>"
+        f"<td>{c.id}</td>"
+        f"<td>{c.last_name}</td>"
+        f"<td>{c.first_name}</td>"
+        f"<td>{c.father_name}</td>"
+        f"<td>{c.haircut_counter}</td>"
+        f"<td>{c.discount}</td>"
+        f"<td><button class='editbtn'>Редактировать</button></td>"
+        f"<td><button class='delbtn'>Удалить</button></td>"
+        f"</tr>"
+    )
+
+
+def index_page(clients: Sequence[Client]) -> str:
+    rows = [_client_row(c.to_record()) for c in clients]
 
     body = f"""
 <h1>Clients CRUD (MVC без фреймворка)</h1>